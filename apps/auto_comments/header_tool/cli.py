@@ -1,7 +1,12 @@
 import argparse
+import sys
+from dev_common.git import add_changed_arguments
+from dev_common.profiling import add_profile_arguments, create_profiler
+from .fs_utils import DEFAULT_EXCLUDE_DIRS
 from .processor import BatchProcessor
 
-def main():
+def main(argv=None, memo=None):
+    """argv 默认取命令行参数；常驻进程 (devd) 传入请求的参数与跨请求复用的 memo"""
     parser = argparse.ArgumentParser(
         description="C/C++ 源码头部路径注释自动维护工具。",
         epilog="示例: python run.py ./src --ext .h .c"
@@ -14,11 +19,53 @@ def main():
         default=['.hpp', '.cpp', '.h', '.c'],
         help="目标文件扩展名 (默认: .hpp .cpp .h .c)"
     )
+    parser.add_argument(
+        "--exclude-dir",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help=f"追加排除的目录名 (支持通配，可多次指定；默认已排除: {' '.join(DEFAULT_EXCLUDE_DIRS)})"
+    )
+    parser.add_argument(
+        "--no-ignore",
+        action="store_true",
+        help="遍历全部目录：不读取 .gitignore、不使用 git ls-files、不排除默认目录"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="只读取首行判断是否需要修改；修改时经临时文件流式改写并原子替换，其余内容按原始字节保留 "
+             "(适合包含大型生成文件的目录)"
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="PATH",
+        help="增量清单文件：记录已确认符合规范的文件 (相对路径、inode、大小、mtime 与注释)，"
+             "下次运行时元数据与路径均未变化的文件只 stat、不打开"
+    )
+    add_changed_arguments(parser)
+    add_profile_arguments(parser)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    profiler = create_profiler(args, "auto_comments")
 
     try:
-        processor = BatchProcessor(args.src_dir, tuple(args.ext))
+        processor = BatchProcessor(
+            args.src_dir,
+            tuple(args.ext),
+            exclude_dirs=DEFAULT_EXCLUDE_DIRS + tuple(args.exclude_dir),
+            use_ignore=not args.no_ignore,
+            profiler=profiler,
+            changed_ref=args.changed,
+            staged=args.staged,
+            memo=memo,
+            stream=args.stream,
+            manifest_path=args.manifest,
+        )
         processor.process()
     except Exception as e:
-        print(f"程序执行出错: {e}")
\ No newline at end of file
+        # 例如 --changed 时 git 调用失败：必须以非零状态退出，否则钩子或 CI 会当作检查通过
+        print(f"程序执行出错: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        profiler.finish()
\ No newline at end of file
@@ -13,20 +13,18 @@ def calculate_header_comment(file_path: str, root_dir: str) -> str:
         # 处理路径不在 root_dir 下的情况
         return f"// {os.path.basename(file_path)}\n"
 
-def analyze_and_update_content(lines: List[str], expected_comment: str) -> Tuple[str, List[str], Optional[str]]:
+def analyze_first_line(first_line: str, expected_comment: str) -> Tuple[str, Optional[str]]:
     """
-    分析文件内容列表，决定是否需要更新。
+    只根据第一行决定是否需要更新 (first_line 为空串表示空文件)。
     
     Returns:
         status (str): 'added', 'updated', 'skipped'
-        new_lines (List[str]): 更新后的内容列表
-        old_comment (str):如果被替换，返回旧注释，否则为 None
+        old_comment (str): 如果被替换，返回旧注释，否则为 None
     """
-    if not lines:
+    if not first_line:
         # 空文件
-        return 'added', [expected_comment], None
+        return 'added', None
 
-    first_line = lines[0]
     is_comment = re.match(r"^\s*//", first_line) is not None
     # 比较时忽略首尾空白，但写入时保留换行
     is_correct = first_line.strip() == expected_comment.strip()
@@ -34,13 +32,27 @@ def analyze_and_update_content(lines: List[str], expected_comment: str) -> Tuple
     if is_comment:
         if not is_correct:
             # 存在注释但不对 -> 更新
-            new_lines = lines[:]
-            new_lines[0] = expected_comment
-            return 'updated', new_lines, first_line.strip()
-        else:
-            # 存在且正确 -> 跳过
-            return 'skipped', lines, None
-    else:
-        # 第一行不是注释 -> 新增
+            return 'updated', first_line.strip()
+        # 存在且正确 -> 跳过
+        return 'skipped', None
+    # 第一行不是注释 -> 新增
+    return 'added', None
+
+def analyze_and_update_content(lines: List[str], expected_comment: str) -> Tuple[str, List[str], Optional[str]]:
+    """
+    分析文件内容列表，决定是否需要更新。
+    
+    Returns:
+        status (str): 'added', 'updated', 'skipped'
+        new_lines (List[str]): 更新后的内容列表
+        old_comment (str):如果被替换，返回旧注释，否则为 None
+    """
+    status, old_comment = analyze_first_line(lines[0] if lines else '', expected_comment)
+    if status == 'updated':
+        new_lines = lines[:]
+        new_lines[0] = expected_comment
+    elif status == 'added':
         new_lines = [expected_comment] + lines
-        return 'added', new_lines, None
\ No newline at end of file
+    else:
+        new_lines = lines
+    return status, new_lines, old_comment
\ No newline at end of file
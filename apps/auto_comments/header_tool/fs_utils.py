@@ -1,12 +1,34 @@
+import json
 import os
-from typing import Iterator, List
+import shutil
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional
 
-def walk_source_files(src_dir: str, extensions: tuple) -> Iterator[str]:
-    """生成器：遍历获取符合条件的文件路径。"""
-    for root, _, files in os.walk(src_dir):
-        for file in files:
-            if file.lower().endswith(extensions):
-                yield os.path.join(root, file)
+from dev_common.walker import DEFAULT_EXCLUDE_DIRS, SourceWalker
+
+# 流式读写的块大小：首行超过该长度时分块读取，其余内容按块复制，单个文件的内存占用与文件大小无关
+_CHUNK_SIZE = 1 << 20
+
+# 增量清单格式版本：格式变化时递增，旧清单会被忽略
+MANIFEST_VERSION = 1
+
+def walk_source_files(src_dir: str, extensions: tuple,
+                      exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+                      use_ignore: bool = True) -> Iterator[str]:
+    """生成器：遍历获取符合条件的文件路径 (遵循 .gitignore 与排除目录，git 工作区内使用 git ls-files)。"""
+    return SourceWalker(src_dir, extensions, exclude_dirs, use_ignore).files()
+
+def changed_source_files(src_dir: str, extensions: tuple, ref: Optional[str], staged: bool,
+                         exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+                         use_ignore: bool = True) -> List[str]:
+    """只返回 git 报告新增、修改或重命名的文件 (重命名会改变期望的头部注释)。"""
+    return SourceWalker(src_dir, extensions, exclude_dirs, use_ignore).changed_files(ref, staged)
+
+def unstaged_source_files(src_dir: str, extensions: tuple,
+                          exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+                          use_ignore: bool = True) -> List[str]:
+    """返回工作区相对暂存区仍有修改的文件 (--staged 时这些文件处理的是工作区内容)。"""
+    return SourceWalker(src_dir, extensions, exclude_dirs, use_ignore).unstaged_files()
 
 def read_file_lines(file_path: str) -> List[str]:
     """安全读取文件内容。"""
@@ -23,4 +45,88 @@ def write_file_lines(file_path: str, lines: List[str]):
         with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
             f.writelines(lines)
     except Exception as e:
-        print(f"Error writing {file_path}: {e}")
\ No newline at end of file
+        print(f"Error writing {file_path}: {e}")
+
+def read_first_line(file_path: str) -> Optional[str]:
+    """只读取文件第一行 (含换行符；空文件返回空串)，读取失败返回 None。"""
+    try:
+        with open(file_path, 'rb') as f:
+            line = f.readline(_CHUNK_SIZE)
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+        return None
+    return line.decode('utf-8', errors='ignore')
+
+def rewrite_first_line(file_path: str, comment: str, replace: bool):
+    """
+    流式改写文件首行：replace 为 True 时替换原有首行，否则将 comment 插入到文件开头。
+    新内容写入同目录下的临时文件，其余字节原样按块复制后原子替换原文件 (保留权限位与原有的换行风格)；
+    失败时原文件保持不变。
+    """
+    # 符号链接改写其指向的文件，而不是把链接本身替换成普通文件
+    target = os.path.realpath(file_path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix='.auto_comments_', suffix='.tmp', dir=os.path.dirname(target))
+    except Exception as e:
+        print(f"Error writing {file_path}: {e}")
+        return
+
+    try:
+        with os.fdopen(fd, 'wb') as dst, open(target, 'rb') as src:
+            first = src.readline(_CHUNK_SIZE)
+            newline = b'\r\n' if first.endswith(b'\r\n') else b'\n'
+            dst.write(comment.rstrip('\r\n').encode('utf-8') + newline)
+            if replace:
+                # 跳过原有首行，超长的首行分块读取
+                while first and not first.endswith(b'\n'):
+                    first = src.readline(_CHUNK_SIZE)
+            else:
+                dst.write(first)
+            shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+        shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    except Exception as e:
+        print(f"Error writing {file_path}: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def load_manifest(path: str) -> Dict[str, list]:
+    """
+    读取增量清单 {相对路径: [mtime_ns, size, inode, 已确认的注释]}。
+    文件不存在、无法解析或版本不符时返回空清单 (等同于首次运行)。
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Error reading manifest {path}: {e}")
+        return {}
+    if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION:
+        return {}
+    files = data.get('files')
+    return files if isinstance(files, dict) else {}
+
+def save_manifest(path: str, files: Dict[str, list]):
+    """原子写入增量清单：先写临时文件再替换，中途失败不会留下损坏的清单。"""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix='.auto_comments_', suffix='.tmp', dir=directory)
+    except Exception as e:
+        print(f"Error writing manifest {path}: {e}")
+        return
+
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': files}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing manifest {path}: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
\ No newline at end of file
@@ -1,56 +1,166 @@
 import os
+from typing import Dict, Iterable, List, Optional
+
+from dev_common.memo import StampMemo, file_stamp
+from dev_common.profiling import NULL_PROFILER
 from . import core
 from . import fs_utils
 
 class BatchProcessor:
-    def __init__(self, src_dir: str, extensions: tuple):
+    def __init__(self, src_dir: str, extensions: tuple,
+                 exclude_dirs: Iterable[str] = fs_utils.DEFAULT_EXCLUDE_DIRS, use_ignore: bool = True,
+                 profiler=NULL_PROFILER, changed_ref: Optional[str] = None, staged: bool = False,
+                 memo: Optional[StampMemo] = None, stream: bool = False,
+                 manifest_path: Optional[str] = None):
+        """
+        指定 changed_ref 或 staged 时只处理 git 报告有变化的文件。
+        memo 由常驻进程传入：记住已符合规范的文件，元数据未变化时不再读取。
+        stream 为 True 时只读取首行判断，需要修改时经临时文件流式改写 (内存占用与文件大小无关)。
+        manifest_path: 增量清单，记录上次已确认符合规范的文件，元数据与相对路径未变化时不再打开。
+        """
         self.src_dir = os.path.abspath(src_dir)
         self.extensions = extensions
+        self.exclude_dirs = tuple(exclude_dirs)
+        self.use_ignore = use_ignore
+        self.profiler = profiler
+        self.changed_ref = changed_ref
+        self.staged = staged
+        self.memo = memo
+        self.stream = stream
+        self.manifest_path = manifest_path
         self.stats = {'added': 0, 'updated': 0, 'skipped': 0}
+        self.manifest_hits = 0
+        self._previous: Dict[str, list] = {}
+        self._verified: Dict[str, list] = {}
 
     def process(self):
         """执行批量处理流程。"""
         if not os.path.isdir(self.src_dir):
             raise FileNotFoundError(f"Directory not found: {self.src_dir}")
 
-        print(f"🚀 开始扫描: {self.src_dir}")
+        if self.changed_ref or self.staged:
+            files = fs_utils.changed_source_files(
+                self.src_dir, self.extensions, self.changed_ref, self.staged, self.exclude_dirs, self.use_ignore)
+            scope = "暂存区" if self.staged else f"相对 {self.changed_ref} 的变更"
+            print(f"🚀 开始扫描: {self.src_dir} ({scope}，{len(files)} 个文件)")
+            if self.staged:
+                partial = set(files) & set(fs_utils.unstaged_source_files(
+                    self.src_dir, self.extensions, self.exclude_dirs, self.use_ignore))
+                if partial:
+                    print(f"⚠️ {len(partial)} 个文件在工作区中还有未暂存的修改，处理的是工作区内容")
+        else:
+            files = fs_utils.walk_source_files(self.src_dir, self.extensions, self.exclude_dirs, self.use_ignore)
+            print(f"🚀 开始扫描: {self.src_dir}")
+
+        if self.manifest_path:
+            self._previous = fs_utils.load_manifest(self.manifest_path)
+            if self.changed_ref or self.staged:
+                # 只处理了部分文件，其余文件沿用原有记录
+                self._verified = dict(self._previous)
         
-        for file_path in fs_utils.walk_source_files(self.src_dir, self.extensions):
+        for file_path in self.profiler.iterate('walk', files):
+            started = self.profiler.now()
             self._handle_single_file(file_path)
+            self.profiler.file_done(file_path, started)
+
+        if self.manifest_path:
+            fs_utils.save_manifest(self.manifest_path, self._verified)
             
         self._print_summary()
 
     def _handle_single_file(self, file_path: str):
         """处理单个文件的编排逻辑。"""
+        profiler = self.profiler
+
+        stamp = None
+        if self.memo is not None or self.manifest_path:
+            stamp = file_stamp(file_path)
+        if self._is_verified(file_path, stamp):
+            self.stats['skipped'] += 1
+            self._mark_verified(file_path, stamp)
+            return
+
         # 1. 读取
-        lines = fs_utils.read_file_lines(file_path)
+        with profiler.phase('read'):
+            if self.stream:
+                first_line = fs_utils.read_first_line(file_path)
+                if first_line is None:
+                    return
+            else:
+                lines = fs_utils.read_file_lines(file_path)
         
         # 2. 逻辑计算
-        expected_comment = core.calculate_header_comment(file_path, self.src_dir)
-        status, new_lines, old_comment = core.analyze_and_update_content(lines, expected_comment)
+        with profiler.phase('analyze'):
+            expected_comment = core.calculate_header_comment(file_path, self.src_dir)
+            if self.stream:
+                status, old_comment = core.analyze_first_line(first_line, expected_comment)
+                new_lines = None
+            else:
+                status, new_lines, old_comment = core.analyze_and_update_content(lines, expected_comment)
         
         # 3. 根据结果执行 IO 和 UI 输出
         rel_path = os.path.relpath(file_path, self.src_dir)
         
         if status == 'added':
             print(f"[+] {rel_path}")
-            fs_utils.write_file_lines(file_path, new_lines)
+            self._write(file_path, status, expected_comment, new_lines)
             self.stats['added'] += 1
             
         elif status == 'updated':
             print(f"[*] {rel_path}")
             print(f"    Old: {old_comment}")
             print(f"    New: {expected_comment.strip()}")
-            fs_utils.write_file_lines(file_path, new_lines)
+            self._write(file_path, status, expected_comment, new_lines)
             self.stats['updated'] += 1
             
         else:
             # skipped
             self.stats['skipped'] += 1
+            self._mark_verified(file_path, stamp)
+
+    def _manifest_key(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.src_dir).replace(os.sep, '/')
+
+    def _is_verified(self, file_path: str, stamp) -> bool:
+        """元数据未变化、且上次已确认符合规范的文件无需再读取"""
+        if stamp is None:
+            return False
+        if self.memo is not None and self.memo.get((file_path, self.src_dir), stamp) is not None:
+            return True
+        if self.manifest_path:
+            # 清单按相对路径记录：移动后的文件路径不同 (期望的注释也不同)，必须重新检查
+            entry = self._previous.get(self._manifest_key(file_path))
+            expected = core.calculate_header_comment(file_path, self.src_dir).strip()
+            if entry == [*stamp, expected]:
+                self.manifest_hits += 1
+                return True
+        return False
+
+    def _mark_verified(self, file_path: str, stamp):
+        """
+        记录已确认符合规范的文件。本次写入过的文件不记录：写入失败时元数据可能不变，
+        下次运行会读取确认一次后再记录。
+        """
+        if stamp is None:
+            return
+        if self.memo is not None:
+            self.memo.put((file_path, self.src_dir), stamp, 'skipped')
+        if self.manifest_path:
+            expected = core.calculate_header_comment(file_path, self.src_dir).strip()
+            self._verified[self._manifest_key(file_path)] = [*stamp, expected]
+
+    def _write(self, file_path: str, status: str, expected_comment: str, new_lines: Optional[List[str]]):
+        with self.profiler.phase('write'):
+            if self.stream:
+                fs_utils.rewrite_first_line(file_path, expected_comment, replace=(status == 'updated'))
+            else:
+                fs_utils.write_file_lines(file_path, new_lines)
 
     def _print_summary(self):
         print("\n================== 总结 ==================")
         print(f"+ 新增注释: {self.stats['added']}")
         print(f"* 更新注释: {self.stats['updated']}")
         print(f"- 跳过文件: {self.stats['skipped']}")
+        if self.manifest_path:
+            print(f"  (其中 {self.manifest_hits} 个文件由清单确认未变化，未打开)")
         print("========================================")
\ No newline at end of file
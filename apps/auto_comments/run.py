@@ -1,3 +1,9 @@
+import os
+import sys
+
+# 各工具共享的 dev_common 位于 apps/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
 from header_tool.cli import main
 
 if __name__ == "__main__":
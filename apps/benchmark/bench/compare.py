@@ -0,0 +1,45 @@
+# bench/compare.py
+from typing import Dict, List, NamedTuple, Optional
+
+# 指标 -> 是否越大越好
+METRICS = {
+    'wall_s': False,
+    'files_per_s': True,
+    'peak_rss_kb': False,
+    'syscalls': False,
+}
+
+class Delta(NamedTuple):
+    tool: str
+    metric: str
+    baseline: float
+    current: float
+    change: float        # 相对变化，正数表示变差
+    regressed: bool
+
+def compare_results(current: Dict, baseline: Dict, threshold: float) -> List[Delta]:
+    """逐工具逐指标对比，变差幅度超过 threshold (如 0.1 = 10%) 即视为回归"""
+    deltas = []
+    for tool, metrics in current['results'].items():
+        base_metrics = baseline.get('results', {}).get(tool)
+        if not base_metrics:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            base: Optional[float] = base_metrics.get(metric)
+            cur: Optional[float] = metrics.get(metric)
+            if not base or cur is None:
+                continue
+            change = (cur - base) / base
+            if higher_is_better:
+                change = -change
+            deltas.append(Delta(tool, metric, base, cur, change, change > threshold))
+    return deltas
+
+def format_deltas(deltas: List[Delta]) -> str:
+    lines = [f"{'tool':<15}{'metric':<14}{'baseline':>14}{'current':>14}{'change':>10}"]
+    for d in deltas:
+        flag = "  ❌ 回归" if d.regressed else ""
+        lines.append(
+            f"{d.tool:<15}{d.metric:<14}{d.baseline:>14.3f}{d.current:>14.3f}{d.change:>+10.1%}{flag}"
+        )
+    return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,116 @@
+# bench/corpus.py
+import random
+from pathlib import Path
+from typing import List, NamedTuple
+
+# 由 run.py 预先将各工具目录加入 sys.path
+from hpp_guard.logic import calculate_expected_guard
+from header_tool.core import calculate_header_comment
+
+_STD_HEADERS = [
+    'vector', 'string', 'map', 'unordered_map', 'memory', 'algorithm',
+    'functional', 'iostream', 'optional', 'variant', 'mutex', 'thread',
+    'span', 'ranges', 'cstdint', 'cstring', 'unistd.h', 'sys/types.h',
+]
+_THIRD_PARTY_HEADERS = ['nlohmann/json.hpp', 'sqlite3.h', 'toml++/toml.h', 'windows.h']
+
+_WORDS = ['core', 'net', 'render', 'audio', 'io', 'math', 'scene', 'asset',
+          'script', 'ui', 'physics', 'db', 'log', 'config', 'task', 'cache']
+
+class CorpusSpec(NamedTuple):
+    files: int = 2000               # 文件总数 (头文件与源文件约各占一半)
+    depth: int = 3                  # 目录最大嵌套深度
+    fanout: int = 8                 # 每个文件包含的项目头文件数
+    min_lines: int = 20             # 单个文件的最少行数
+    max_lines: int = 400            # 单个文件的最多行数
+    camel_ratio: float = 0.3        # 采用 CamelCase 命名的文件比例
+    broken_guard_ratio: float = 0.1     # 守卫名称错误的头文件比例
+    broken_comment_ratio: float = 0.1   # 头部路径注释缺失或错误的文件比例
+    seed: int = 42
+
+def _name(rng: random.Random, camel: bool) -> str:
+    a, b = rng.sample(_WORDS, 2)
+    return f"{a.capitalize()}{b.capitalize()}" if camel else f"{a}_{b}"
+
+def _directories(rng: random.Random, spec: CorpusSpec) -> List[str]:
+    dirs = ['']
+    count = max(1, spec.files // 40)
+    while len(dirs) < count:
+        parent = rng.choice(dirs)
+        if parent.count('/') + 1 >= spec.depth and parent:
+            continue
+        child = f"{parent}/{rng.choice(_WORDS)}{len(dirs)}".lstrip('/')
+        dirs.append(child)
+    return dirs
+
+def _body(rng: random.Random, lines: int) -> List[str]:
+    out = []
+    for i in range(lines):
+        kind = i % 4
+        if kind == 0:
+            out.append(f"inline int value_{i}(int x) {{ return x * {rng.randint(1, 99)}; }}\n")
+        elif kind == 1:
+            out.append(f"// 说明 {i}: {rng.choice(_WORDS)} {rng.choice(_WORDS)}\n")
+        elif kind == 2:
+            out.append(f"struct Item{i} {{ int a; double b; }};\n")
+        else:
+            out.append("\n")
+    return out
+
+def generate_corpus(root: str, spec: CorpusSpec) -> int:
+    """
+    在 root 下生成可复现的合成 C++ 源码树，返回生成的文件数。
+    同一 spec (含 seed) 总是生成逐字节相同的目录树。
+    """
+    rng = random.Random(spec.seed)
+    root_path = Path(root).resolve()
+    dirs = _directories(rng, spec)
+
+    # 1. 先确定全部文件路径，再生成内容，保证包含关系可以指向任意头文件
+    headers, sources = [], []
+    for i in range(spec.files):
+        directory = rng.choice(dirs)
+        stem = f"{_name(rng, rng.random() < spec.camel_ratio)}{i}"
+        rel = f"{directory}/{stem}".lstrip('/')
+        (headers if i % 2 == 0 else sources).append(rel)
+
+    # 2. 写文件
+    files = [(rel, True) for rel in headers] + [(rel, False) for rel in sources]
+    for rel, is_header in files:
+        file_path = root_path / (rel + ('.hpp' if is_header else '.cpp'))
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        lines = []
+        comment = calculate_header_comment(str(file_path), str(root_path))
+        roll = rng.random()
+        if roll < spec.broken_comment_ratio / 2:
+            pass  # 缺失注释
+        elif roll < spec.broken_comment_ratio:
+            lines.append("// outdated/path.hpp\n")
+        else:
+            lines.append(comment)
+
+        guard = None
+        if is_header:
+            guard = calculate_expected_guard(file_path, root_path)
+            if rng.random() < spec.broken_guard_ratio:
+                guard = f"OLD_{guard}"
+            lines += [f"#ifndef {guard}\n", f"#define {guard}\n", "\n"]
+
+        for std in rng.sample(_STD_HEADERS, min(4, len(_STD_HEADERS))):
+            lines.append(f"#include <{std}>\n")
+        if rng.random() < 0.2:
+            lines.append(f"#include <{rng.choice(_THIRD_PARTY_HEADERS)}>\n")
+        for dep in rng.sample(headers, min(spec.fanout, len(headers))):
+            lines.append(f"#include \"{dep}.hpp\"\n")
+        lines.append("\n")
+
+        lines += _body(rng, rng.randint(spec.min_lines, spec.max_lines))
+
+        if guard:
+            lines.append(f"\n#endif // {guard}\n")
+
+        with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(lines)
+
+    return len(files)
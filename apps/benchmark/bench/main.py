@@ -0,0 +1,79 @@
+# bench/main.py
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+
+from .corpus import CorpusSpec
+from .runner import TOOL_EXTENSIONS, run_benchmarks, strace_available
+from .compare import compare_results, format_deltas
+
+def parse_arguments():
+    defaults = CorpusSpec()
+    parser = argparse.ArgumentParser(
+        description="find_hpp / auto_comments / hpp_guard 性能基准测试。",
+        epilog="示例: python run.py --files 5000 --output result.json --baseline baseline.json"
+    )
+    corpus = parser.add_argument_group("合成语料")
+    corpus.add_argument("--files", type=int, default=defaults.files, help="文件总数")
+    corpus.add_argument("--depth", type=int, default=defaults.depth, help="目录最大嵌套深度")
+    corpus.add_argument("--fanout", type=int, default=defaults.fanout, help="每个文件包含的项目头文件数")
+    corpus.add_argument("--min-lines", type=int, default=defaults.min_lines, help="单文件最少行数")
+    corpus.add_argument("--max-lines", type=int, default=defaults.max_lines, help="单文件最多行数")
+    corpus.add_argument("--camel-ratio", type=float, default=defaults.camel_ratio, help="CamelCase 文件名比例")
+    corpus.add_argument("--broken-guard-ratio", type=float, default=defaults.broken_guard_ratio,
+                        help="守卫错误的头文件比例")
+    corpus.add_argument("--broken-comment-ratio", type=float, default=defaults.broken_comment_ratio,
+                        help="头部注释缺失或错误的文件比例")
+    corpus.add_argument("--seed", type=int, default=defaults.seed, help="随机种子")
+
+    parser.add_argument("--tools", nargs="+", choices=sorted(TOOL_EXTENSIONS), default=sorted(TOOL_EXTENSIONS),
+                        help="要测试的工具 (默认全部)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个工具重复运行次数，取中位数")
+    parser.add_argument("--syscalls", action="store_true", help="使用 strace 统计系统调用次数 (仅 Linux)")
+    parser.add_argument("--workdir", help="语料存放目录 (默认使用临时目录并在结束后删除)")
+    parser.add_argument("-o", "--output", help="结果 JSON 输出路径 (默认输出到 stdout)")
+    parser.add_argument("--baseline", help="与已保存的基线结果 JSON 对比")
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定为回归的变差比例 (默认 0.10)")
+    return parser.parse_args()
+
+def run():
+    args = parse_arguments()
+
+    if args.syscalls and not strace_available():
+        print("警告: 未找到 strace，跳过系统调用统计。", file=sys.stderr)
+        args.syscalls = False
+
+    spec = CorpusSpec(
+        files=args.files, depth=args.depth, fanout=args.fanout,
+        min_lines=args.min_lines, max_lines=args.max_lines,
+        camel_ratio=args.camel_ratio,
+        broken_guard_ratio=args.broken_guard_ratio,
+        broken_comment_ratio=args.broken_comment_ratio,
+        seed=args.seed,
+    )
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="devtools_bench_")
+    print(f"--- 语料目录: {workdir} ---", file=sys.stderr)
+    try:
+        result = run_benchmarks(spec, args.tools, args.repeat, args.syscalls, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        deltas = compare_results(result, baseline, args.threshold)
+        print("\n" + format_deltas(deltas), file=sys.stderr)
+        if any(d.regressed for d in deltas):
+            print(f"\n发现性能回归 (阈值 {args.threshold:.0%})。", file=sys.stderr)
+            sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,57 @@
+# bench/probe.py
+"""
+在独立子进程中运行单个被测工具，并把测量结果以一行 JSON 写到 stdout。
+独立进程保证峰值内存 (ru_maxrss) 与系统调用计数只反映该工具本身。
+
+用法: python -m bench.probe <tool> <tree>
+"""
+import contextlib
+import json
+import os
+import sys
+import time
+
+# 以 python -m bench.probe 在子进程中运行，不经过 run.py，需自行把 apps/common 加入 sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'common'))
+
+from dev_common.paths import ensure_tool_paths
+
+def _run_find_hpp(tree: str):
+    from pch_gen import config
+    from pch_gen.io.scanner import FileFinder
+    from pch_gen.io.collector import IncludeCollector
+    from pch_gen.core.parser import HeaderParser
+
+    finder = FileFinder(extensions=config.SCAN_EXTENSIONS)
+    IncludeCollector(HeaderParser()).collect(finder.find_files(tree))
+
+def _run_auto_comments(tree: str):
+    from header_tool.processor import BatchProcessor
+    BatchProcessor(tree, ('.hpp', '.cpp', '.h', '.c')).process()
+
+def _run_hpp_guard(tree: str):
+    from hpp_guard.scanner import scan_and_process_directory
+    scan_and_process_directory(tree, False)
+
+_TOOLS = {
+    'find_hpp': _run_find_hpp,
+    'auto_comments': _run_auto_comments,
+    'hpp_guard': _run_hpp_guard,
+}
+
+def main():
+    tool, tree = sys.argv[1], sys.argv[2]
+    ensure_tool_paths()
+    from dev_common.profiling import peak_rss_kb
+
+    # 工具自身的输出与测量无关，全部丢弃
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            _TOOLS[tool](tree)
+            wall = time.perf_counter() - start
+
+    print(json.dumps({'wall_s': wall, 'peak_rss_kb': peak_rss_kb()}))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+# bench/runner.py
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from .corpus import CorpusSpec, generate_corpus
+
+# 各工具实际处理的文件后缀，用于计算 files/sec
+TOOL_EXTENSIONS = {
+    'find_hpp': ('.cpp', '.hpp', '.h', '.cc', '.cxx', '.c'),
+    'auto_comments': ('.hpp', '.cpp', '.h', '.c'),
+    'hpp_guard': ('.hpp',),
+}
+
+_BENCH_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _count_files(tree: str, extensions: tuple) -> int:
+    return sum(
+        1 for _, _, files in os.walk(tree)
+        for name in files if name.lower().endswith(extensions)
+    )
+
+def strace_available() -> bool:
+    return shutil.which('strace') is not None
+
+def _parse_strace_summary(path: str) -> Optional[int]:
+    """
+    解析 `strace -c` 的汇总表，返回系统调用总次数。
+    每行格式: % time, seconds, usecs/call, calls, [errors], syscall
+    """
+    total = 0
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 5 or parts[-1] == 'total' or not parts[3].isdigit():
+                    continue
+                total += int(parts[3])
+    except OSError:
+        return None
+    return total
+
+def run_probe(tool: str, tree: str, syscalls: bool) -> dict:
+    """在子进程中运行一次被测工具，返回 {'wall_s', 'peak_rss_kb', 'syscalls'}"""
+    cmd = [sys.executable, '-m', 'bench.probe', tool, tree]
+    trace_file = None
+    if syscalls:
+        fd, trace_file = tempfile.mkstemp(suffix='.strace')
+        os.close(fd)
+        cmd = ['strace', '-f', '-c', '-o', trace_file] + cmd
+
+    try:
+        result = subprocess.run(cmd, cwd=_BENCH_DIR, capture_output=True, text=True, check=True)
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        sample['syscalls'] = _parse_strace_summary(trace_file) if trace_file else None
+    finally:
+        if trace_file:
+            os.remove(trace_file)
+    return sample
+
+def run_benchmarks(spec: CorpusSpec, tools: List[str], repeat: int,
+                   syscalls: bool, workdir: str) -> Dict:
+    """
+    生成一份原始语料后，每次运行前复制一份全新副本
+    (auto_comments 会直接改写文件，不能重复使用同一目录)。
+    """
+    pristine = os.path.join(workdir, 'pristine')
+    generate_corpus(pristine, spec)
+
+    results = {}
+    for tool in tools:
+        files = _count_files(pristine, TOOL_EXTENSIONS[tool])
+        samples = []
+        for i in range(repeat):
+            tree = os.path.join(workdir, f'{tool}_{i}')
+            shutil.copytree(pristine, tree)
+            try:
+                samples.append(run_probe(tool, tree, syscalls))
+            finally:
+                shutil.rmtree(tree, ignore_errors=True)
+            print(f"  {tool} #{i + 1}: {samples[-1]['wall_s']:.3f}s", file=sys.stderr)
+
+        wall = statistics.median(s['wall_s'] for s in samples)
+        rss = [s['peak_rss_kb'] for s in samples if s['peak_rss_kb'] is not None]
+        calls = [s['syscalls'] for s in samples if s['syscalls'] is not None]
+        results[tool] = {
+            'files': files,
+            'wall_s': wall,
+            'wall_min_s': min(s['wall_s'] for s in samples),
+            'files_per_s': files / wall if wall > 0 else None,
+            'peak_rss_kb': max(rss) if rss else None,
+            'syscalls': int(statistics.median(calls)) if calls else None,
+        }
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'corpus': spec._asdict(),
+        },
+        'results': results,
+    }
\ No newline at end of file
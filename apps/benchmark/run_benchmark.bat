@@ -0,0 +1,2 @@
+cd /d %~dp0
+python run.py --output result.json
\ No newline at end of file
@@ -0,0 +1,116 @@
+# dev_common/git.py
+import argparse
+import os
+import subprocess
+import tempfile
+from typing import Iterator, List, Optional
+
+class GitError(RuntimeError):
+    pass
+
+def is_work_tree(root: str) -> bool:
+    try:
+        result = subprocess.run(
+            ['git', '-C', root, 'rev-parse', '--is-inside-work-tree'],
+            capture_output=True, text=True, timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0 and result.stdout.strip() == 'true'
+
+def iter_z(root: str, args: List[str], check: bool = False) -> Iterator[str]:
+    """
+    流式读取 git 以 NUL 分隔的输出 (-z)。
+    check 为 True 时 git 不存在或返回非零会抛出 GitError，否则静默结束。
+    """
+    # stderr 写入临时文件而非管道：只读 stdout 时，git 写满 stderr 管道会阻塞，双方互相等待
+    errors = tempfile.TemporaryFile() if check else None
+    try:
+        proc = subprocess.Popen(
+            ['git', '-C', root, *args],
+            stdout=subprocess.PIPE,
+            stderr=errors or subprocess.DEVNULL,
+        )
+    except OSError as e:
+        if errors:
+            errors.close()
+        if check:
+            raise GitError(f"无法运行 git: {e}") from e
+        return
+
+    try:
+        pending = b''
+        with proc:
+            while True:
+                chunk = proc.stdout.read(1 << 16)
+                if not chunk:
+                    break
+                pending += chunk
+                *names, pending = pending.split(b'\0')
+                for name in names:
+                    yield os.fsdecode(name)
+            if pending:
+                yield os.fsdecode(pending)
+        stderr = b''
+        if errors:
+            errors.seek(0)
+            stderr = errors.read()
+    finally:
+        if errors:
+            errors.close()
+    if check and proc.returncode != 0:
+        message = stderr.decode('utf-8', errors='ignore').strip()
+        raise GitError(f"git {' '.join(args)} 失败: {message}")
+
+def _parse_name_status(tokens: Iterator[str]) -> Iterator[str]:
+    """解析 `git diff --name-status -z` 的输出，产出新增/修改/重命名后的路径"""
+    for status in tokens:
+        path = next(tokens, None)
+        if path is None:
+            return
+        # 重命名 (R100) 与复制 (C75) 带有旧路径与新路径两项，取新路径
+        if status[:1] in ('R', 'C'):
+            path = next(tokens, None)
+            if path is None:
+                return
+        yield path
+
+def changed_files(root: str, ref: Optional[str] = None, staged: bool = False) -> List[str]:
+    """
+    返回相对 root 的、发生变化的文件路径 ('/' 分隔，只含 root 子树)：
+    - staged: 暂存区相对 HEAD 的变化
+    - 否则: 工作区相对 ref (默认 HEAD) 的变化，以及未被忽略的未跟踪文件
+    只统计新增、修改、重命名与复制 (重命名会改变期望的守卫与头部注释)，删除的文件不在其中。
+    """
+    if not is_work_tree(root):
+        raise GitError(f"'{root}' 不在 git 工作区中")
+
+    args = ['diff', '--name-status', '-z', '-M', '--relative', '--diff-filter=ACMR']
+    if staged:
+        args.append('--cached')
+    else:
+        args.append(ref or 'HEAD')
+    args.append('--')
+
+    paths = list(_parse_name_status(iter_z(root, args, check=True)))
+    if not staged:
+        paths.extend(iter_z(root, ['ls-files', '-z', '--others', '--exclude-standard'], check=True))
+
+    # 去重并保持 git 给出的顺序
+    return list(dict.fromkeys(paths))
+
+def unstaged_files(root: str) -> List[str]:
+    """
+    返回工作区相对暂存区仍有修改的文件 (相对 root，'/' 分隔)。
+    各工具读取的是工作区中的文件，--staged 时这些文件的检查结果不代表将要提交的内容。
+    """
+    return list(iter_z(root, ['diff', '--name-only', '-z', '--relative', '--'], check=True))
+
+def add_changed_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--changed", nargs="?", const="HEAD", metavar="REF",
+                       help="只处理工作区相对 REF (默认 HEAD) 新增、修改或重命名的文件，包括未跟踪文件 "
+                            "(写在目录参数之后，或写作 --changed=REF)")
+    group.add_argument("--staged", action="store_true",
+                       help="只处理暂存区中新增、修改或重命名的文件 (适合 pre-commit 钩子)；"
+                            "读取的是工作区中的内容，部分暂存的文件会给出提示")
\ No newline at end of file
@@ -0,0 +1,47 @@
+# dev_common/memo.py
+import os
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+Stamp = Tuple[int, int, int]
+
+def file_stamp(path: str) -> Optional[Stamp]:
+    """文件的 (mtime_ns, size, inode)；文件不存在或无法访问时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+class StampMemo:
+    """
+    以文件元数据为有效性依据的内存缓存：供常驻进程 (devd) 跨请求复用逐文件的处理结果。
+    文件被修改、替换或删除后元数据随之变化，旧结果自动失效；get 不会主动读取文件内容。
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Stamp, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, stamp: Optional[Stamp]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and stamp is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, stamp: Optional[Stamp], value: Any):
+        if stamp is None:
+            self._entries.pop(key, None)
+        else:
+            self._entries[key] = (stamp, value)
+
+    def discard(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
\ No newline at end of file
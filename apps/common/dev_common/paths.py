@@ -0,0 +1,19 @@
+# dev_common/paths.py
+import os
+import sys
+
+# apps/ 目录：各工具均以独立目录存放在这里
+APPS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 被 benchmark / unified / devd 直接导入的三个工具
+TOOLS = ('find_hpp', 'auto_comments', 'hpp_guard')
+
+def ensure_tool_paths():
+    """
+    将各工具目录加入 sys.path，使 pch_gen / header_tool / hpp_guard 可以直接导入。
+    调用方的 run.py 需先把 apps/common 加入 sys.path 才能导入本模块。
+    """
+    for name in TOOLS:
+        path = os.path.join(APPS_DIR, name)
+        if path not in sys.path:
+            sys.path.insert(0, path)
\ No newline at end of file
@@ -0,0 +1,193 @@
+# dev_common/profiling.py
+import argparse
+import contextlib
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+def peak_rss_kb() -> Optional[int]:
+    """当前进程的峰值常驻内存 (KB)；Windows 下没有 resource 模块，返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+class _Phase:
+    __slots__ = ('wall', 'cpu', 'calls')
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.calls = 0
+
+class Profiler:
+    """
+    按阶段累计墙钟与 CPU 时间，并统计处理的文件数、字节数、最慢的 N 个文件与峰值内存。
+    同名阶段可多次进入 (如逐文件的 read/parse)，耗时累加。
+    可在多个线程中同时使用：阶段 CPU 时间按线程计量，各线程之和可能超过总墙钟时间。
+    """
+    enabled = True
+
+    def __init__(self, tool: str, slowest: int = 10, summary: bool = True,
+                 json_path: str = None, pstats_path: str = None):
+        self.tool = tool
+        self.phases: Dict[str, _Phase] = {}
+        self.files = 0
+        self.bytes = 0
+        self._top = slowest
+        self._slowest: List[Tuple[float, str]] = []  # 最小堆，只保留最慢的 N 个
+        self._summary = summary
+        self._json_path = json_path
+        self._pstats_path = pstats_path
+        self._cprofile = None
+        if pstats_path:
+            # cProfile 只在需要 pstats 时加载
+            import cProfile
+            self._cprofile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    now = staticmethod(time.perf_counter)
+
+    def _add(self, name: str, wall: float, cpu: float):
+        with self._lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                phase = self.phases[name] = _Phase()
+            phase.wall += wall
+            phase.cpu += cpu
+            phase.calls += 1
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def iterate(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """包装流式产出的迭代器 (如目录遍历)，只统计产出元素本身的耗时，不含调用方处理元素的时间"""
+        it = iter(iterable)
+        while True:
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            try:
+                item = next(it)
+            except StopIteration:
+                self._add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+                return
+            self._add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+            yield item
+
+    def file_done(self, path: str, started: float, nbytes: int = None):
+        """记录单个文件的处理耗时；未给出字节数时读取文件大小"""
+        elapsed = time.perf_counter() - started
+        if nbytes is None:
+            try:
+                nbytes = os.stat(path).st_size
+            except OSError:
+                nbytes = 0
+        with self._lock:
+            self.files += 1
+            self.bytes += nbytes
+            if self._top <= 0:
+                return
+            if len(self._slowest) < self._top:
+                heapq.heappush(self._slowest, (elapsed, path))
+            else:
+                heapq.heappushpop(self._slowest, (elapsed, path))
+
+    def report(self) -> dict:
+        return {
+            'tool': self.tool,
+            'wall_s': time.perf_counter() - self._wall0,
+            'cpu_s': time.process_time() - self._cpu0,
+            'files': self.files,
+            'bytes': self.bytes,
+            'peak_rss_kb': peak_rss_kb(),
+            'phases': {name: {'wall_s': p.wall, 'cpu_s': p.cpu, 'calls': p.calls}
+                       for name, p in self.phases.items()},
+            'slowest': [{'path': path, 'ms': elapsed * 1000}
+                        for elapsed, path in sorted(self._slowest, reverse=True)],
+            'pstats': self._pstats_path,
+        }
+
+    def _print_summary(self, data: dict, stream):
+        rss = data['peak_rss_kb']
+        print(f"[profile] {self.tool}: 总耗时 {data['wall_s']:.3f} s (CPU {data['cpu_s']:.3f} s)，"
+              f"文件 {data['files']} 个 / {data['bytes'] / 1024:.1f} KB，"
+              f"峰值内存 {rss if rss is not None else '-'} KB", file=stream)
+        if data['phases']:
+            print(f"[profile] {'阶段':<12}{'墙钟(ms)':>12}{'CPU(ms)':>12}{'次数':>10}", file=stream)
+            for name, p in data['phases'].items():
+                print(f"[profile] {name:<14}{p['wall_s'] * 1000:>12.1f}{p['cpu_s'] * 1000:>12.1f}"
+                      f"{p['calls']:>12}", file=stream)
+        if data['slowest']:
+            print(f"[profile] 最慢的 {len(data['slowest'])} 个文件:", file=stream)
+            for item in data['slowest']:
+                print(f"[profile] {item['ms']:>10.2f} ms  {item['path']}", file=stream)
+
+    def finish(self):
+        """停止采样并输出结果：汇总打印到 stderr、写入 metrics JSON 与 pstats 文件"""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._pstats_path)
+        data = self.report()
+        if self._summary:
+            self._print_summary(data, sys.stderr)
+        if self._json_path:
+            with open(self._json_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+class NullProfiler:
+    """未启用性能分析时使用：所有钩子都是空操作，热点循环中的开销只有一次方法调用"""
+    enabled = False
+
+    _NULL_CONTEXT = contextlib.nullcontext()
+
+    def now(self) -> float:
+        return 0.0
+
+    def phase(self, name: str):
+        return self._NULL_CONTEXT
+
+    def iterate(self, name: str, iterable: Iterable[T]) -> Iterable[T]:
+        return iterable
+
+    def file_done(self, path: str, started: float, nbytes: int = None):
+        pass
+
+    def finish(self):
+        pass
+
+NULL_PROFILER = NullProfiler()
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("性能分析")
+    group.add_argument("--profile", action="store_true",
+                       help="运行结束后在 stderr 打印各阶段耗时、文件数、字节数、最慢文件与峰值内存")
+    group.add_argument("--metrics-json", metavar="PATH", help="将上述性能数据写入 JSON 文件")
+    group.add_argument("--pstats", metavar="PATH", help="同时启用 cProfile，并将结果写入 pstats 文件")
+    group.add_argument("--profile-top", type=int, default=10, metavar="N",
+                       help="记录最慢的 N 个文件 (默认: 10)")
+
+def create_profiler(args: argparse.Namespace, tool: str):
+    """根据 add_profile_arguments 解析出的参数创建分析器；均未指定时返回 NULL_PROFILER"""
+    if not (args.profile or args.metrics_json or args.pstats):
+        return NULL_PROFILER
+    return Profiler(tool, slowest=args.profile_top, summary=args.profile,
+                    json_path=args.metrics_json, pstats_path=args.pstats)
\ No newline at end of file
@@ -0,0 +1,260 @@
+# dev_common/walker.py
+import fnmatch
+import os
+import itertools
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import git
+
+# 工具级默认排除目录 (支持 fnmatch 通配)，在进入目录前即被剪枝
+DEFAULT_EXCLUDE_DIRS = (
+    '.git', '.svn', '.hg', '.vs', '.vscode', '.idea', '.cache',
+    'build', 'out', 'third_party', 'node_modules',
+    'CMakeFiles', 'cmake-build-*',
+)
+
+# 含有该文件的目录视为 CMake 构建树
+_CMAKE_CACHE = 'CMakeCache.txt'
+
+class _IgnoreRule:
+    def __init__(self, regex: re.Pattern, negate: bool, dir_only: bool, basename_only: bool):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+        self.basename_only = basename_only
+
+def _translate(pattern: str) -> str:
+    """将 gitignore 通配模式转换为正则 (* 不跨越 '/', ** 可跨越任意层目录)"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            out.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape('['))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(out)
+
+def parse_gitignore(text: str) -> List[_IgnoreRule]:
+    rules = []
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # 不含 '/' 的模式匹配任意层级的文件名，否则相对 .gitignore 所在目录匹配
+        basename_only = '/' not in line
+        line = line.lstrip('/')
+        rules.append(_IgnoreRule(re.compile(f'^{_translate(line)}$'), negate, dir_only, basename_only))
+    return rules
+
+class SourceWalker:
+    """
+    忽略规则感知的源码遍历器：
+    - 工具级排除目录与 CMake 构建树在进入前即被剪枝
+    - 遵循各级目录中的 .gitignore
+    - 根目录位于 git 工作区时，直接使用 `git ls-files -z` 列出文件，耗时只与受控源码数量相关
+    结果以生成器流式产出，不会一次性物化全部路径。
+    """
+
+    def __init__(self, root: str, extensions: Tuple[str, ...],
+                 exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+                 use_ignore: bool = True):
+        """
+        use_ignore: 为 False 时不做任何过滤 (不读 .gitignore、不走 git 快速路径、不排除默认目录)。
+        """
+        self.root = os.path.abspath(root)
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.exclude_dirs = tuple(exclude_dirs) if use_ignore else ()
+        self.use_ignore = use_ignore
+        self._rules: Dict[str, List[_IgnoreRule]] = {}
+
+    # === 目录排除判断 ===
+
+    def _dir_name_excluded(self, name: str) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.exclude_dirs)
+
+    def _rules_of(self, directory: str) -> List[_IgnoreRule]:
+        rules = self._rules.get(directory)
+        if rules is None:
+            rules = []
+            if self.use_ignore:
+                try:
+                    with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='ignore') as f:
+                        rules = parse_gitignore(f.read())
+                except OSError:
+                    pass
+            self._rules[directory] = rules
+        return rules
+
+    def _ignored(self, path: str, is_dir: bool) -> bool:
+        """按从根目录到父目录的顺序应用各级 .gitignore，最后匹配的规则生效"""
+        rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+        if rel.startswith('..'):
+            return False
+        parts = rel.split('/')
+        ignored = False
+        directory = self.root
+        for depth in range(len(parts)):
+            sub_rel = '/'.join(parts[depth:])
+            for rule in self._rules_of(directory):
+                if rule.dir_only and not is_dir:
+                    continue
+                target = parts[-1] if rule.basename_only else sub_rel
+                if rule.regex.match(target):
+                    ignored = not rule.negate
+            directory = os.path.join(directory, parts[depth])
+        return ignored
+
+    def is_excluded_dir(self, path: str) -> bool:
+        if not self.use_ignore:
+            return False
+        if self._dir_name_excluded(os.path.basename(path)):
+            return True
+        if os.path.isfile(os.path.join(path, _CMAKE_CACHE)):
+            return True
+        return self._ignored(path, True)
+
+    def tracks(self, path: str) -> bool:
+        """
+        单个文件是否会出现在 files() 的结果中 (扩展名、排除目录与 .gitignore 规则相同)，
+        供监听模式逐个判断变化事件；不检查文件是否存在。
+        """
+        path = os.path.abspath(path)
+        if not path.lower().endswith(self.extensions):
+            return False
+        if os.path.relpath(path, self.root).startswith('..'):
+            return False
+        if not self.use_ignore:
+            return True
+        directory = os.path.dirname(path)
+        while directory != self.root:
+            if self.is_excluded_dir(directory):
+                return False
+            directory = os.path.dirname(directory)
+        return not self._ignored(path, False)
+
+    # === 遍历 ===
+
+    def dirs(self, start: Optional[str] = None) -> Iterator[str]:
+        """产出 start (默认根目录) 下全部未被排除的目录，含 start 本身"""
+        start = os.path.abspath(start or self.root)
+        if start != self.root and self.is_excluded_dir(start):
+            return
+        stack = [start]
+        while stack:
+            directory = stack.pop()
+            yield directory
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False) and not self.is_excluded_dir(entry.path):
+                            subdirs.append(entry.path)
+            except OSError:
+                continue
+            stack.extend(reversed(subdirs))
+
+    def _walk(self) -> Iterator[str]:
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.is_excluded_dir(entry.path):
+                                subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(self.extensions):
+                            if not (self.use_ignore and self._ignored(entry.path, False)):
+                                yield entry.path
+            except OSError:
+                continue
+            # 逆序压栈，保证与 os.walk 相同的自顶向下、按目录项顺序的遍历
+            stack.extend(reversed(subdirs))
+
+    def _git_dir_excluded(self, rel_dir: str, memo: Dict[str, bool]) -> bool:
+        """git 不会忽略已受控的文件，也不认识 CMake 构建树，需按目录自行过滤 (每个目录只判断一次)"""
+        if not rel_dir:
+            return False
+        excluded = memo.get(rel_dir)
+        if excluded is None:
+            parent, _, name = rel_dir.rpartition('/')
+            excluded = (self._git_dir_excluded(parent, memo)
+                        or self._dir_name_excluded(name)
+                        or os.path.isfile(os.path.join(self.root, rel_dir, _CMAKE_CACHE)))
+            memo[rel_dir] = excluded
+        return excluded
+
+    def filter_relative(self, rel_paths: Iterable[str]) -> Iterator[str]:
+        """过滤 git 给出的相对路径 ('/' 分隔)：保留扩展名匹配且不在排除目录中的文件，产出绝对路径"""
+        memo: Dict[str, bool] = {}
+        for rel in rel_paths:
+            if not rel.lower().endswith(self.extensions):
+                continue
+            if self.use_ignore and self._git_dir_excluded(rel.rpartition('/')[0], memo):
+                continue
+            yield os.path.join(self.root, *rel.split('/'))
+
+    def _git_files(self) -> Iterator[str]:
+        deleted = set(git.iter_z(self.root, ['ls-files', '-z', '--deleted']))
+        # 子模块在 --cached 中只是一个 gitlink 目录项，需要 --recurse-submodules 才能列出其中的文件；
+        # 该选项不能与 --others 同时使用，因此分两次列出 (顺序与 --cached --others 一致：未跟踪的文件在前)
+        others = git.iter_z(self.root, ['ls-files', '-z', '--others', '--exclude-standard'])
+        cached = git.iter_z(self.root, ['ls-files', '-z', '--cached', '--recurse-submodules'])
+        return self.filter_relative(rel for rel in itertools.chain(others, cached) if rel not in deleted)
+
+    def changed_files(self, ref: Optional[str] = None, staged: bool = False) -> List[str]:
+        """只列出 git 报告有变化的文件 (见 git.changed_files)，同样应用扩展名与排除目录过滤"""
+        return [path for path in self.filter_relative(git.changed_files(self.root, ref, staged))
+                if os.path.isfile(path)]
+
+    def unstaged_files(self) -> List[str]:
+        """工作区相对暂存区仍有修改的文件 (见 git.unstaged_files)，同样应用扩展名与排除目录过滤"""
+        return list(self.filter_relative(git.unstaged_files(self.root)))
+
+    def files(self) -> Iterator[str]:
+        if self.use_ignore and git.is_work_tree(self.root):
+            return self._git_files()
+        return self._walk()
+
+def walk_source_files(root: str, extensions: Tuple[str, ...],
+                      exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+                      use_ignore: bool = True) -> Iterator[str]:
+    """便捷入口：等价于 SourceWalker(...).files()"""
+    return SourceWalker(root, extensions, exclude_dirs, use_ignore).files()
\ No newline at end of file
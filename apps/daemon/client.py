@@ -0,0 +1,59 @@
+"""
+devd 的轻量客户端：把工具参数转发给常驻进程并原样输出结果，退出码与直接运行工具一致。
+用法:
+  python client.py <find_hpp|auto_comments|hpp_guard> [工具参数...]
+  python client.py --status | --stop
+常驻进程未运行时回退为直接执行对应工具的 run.py。
+启动时间是这里的首要指标：除协议模块外只导入 os / sys，不要在此导入任何工具模块。
+"""
+import os
+import sys
+
+# 各工具共享的 dev_common 位于 apps/common (paths 模块只依赖 os / sys)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from dev_common.paths import APPS_DIR, TOOLS
+from devd.protocol import connect, default_socket_path, request
+
+def _fallback(tool: str, argv):
+    script = os.path.join(APPS_DIR, tool, 'run.py')
+    os.execv(sys.executable, [sys.executable, script, *argv])
+
+def main() -> int:
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ('-h', '--help'):
+        print(__doc__.strip())
+        return 0 if argv else 2
+
+    socket_path = default_socket_path()
+    if argv[0] in ('--status', '--stop'):
+        try:
+            sock = connect(socket_path)
+        except OSError:
+            print(f"devd 未运行 ({socket_path})", file=sys.stderr)
+            return 1
+        message = [argv[0][2:]]
+    elif argv[0] in TOOLS:
+        try:
+            sock = connect(socket_path)
+        except OSError:
+            _fallback(argv[0], argv[1:])
+        message = ['run', argv[0], os.getcwd(), *argv[1:]]
+    else:
+        print(f"未知工具: {argv[0]} (可选: {', '.join(TOOLS)})", file=sys.stderr)
+        return 2
+
+    # 请求已经发出后不再回退：修复模式下重复执行并不安全，只报告错误
+    try:
+        code, stdout, stderr = request(sock, message)
+    except (OSError, ValueError) as e:
+        print(f"devd 请求失败: {e}", file=sys.stderr)
+        return 1
+    finally:
+        sock.close()
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return int(code)
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,35 @@
+# devd/main.py
+import argparse
+import socket
+import sys
+
+from .protocol import default_socket_path
+from .server import DevServer
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="dev-tools 常驻进程：保留 find_hpp / auto_comments / hpp_guard 的已加载模块与逐文件结果，"
+                    "由 client.py 通过 Unix 套接字转发请求。",
+        epilog="示例: python run.py --idle-timeout 3600 &  然后  python client.py hpp_guard ./src"
+    )
+    parser.add_argument("--socket", default=default_socket_path(),
+                        help="监听的 Unix 套接字路径 (默认: $DEVD_SOCKET、$XDG_RUNTIME_DIR/devd.sock 或 /tmp/devd-<uid>.sock)")
+    parser.add_argument("--idle-timeout", type=float, default=0, metavar="SECONDS",
+                        help="超过该时长没有请求时自动退出 (默认: 0，不退出)")
+    return parser.parse_args()
+
+def run():
+    args = parse_arguments()
+    if not hasattr(socket, 'AF_UNIX'):
+        print("错误: 当前平台不支持 Unix 套接字，请直接运行各工具的 run.py")
+        sys.exit(1)
+
+    server = DevServer(args.socket, idle_timeout=args.idle_timeout)
+    server.preload()
+    try:
+        server.serve_forever()
+    except RuntimeError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
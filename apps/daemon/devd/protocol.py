@@ -0,0 +1,76 @@
+# devd/protocol.py
+"""
+客户端与常驻进程之间的协议：每个连接只处理一个请求，消息是一组字符串。
+每个字符串编码为 netstring (`<字节数>:<UTF-8 内容>`)，发送完毕后关闭写端，对端读到 EOF 即得到完整消息。
+- 请求: [op, ...]；op 为 run 时为 ['run', 工具, 工作目录, *工具参数]，另有 ['status'] 与 ['stop']
+- 响应: [退出码, stdout, stderr]
+本模块同时被 client.py 导入，启动时间优先：不使用 json (会导入 re) 与 socket (会导入 enum、selectors)，
+直接使用 C 实现的 _socket；常驻进程传入的 socket.socket 是其子类，接口相同。
+同理注解使用内置的 list 而不导入 typing。
+"""
+import _socket
+import os
+
+def default_socket_path() -> str:
+    """$DEVD_SOCKET，否则为 $XDG_RUNTIME_DIR/devd.sock，再否则为 /tmp/devd-<uid>.sock"""
+    path = os.environ.get('DEVD_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'devd.sock')
+    return os.path.join('/tmp', f'devd-{os.getuid()}.sock')
+
+def connect(socket_path: str) -> _socket.socket:
+    """连接常驻进程；平台不支持 Unix 套接字、进程未运行或套接字文件残留时抛出 OSError"""
+    family = getattr(_socket, 'AF_UNIX', None)
+    if family is None:
+        raise OSError("当前平台不支持 Unix 套接字")
+    sock = _socket.socket(family, _socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def encode_fields(fields: list) -> bytes:
+    # surrogateescape：命令行参数与路径中无法按 UTF-8 解码的字节原样往返
+    parts = []
+    for field in fields:
+        data = field.encode('utf-8', 'surrogateescape')
+        parts.append(b'%d:' % len(data))
+        parts.append(data)
+    return b''.join(parts)
+
+def decode_fields(data: bytes) -> list:
+    fields = []
+    pos = 0
+    while pos < len(data):
+        colon = data.index(b':', pos)
+        start = colon + 1
+        end = start + int(data[pos:colon])
+        if end > len(data):
+            raise ValueError("消息不完整")
+        fields.append(data[start:end].decode('utf-8', 'surrogateescape'))
+        pos = end
+    return fields
+
+def send_message(sock: _socket.socket, fields: list):
+    sock.sendall(encode_fields(fields))
+    sock.shutdown(_socket.SHUT_WR)
+
+def recv_message(sock: _socket.socket) -> list:
+    chunks = []
+    while True:
+        chunk = sock.recv(1 << 16)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    if not chunks:
+        raise ValueError("连接在收到完整消息前关闭")
+    return decode_fields(b''.join(chunks))
+
+def request(sock: _socket.socket, fields: list) -> list:
+    send_message(sock, fields)
+    return recv_message(sock)
\ No newline at end of file
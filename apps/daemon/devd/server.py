@@ -0,0 +1,183 @@
+# devd/server.py
+import io
+import os
+import socket
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, Dict, List
+
+from dev_common.memo import StampMemo
+from dev_common.paths import TOOLS
+from .protocol import connect, recv_message, send_message
+
+# 读取请求的超时 (秒)：异常的客户端不能一直占用单线程的常驻进程
+_REQUEST_TIMEOUT = 30
+
+def _response(code: int, stdout: str = '', stderr: str = '') -> List[str]:
+    return [str(code), stdout, stderr]
+
+def _exit_code(exc: SystemExit, err: io.StringIO) -> int:
+    """与解释器处理 sys.exit 的方式一致：None 为 0，字符串输出到 stderr 并视为 1"""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=err)
+    return 1
+
+class DevServer:
+    """
+    常驻进程：三个工具的模块只导入一次，逐文件结果保存在内存中跨请求复用。
+    - find_hpp: 以 (缓存路径, 解析器特征串) 区分的内存增量索引，代替每次打开 SQLite 缓存
+    - hpp_guard: 元数据未变化的文件复用上次的 MATCH / SKIP 结果
+    - auto_comments: 记住已符合规范的文件，元数据未变化时不再读取
+    请求在同一线程中依次执行：工具会切换工作目录并向 stdout 输出，二者都是进程级状态。
+    """
+
+    def __init__(self, socket_path: str, idle_timeout: float = 0):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.find_hpp_memory: Dict = {}
+        self.memos = {'auto_comments': StampMemo(), 'hpp_guard': StampMemo()}
+        self.requests = 0
+        self._started = time.time()
+        self._running = False
+        self._entries: Dict[str, Callable[[List[str]], None]] = {}
+
+    def preload(self):
+        """启动时导入全部工具，首个请求不再承担导入开销"""
+        for tool in TOOLS:
+            self._entry(tool)
+
+    def _entry(self, tool: str) -> Callable[[List[str]], None]:
+        entry = self._entries.get(tool)
+        if entry is not None:
+            return entry
+        if tool == 'find_hpp':
+            from pch_gen.main import run as find_hpp
+            # 内存索引所在的模块在 find_hpp 中延迟导入，这里提前加载
+            import pch_gen.io.cache
+            entry = lambda argv: find_hpp(argv, memory=self.find_hpp_memory)
+        elif tool == 'auto_comments':
+            from header_tool.cli import main as auto_comments
+            entry = lambda argv: auto_comments(argv, memo=self.memos['auto_comments'])
+        else:
+            from hpp_guard.main import run as hpp_guard
+            entry = lambda argv: hpp_guard(argv, memo=self.memos['hpp_guard'])
+        self._entries[tool] = entry
+        return entry
+
+    def _bind(self) -> socket.socket:
+        if os.path.exists(self.socket_path):
+            # 能连上说明已有实例在运行；否则是上次异常退出残留的套接字文件
+            try:
+                connect(self.socket_path).close()
+            except OSError:
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"devd 已在运行: {self.socket_path}")
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # 套接字只允许当前用户访问：请求可以修改用户有权写入的任何文件
+        umask = os.umask(0o077)
+        try:
+            server.bind(self.socket_path)
+        except OSError:
+            server.close()
+            raise
+        finally:
+            os.umask(umask)
+        server.listen(16)
+        return server
+
+    def serve_forever(self):
+        server = self._bind()
+        print(f"[devd] 监听 {self.socket_path} (pid {os.getpid()})", file=sys.stderr)
+        self._running = True
+        try:
+            with server:
+                server.settimeout(self.idle_timeout or None)
+                while self._running:
+                    try:
+                        conn, _ = server.accept()
+                    except socket.timeout:
+                        print(f"[devd] 空闲超过 {self.idle_timeout:g} s，退出", file=sys.stderr)
+                        break
+                    with conn:
+                        self._handle(conn)
+        finally:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _handle(self, conn: socket.socket):
+        conn.settimeout(_REQUEST_TIMEOUT)
+        try:
+            fields = recv_message(conn)
+        except (OSError, ValueError) as e:
+            print(f"[devd] 无效请求: {e}", file=sys.stderr)
+            return
+        response = self.dispatch(fields)
+        try:
+            conn.settimeout(None)
+            send_message(conn, response)
+        except OSError:
+            # 客户端已断开 (例如被 Ctrl+C 中断)，结果无人接收
+            pass
+
+    def dispatch(self, fields: List[str]) -> List[str]:
+        op = fields[0] if fields else None
+        if op == 'run' and len(fields) >= 3:
+            return self.run_tool(fields[1], fields[3:], fields[2])
+        if op == 'status':
+            return _response(0, self.status())
+        if op == 'stop':
+            self._running = False
+            return _response(0, "devd 已停止\n")
+        return _response(2, stderr=f"devd: 未知请求 {op!r}\n")
+
+    def run_tool(self, tool: str, argv: List[str], cwd: str) -> List[str]:
+        """在请求方的工作目录中执行工具，捕获其 stdout / stderr 与退出码"""
+        if tool not in TOOLS:
+            return _response(2, stderr=f"devd: 未知工具 {tool!r}，可选: {', '.join(TOOLS)}\n")
+        if tool == 'find_hpp' and any(arg.startswith('--w') and '--watch'.startswith(arg) for arg in argv):
+            return _response(2, stderr="devd: --watch 会一直占用常驻进程，请直接运行 find_hpp\n")
+
+        out, err = io.StringIO(), io.StringIO()
+        code = 0
+        started = time.perf_counter()
+        previous = os.getcwd()
+        try:
+            os.chdir(cwd)
+            with redirect_stdout(out), redirect_stderr(err):
+                try:
+                    self._entry(tool)(argv)
+                except SystemExit as e:
+                    code = _exit_code(e, err)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+        except OSError as e:
+            print(f"devd: 无法切换到工作目录 {cwd}: {e}", file=err)
+            code = 1
+        finally:
+            os.chdir(previous)
+
+        self.requests += 1
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[devd] {tool} {' '.join(argv)} -> {code} ({elapsed:.1f} ms)", file=sys.stderr)
+        return _response(code, out.getvalue(), err.getvalue())
+
+    def status(self) -> str:
+        indexed = sum(len(entries) for entries in self.find_hpp_memory.values())
+        memos = self.memos
+        return (
+            f"devd pid {os.getpid()}，套接字 {self.socket_path}\n"
+            f"运行 {time.time() - self._started:.0f} s，已处理 {self.requests} 个请求\n"
+            f"find_hpp 内存索引: {len(self.find_hpp_memory)} 个，共 {indexed} 个文件\n"
+            f"hpp_guard 缓存: {len(memos['hpp_guard'])} 个文件 "
+            f"(命中 {memos['hpp_guard'].hits} / 未命中 {memos['hpp_guard'].misses})\n"
+            f"auto_comments 缓存: {len(memos['auto_comments'])} 个文件 "
+            f"(命中 {memos['auto_comments'].hits} / 未命中 {memos['auto_comments'].misses})\n"
+        )
\ No newline at end of file
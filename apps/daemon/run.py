@@ -0,0 +1,17 @@
+import os
+import signal
+import sys
+
+# 各工具共享的 dev_common 位于 apps/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from dev_common.paths import ensure_tool_paths
+
+ensure_tool_paths()
+
+from devd.main import run
+
+if __name__ == "__main__":
+    # SIGTERM 与 Ctrl+C 同样处理，退出前删除套接字文件
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    run()
\ No newline at end of file
@@ -10,6 +10,21 @@ DEFAULT_THIRD_PARTY_IDENTIFIERS = [
     "windows.h",
 ]
 
+# 平台相关头文件的条件编译守卫：header -> 宏名 (写成 #ifdef) 或 #if 表达式。
+# 生成的 PCH 中这些头文件会被对应的守卫包裹，使同一份 PCH 可以在其他平台上编译。
+PLATFORM_GUARDS = {
+    "windows.h": "_WIN32",
+}
+
+# 增量索引缓存默认位于用户缓存目录 (~/.cache/find_hpp) 的此子目录中，每个扫描根目录一个文件
+INDEX_CACHE_SUBDIR = "index"
+
+# 参与扫描的文件后缀；其中源文件后缀视为独立的翻译单元 (TU)
+SCAN_EXTENSIONS = ('.cpp', '.hpp', '.h', '.cc', '.cxx', '.c')
+SOURCE_EXTENSIONS = ('.cpp', '.cc', '.cxx', '.c')
+# C 语言翻译单元的后缀 (unity 构建时与 C++ 分开合并)
+C_SOURCE_EXTENSIONS = ('.c',)
+
 # C++ 标准库头文件列表 (C++17/23)
 CPP_STANDARD_HEADERS = {
     'iostream', 'fstream', 'sstream', 'iomanip', 'cstdio', 'string',
@@ -20,4 +35,47 @@ CPP_STANDARD_HEADERS = {
     'stdexcept', 'exception', 'cassert', 'type_traits', 'iterator', 'thread',
     'mutex', 'atomic', 'future', 'condition_variable', 'filesystem', 'regex',
     'cstdint', 'limits', 'cctype', 'locale', 'ctime', 'print', 'format'
-}
\ No newline at end of file
+}
+
+# 索引系统头文件时额外进入的子目录 (POSIX 等)；其余子目录通常属于独立安装的第三方库
+SYSTEM_HEADER_SUBDIRS = ('sys', 'arpa', 'net', 'netinet', 'experimental')
+
+# C 标准库与 POSIX 头文件。系统目录 (如 /usr/include) 中只有这些以及编译器自带 C++ 目录中的头文件
+# 归为标准库；同一目录中的其他头文件 (zlib.h、expat.h、glibc 扩展 error.h 等) 归为平台与第三方库
+C_SYSTEM_HEADERS = frozenset({
+    # C17
+    'assert.h', 'complex.h', 'ctype.h', 'errno.h', 'fenv.h', 'float.h', 'inttypes.h', 'iso646.h',
+    'limits.h', 'locale.h', 'math.h', 'setjmp.h', 'signal.h', 'stdalign.h', 'stdarg.h', 'stdatomic.h',
+    'stdbool.h', 'stddef.h', 'stdint.h', 'stdio.h', 'stdlib.h', 'stdnoreturn.h', 'string.h', 'tgmath.h',
+    'threads.h', 'time.h', 'uchar.h', 'wchar.h', 'wctype.h',
+    # POSIX.1-2017
+    'aio.h', 'arpa/inet.h', 'cpio.h', 'dirent.h', 'dlfcn.h', 'fcntl.h', 'fmtmsg.h', 'fnmatch.h', 'ftw.h',
+    'glob.h', 'grp.h', 'iconv.h', 'langinfo.h', 'libgen.h', 'monetary.h', 'mqueue.h', 'ndbm.h',
+    'net/if.h', 'netdb.h', 'netinet/in.h', 'netinet/tcp.h', 'nl_types.h', 'poll.h', 'pthread.h', 'pwd.h',
+    'regex.h', 'sched.h', 'search.h', 'semaphore.h', 'spawn.h', 'strings.h', 'stropts.h', 'syslog.h',
+    'tar.h', 'termios.h', 'trace.h', 'ulimit.h', 'unistd.h', 'utime.h', 'utmpx.h', 'wordexp.h',
+    'sys/ipc.h', 'sys/mman.h', 'sys/msg.h', 'sys/resource.h', 'sys/select.h', 'sys/sem.h', 'sys/shm.h',
+    'sys/socket.h', 'sys/stat.h', 'sys/statvfs.h', 'sys/time.h', 'sys/times.h', 'sys/types.h',
+    'sys/uio.h', 'sys/un.h', 'sys/utsname.h', 'sys/wait.h',
+})
+
+# 验证模式：预计净节省低于该值 (毫秒) 的头文件视为计时噪声并剔除；
+# 实际阈值还不低于 使用该头文件的 TU 数 × 重复计时的波动
+VALIDATE_MIN_SAVING_MS = 1.0
+
+# 多 PCH 分区：TU 归入同一组所需的最低 Jaccard 相似度、
+# 头文件进入组 PCH 所需的最低 TU 占比、单独生成 PCH 的组的最少 TU 数
+PARTITION_SIMILARITY = 0.5
+PARTITION_MIN_SHARE = 0.25
+PARTITION_MIN_TUS = 2
+PARTITION_MANIFEST = "pch_manifest.json"
+
+# 改动频率 (churn) 折算：统计窗口 (git 日期) 与折算权重，
+# 项目头文件的排序分数为 使用次数 / (1 + 权重 × 窗口内改动次数)
+CHURN_SINCE = "6 months ago"
+CHURN_WEIGHT = 1.0
+
+# Unity 构建：每个 unity 文件的默认行数上限 (0 表示不限制) 与生成的 CMake 列表文件名
+UNITY_MAX_LINES = 5000
+UNITY_MAX_BYTES = 0
+UNITY_CMAKE_LIST = "unity_sources.cmake"
\ No newline at end of file
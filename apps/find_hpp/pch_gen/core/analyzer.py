@@ -11,8 +11,14 @@ class PchSection(NamedTuple):
     category_type: str            # 'std', '3rd', 'proj'
 
 class PchReport:
-    def __init__(self):
+    def __init__(self, metric_label: str = "使用次数"):
         self.sections: List[PchSection] = []
+        # 条目数值的含义 (使用次数 / 编译代价 ...)，由 writer 写入注释
+        self.metric_label = metric_label
+        # 附加说明：header -> 备注文本
+        self.notes: Dict[str, str] = {}
+        # 平台相关头文件的条件编译守卫：header -> 宏名或 #if 表达式
+        self.guards: Dict[str, str] = {}
 
     def add_section(self, section: PchSection):
         self.sections.append(section)
@@ -20,12 +26,16 @@ class PchReport:
 # === 核心分析逻辑 ===
 
 class ReportGenerator:
-    def __init__(self, classifier: HeaderClassifier):
+    def __init__(self, classifier: HeaderClassifier, platform_guards: Dict[str, str] = None,
+                 include_project: bool = True):
         """
-        依赖注入：通过构造函数传入分类器。
+        依赖注入：通过构造函数传入分类器与平台守卫表。
         这样 analyzer 就不需要知道具体的标准库列表或配置。
+        include_project 为 False 时报告不含项目头文件部分。
         """
         self.classifier = classifier
+        self.platform_guards = platform_guards or {}
+        self.include_project = include_project
 
     def _get_root_dir(self, path: str) -> str:
         """提取顶级目录，用于排序分组"""
@@ -42,7 +52,9 @@ class ReportGenerator:
         """
         return sorted(items, key=lambda x: (self._get_root_dir(x[0]), -x[1], x[0]))
 
-    def generate_report(self, header_counts: List[Tuple[str, int]]) -> PchReport:
+    def generate_report(self, header_counts: List[Tuple[str, int]],
+                        metric_label: str = "使用次数",
+                        notes: Dict[str, str] = None) -> PchReport:
         """
         主流程：分类 -> 排序 -> 封装报告
         """
@@ -59,7 +71,10 @@ class ReportGenerator:
             categorized[category].append((header, count))
 
         # 3. 构建报告对象
-        report = PchReport()
+        report = PchReport(metric_label)
+        if notes:
+            report.notes.update(notes)
+        report.guards.update(self.platform_guards)
         
         # 添加标准库部分
         report.add_section(PchSection(
@@ -78,6 +93,8 @@ class ReportGenerator:
         ))
 
         # 添加项目代码部分
+        if not self.include_project:
+            return report
         report.add_section(PchSection(
             title="3. 项目内部稳定且常用的核心头文件",
             description="建议仅包含极少修改的核心接口。",
@@ -0,0 +1,57 @@
+# core/churn.py
+import posixpath
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+class ChurnIndex:
+    """
+    按 #include 写法查找头文件的改动次数。
+    写法只是相对某个包含目录的路径，这里按 '/' 为界匹配仓库路径的后缀；
+    多个文件匹配同一写法时取改动最多的一个 (保守估计)。
+    """
+
+    def __init__(self, changes: Dict[str, int]):
+        self._by_suffix: Dict[str, int] = {}
+        for path, count in changes.items():
+            parts = path.split('/')
+            for i in range(len(parts)):
+                suffix = '/'.join(parts[i:])
+                if count > self._by_suffix.get(suffix, 0):
+                    self._by_suffix[suffix] = count
+
+    def changes(self, spelling: str) -> int:
+        path = posixpath.normpath(spelling.replace('\\', '/'))
+        while path.startswith('../'):
+            path = path[3:]
+        return self._by_suffix.get(path, 0)
+
+def rank_with_churn(stats: Counter, is_project: Callable[[str], bool], index: ChurnIndex,
+                    top: int, weight: float, tu_count: int, commits: int) -> Tuple[List[Tuple[str, int]], Dict[str, str]]:
+    """
+    项目头文件按 "使用次数 / (1 + weight × 改动次数)" 折算后参与排序，标准库与第三方库保持原始使用次数。
+    返回 (top_items, notes)：top_items 中的数值仍为使用次数；notes 记录项目头文件的改动次数与预计重编代价。
+
+    重编代价：头文件放入 PCH 后，每次改动都会使全部 tu_count 个 TU 重新编译，
+    而不放入时只有直接包含它的 TU 需要重编 (以使用次数近似)，二者之差乘以改动次数即为窗口内额外重编的 TU 数。
+    """
+    scored = []
+    changes_of: Dict[str, int] = {}
+    for order, (header, count) in enumerate(stats.most_common()):
+        score = count
+        if is_project(header):
+            changes = index.changes(header)
+            changes_of[header] = changes
+            score = count / (1 + weight * changes)
+        scored.append((-score, order, header, count))
+    scored.sort()
+
+    top_items = [(header, count) for _, _, header, count in scored[:top]]
+    notes = {}
+    for header, count in top_items:
+        if header not in changes_of:
+            continue
+        changes = changes_of[header]
+        share = f", {changes / commits:.1%} 的提交" if commits else ""
+        extra = changes * max(0, tu_count - count)
+        notes[header] = f"改动 {changes} 次{share}, 放入 PCH 预计额外重编 {extra} 个 TU"
+    return top_items, notes
\ No newline at end of file
@@ -1,25 +1,80 @@
 # core/classifier.py
 from enum import Enum
-from typing import Set, List
+from typing import Dict, Iterable, Set, List
 
 class HeaderCategory(Enum):
     STANDARD = "std"
     THIRD_PARTY = "3rd"
     PROJECT = "proj"
 
+class PrefixTrie:
+    """
+    前缀树：判断字符串是否以任一已登记前缀开头。
+    查询代价只与待查字符串长度相关，与前缀数量无关。
+    """
+    _END = None  # 终止标记键
+
+    def __init__(self, prefixes: Iterable[str] = ()):
+        self._root: Dict = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str):
+        node = self._root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[self._END] = True
+
+    def matches_prefix(self, text: str) -> bool:
+        node = self._root
+        if self._END in node:
+            return True
+        for ch in text:
+            node = node.get(ch)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
 class HeaderClassifier:
-    def __init__(self, std_headers: Set[str], third_party_prefixes: List[str]):
+    def __init__(self, std_headers: Set[str], third_party_prefixes: List[str],
+                 system_headers: Set[str] = frozenset(), platform_headers: Set[str] = frozenset()):
+        """
+        system_headers: 从编译器系统目录索引得到的标准库头文件集合 (见 io/sysinc.py)，
+        用于补充手工维护的 std_headers。
+        platform_headers: 系统目录中的其余头文件 (如 /usr/include/zlib.h)，归为平台与第三方库。
+        """
         self.std_headers = std_headers
         self.third_party_prefixes = third_party_prefixes
+        self.system_headers = system_headers
+        self.platform_headers = platform_headers
+        self._trie = PrefixTrie(third_party_prefixes)
+        # 同一头文件在一次运行中会被反复分类，结果按名称缓存
+        self._memo: Dict[str, HeaderCategory] = {}
 
     def classify(self, header: str) -> HeaderCategory:
+        category = self._memo.get(header)
+        if category is None:
+            category = self._classify(header)
+            self._memo[header] = category
+        return category
+
+    def _classify(self, header: str) -> HeaderCategory:
         # 去掉路径和后缀检查标准库
         base_name = header.split('/')[-1].split('.')[0]
         
         if base_name in self.std_headers or header in self.std_headers:
             return HeaderCategory.STANDARD
         
-        if any(header.startswith(pre) for pre in self.third_party_prefixes):
+        # 显式配置的第三方前缀优先于系统目录索引 (如安装在 /usr/include 下的 sqlite3.h)
+        if self._trie.matches_prefix(header):
+            return HeaderCategory.THIRD_PARTY
+
+        if header in self.system_headers:
+            return HeaderCategory.STANDARD
+
+        if header in self.platform_headers:
             return HeaderCategory.THIRD_PARTY
             
         return HeaderCategory.PROJECT
\ No newline at end of file
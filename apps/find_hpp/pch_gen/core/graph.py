@@ -0,0 +1,174 @@
+# core/graph.py
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+class IncludeGraph:
+    """
+    传递包含关系图：节点为已解析的文件，边为 #include 关系。
+    权重 (字节数或行数) 由构建方在添加节点时给出，本模块不做任何 IO。
+    """
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.paths: List[str] = []
+        self.weights: List[int] = []
+        self.edges: List[Set[int]] = []
+        self.tus: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def node_id(self, path: str) -> int:
+        return self._index.get(path, -1)
+
+    def add_node(self, path: str, weight: int) -> int:
+        node = self._index.get(path)
+        if node is None:
+            node = len(self.paths)
+            self._index[path] = node
+            self.paths.append(path)
+            self.weights.append(weight)
+            self.edges.append(set())
+        return node
+
+    def add_edge(self, src: int, dst: int):
+        if src != dst:
+            self.edges[src].add(dst)
+
+    def mark_tu(self, node: int):
+        self.tus.add(node)
+
+    def _strongly_connected(self, edges: List[Set[int]]) -> Tuple[List[int], List[List[int]]]:
+        """
+        迭代版 Tarjan 算法 (头文件间可能循环包含)。
+        返回 (节点所属分量, 分量列表)；分量按逆拓扑序产出，即被依赖者在前。
+        """
+        n = len(edges)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        comp_of = [-1] * n
+        components: List[List[int]] = []
+        stack: List[int] = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, iter(edges[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if index[child] == -1:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        work.append((child, iter(edges[child])))
+                        advanced = True
+                        break
+                    if on_stack[child]:
+                        low[node] = min(low[node], index[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+                if low[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        comp_of[member] = len(components)
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(members)
+
+        return comp_of, components
+
+    def _condensation(self) -> Tuple[List[int], List[int], List[Set[int]]]:
+        """把循环包含的节点合并为一个分量，返回 (节点所属分量, 分量总权重, 分量间的边)"""
+        comp_of, components = self._strongly_connected(self.edges)
+        comp_weights = [sum(self.weights[member] for member in members) for members in components]
+        comp_edges: List[Set[int]] = [set() for _ in components]
+        for cid, members in enumerate(components):
+            for member in members:
+                for child in self.edges[member]:
+                    if comp_of[child] != cid:
+                        comp_edges[cid].add(comp_of[child])
+        return comp_of, comp_weights, comp_edges
+
+    @staticmethod
+    def _reach(comp_edges: List[Set[int]], start: int) -> Set[int]:
+        """从分量 start 出发在无环的分量图上可达的全部分量 (含自身)"""
+        seen = {start}
+        stack = [start]
+        while stack:
+            for child in comp_edges[stack.pop()]:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return seen
+
+    def compute_costs(self, nodes: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+        """
+        计算指定节点的编译代价要素。
+        返回: {node: (传递包含该节点的 TU 数, 该节点展开后的总权重)}
+
+        只从 TU 与候选节点出发在分量图上做 DFS，内存与图的规模成线性关系，
+        不为每个节点物化可达集合 (全图位图需要 O(N²) 位)。
+        """
+        nodes = list(nodes)
+        comp_of, comp_weights, comp_edges = self._condensation()
+        wanted = {comp_of[node] for node in nodes}
+
+        # TU 数：从每个 TU 所在分量出发 DFS 一次，累加到途经的候选分量上
+        tu_counts = Counter()
+        for comp, tus in Counter(comp_of[tu] for tu in self.tus).items():
+            for reached in self._reach(comp_edges, comp) & wanted:
+                tu_counts[reached] += tus
+
+        costs = {}
+        pulled_of: Dict[int, int] = {}
+        for node in nodes:
+            comp = comp_of[node]
+            if comp not in pulled_of:
+                # 展开权重不能按 DAG 逐层累加 (共享的后继会被重复计入)，对每个候选分量单独 DFS
+                pulled_of[comp] = sum(comp_weights[c] for c in self._reach(comp_edges, comp))
+            costs[node] = (tu_counts[comp], pulled_of[comp])
+        return costs
+
+def rank_by_cost(graph: IncludeGraph, spellings: Dict[int, Counter], top: int) -> List[Tuple[str, int, int, int]]:
+    """
+    按编译代价排序候选头文件：代价 = 传递包含它的 TU 数 × 它展开后的总权重。
+    返回: [(头文件写法, 代价, TU 数, 展开权重)]，同一写法只保留代价最高的节点。
+    """
+    ranked = []
+    for node, (tu_count, pulled) in graph.compute_costs(spellings.keys()).items():
+        cost = tu_count * pulled
+        if cost:
+            spelling = spellings[node].most_common(1)[0][0]
+            ranked.append((spelling, cost, tu_count, pulled))
+
+    ranked.sort(key=lambda x: (-x[1], x[0]))
+
+    result = []
+    seen = set()
+    for item in ranked:
+        if item[0] in seen:
+            continue
+        seen.add(item[0])
+        result.append(item)
+        if len(result) >= top:
+            break
+    return result
\ No newline at end of file
@@ -0,0 +1,43 @@
+# core/live_stats.py
+from collections import Counter
+from typing import Dict, FrozenSet, List
+
+class LiveIncludeStats:
+    """
+    可增量维护的头文件统计：记录每个文件的头文件列表，
+    文件变化时只按新旧列表的差值调整 Counter，无需重新扫描整个目录。
+    """
+
+    def __init__(self, per_file: Dict[str, List[str]]):
+        self._includes: Dict[str, List[str]] = {}
+        self.counts = Counter()
+        # 按遍历顺序填充，初始结果与一次性扫描完全一致
+        for path, includes in per_file.items():
+            self.update_file(path, includes)
+
+    def __len__(self) -> int:
+        return len(self._includes)
+
+    def update_file(self, path: str, includes: List[str]):
+        old = self._includes.get(path)
+        if old == includes:
+            return
+        if old:
+            self.counts.subtract(old)
+        self._includes[path] = includes
+        self.counts.update(includes)
+        self._drop_zero(old)
+
+    def remove_file(self, path: str):
+        old = self._includes.pop(path, None)
+        if old:
+            self.counts.subtract(old)
+            self._drop_zero(old)
+
+    def _drop_zero(self, headers: List[str]):
+        for header in headers or ():
+            if self.counts.get(header, 0) <= 0:
+                self.counts.pop(header, None)
+
+    def top_set(self, n: int) -> FrozenSet[str]:
+        return frozenset(header for header, _ in self.counts.most_common(n))
\ No newline at end of file
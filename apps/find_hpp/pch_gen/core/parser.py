@@ -1,12 +1,117 @@
 # core/parser.py
+import mmap
 import re
-from typing import List
+from typing import Dict, List, Tuple
+
+from . import preproc
+
+# 文件开头的 include 前导区：空白、注释以及预处理指令 (含反斜杠续行)。
+# 遇到第一个既不是注释也不是预处理指令的记号时匹配结束。
+_PREAMBLE_PATTERN = re.compile(rb'(?:\s+|//[^\n]*|/\*.*?\*/|#(?:\\\r?\n|[^\n])*)*', re.DOTALL)
+
+# UTF-8 BOM 不是空白，不跳过时文件开头的 #include 无法被 ^\s*# 匹配，前导区也会在 BOM 处结束
+_BOM = b'\xef\xbb\xbf'
+
+def _content_start(data) -> int:
+    """跳过开头的 UTF-8 BOM，返回正文的起始偏移"""
+    return len(_BOM) if data[:len(_BOM)] == _BOM else 0
+
+def _strip_bom(content: str) -> str:
+    return content[1:] if content.startswith('\ufeff') else content
+
+def _scan_range(data, full_scan: bool):
+    """
+    返回去除 BOM 后待匹配的数据：非 full_scan 模式下只复制前导区部分；
+    full_scan 模式只在存在 BOM 时复制 (^ 不会在 findall 的起始偏移处匹配，无法只传偏移)。
+    """
+    start = _content_start(data)
+    if not full_scan:
+        return data[start:_PREAMBLE_PATTERN.match(data, start).end()]
+    return data[start:] if start else data
 
 class HeaderParser:
-    def __init__(self):
+    def __init__(self, full_scan: bool = False):
+        """
+        full_scan: 为 False 时只扫描 include 前导区，否则扫描整个文件。
+        """
+        self.full_scan = full_scan
         # 预编译正则，提高性能
         self._pattern = re.compile(r'^\s*#\s*include\s*[<"](.+?)[>"]', re.MULTILINE)
+        self._bytes_pattern = re.compile(rb'^\s*#\s*include\s*[<"](.+?)[>"]', re.MULTILINE)
+        # 同时捕获引号类型，用于区分 "..." 与 <...> 的查找规则
+        self._directive_pattern = re.compile(r'^\s*#\s*include\s*([<"])(.+?)[>"]', re.MULTILINE)
+
+    @property
+    def signature(self) -> str:
+        """解析规则的特征串，供缓存判断旧结果是否仍然有效"""
+        mode = "full" if self.full_scan else "preamble"
+        # bom: 跳过 UTF-8 BOM 之前缓存的结果会漏掉带 BOM 文件中的 #include，需要失效
+        return f"{self._bytes_pattern.pattern.decode()}|{mode}|bom"
 
     def parse_content(self, content: str) -> List[str]:
         """输入文件内容字符串，返回头文件列表"""
-        return self._pattern.findall(content)
\ No newline at end of file
+        return self._pattern.findall(_strip_bom(content))
+
+    def parse_bytes(self, data) -> List[str]:
+        """
+        直接在字节上匹配，无需先解码整个文件。
+        data 可以是 bytes 或 mmap；非 full_scan 模式下只复制前导区部分。
+        """
+        data = _scan_range(data, self.full_scan)
+        return [name.decode('utf-8', errors='ignore') for name in self._bytes_pattern.findall(data)]
+
+    def parse_file(self, file_path: str) -> List[str]:
+        """以内存映射方式读取文件并解析，避免整文件解码与复制"""
+        with open(file_path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 空文件无法映射
+                return []
+            with mapped:
+                return self.parse_bytes(mapped)
+
+    def parse_directives(self, content: str) -> List[Tuple[str, bool]]:
+        """返回 [(头文件, 是否为引号形式)]，供包含路径解析使用"""
+        return [(name, delim == '"') for delim, name in self._directive_pattern.findall(_strip_bom(content))]
+
+class ConditionalParser(HeaderParser):
+    """
+    按条件编译求值的解析器：同时在多组宏定义 (配置) 下求值，单次扫描得到各配置实际编译的 #include。
+    只有一组配置时返回普通的头文件列表，可直接替换 HeaderParser；
+    多组配置时每项编码为 preproc.tag_include 的形式，由 preproc.split_tagged_counts 拆分统计结果。
+    """
+
+    def __init__(self, configs: List[Dict[str, str]], full_scan: bool = False):
+        super().__init__(full_scan)
+        if not configs:
+            raise ValueError("至少需要一组配置")
+        self.configs = configs
+
+    @property
+    def tagged(self) -> bool:
+        return len(self.configs) > 1
+
+    @property
+    def signature(self) -> str:
+        configs = ';'.join(','.join(f"!{k}" if v is None else f"{k}={v}" for k, v in sorted(macros.items()))
+                           for macros in self.configs)
+        return f"{super().signature}|cond:{configs}"
+
+    def _collect(self, entries) -> List[str]:
+        if self.tagged:
+            return [preproc.tag_include(mask, name) for mask, name, _ in entries]
+        return [name for _, name, _ in entries]
+
+    def parse_content(self, content: str) -> List[str]:
+        return self._collect(preproc.active_includes(preproc.iter_directives(_strip_bom(content)), self.configs))
+
+    def parse_bytes(self, data) -> List[str]:
+        data = _scan_range(data, self.full_scan)
+        return self._collect(preproc.active_includes(preproc.iter_directives_bytes(data), self.configs))
+
+    def parse_directives(self, content: str) -> List[Tuple[str, bool]]:
+        if self.tagged:
+            raise ValueError("包含路径解析只支持单组配置")
+        entries = preproc.active_includes(preproc.iter_directives(_strip_bom(content)), self.configs)
+        return [(name, quoted) for _, name, quoted in entries]
\ No newline at end of file
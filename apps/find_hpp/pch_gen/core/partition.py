@@ -0,0 +1,135 @@
+# core/partition.py
+import hashlib
+import random
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+# MinHash 使用的大素数 (2^61 - 1)，各置换为 (a * x + b) mod P
+_PRIME = (1 << 61) - 1
+
+Signature = Tuple[int, ...]
+
+class MinHasher:
+    """
+    为头文件集合计算 MinHash 签名，两个签名中相同位置相等的比例即 Jaccard 相似度的估计。
+    使用固定种子与 blake2b，结果在不同进程、不同运行之间保持一致。
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        # 头文件种类远少于 TU 数量，每个头文件的置换值只计算一次
+        self._memo: Dict[str, Signature] = {}
+
+    def _values(self, token: str) -> Signature:
+        values = self._memo.get(token)
+        if values is None:
+            x = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+            values = tuple((a * x + b) % _PRIME for a, b in self._params)
+            self._memo[token] = values
+        return values
+
+    def signature(self, tokens: Iterable[str]) -> Optional[Signature]:
+        vectors = [self._values(token) for token in set(tokens)]
+        if not vectors:
+            return None
+        return tuple(map(min, zip(*vectors)))
+
+def estimate_jaccard(a: Signature, b: Signature) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+def cluster_include_sets(include_sets: List[FrozenSet[str]], threshold: float = 0.5,
+                         max_clusters: int = 8, min_size: int = 2,
+                         hasher: MinHasher = None) -> List[List[int]]:
+    """
+    按头文件集合的相似度对 TU 分组，返回每组的 TU 下标列表 (按组大小降序)。
+
+    逻辑推导：
+    1. 头文件集合完全相同的 TU 先合并，只对不同的集合计算签名
+    2. 领队聚类：依次处理每个集合，与现有各组的领队比较，相似度 >= threshold 时加入最相似的组，
+       否则自成一组；候选组通过 LSH 分桶查找 (32 段 × 2 行)，无需与全部领队两两比较
+    3. 保留最大的 max_clusters 个组 (且不少于 min_size 个 TU)，其余组并入领队最相似的保留组
+    空集合 (不包含任何头文件) 的 TU 不参与分组。
+    """
+    hasher = hasher or MinHasher()
+    bands = hasher.num_perm // 2
+    rows = hasher.num_perm // bands
+
+    # 1. 相同集合去重
+    unique: Dict[FrozenSet[str], List[int]] = {}
+    for index, includes in enumerate(include_sets):
+        if includes:
+            unique.setdefault(includes, []).append(index)
+
+    # 2. 领队聚类
+    leaders: List[Signature] = []
+    members: List[List[int]] = []
+    buckets: Dict[Tuple[int, Signature], List[int]] = {}
+    for includes, indices in unique.items():
+        sig = hasher.signature(includes)
+        keys = [(band, sig[band * rows:(band + 1) * rows]) for band in range(bands)]
+
+        best, best_score = None, -1.0
+        for cid in sorted({cid for key in keys for cid in buckets.get(key, ())}):
+            score = estimate_jaccard(sig, leaders[cid])
+            if score > best_score:
+                best, best_score = cid, score
+
+        if best is None or best_score < threshold:
+            best = len(leaders)
+            leaders.append(sig)
+            members.append([])
+            for key in keys:
+                buckets.setdefault(key, []).append(best)
+        members[best].extend(indices)
+
+    # 3. 限制组数：小组并入最相似的保留组
+    order = sorted(range(len(members)), key=lambda cid: (-len(members[cid]), min(members[cid])))
+    kept = [cid for cid in order[:max(1, max_clusters)] if len(members[cid]) >= min_size] or order[:1]
+    kept_set = set(kept)
+    merged = {cid: list(members[cid]) for cid in kept}
+    for cid in order:
+        if cid in kept_set:
+            continue
+        target = max(kept, key=lambda k: (estimate_jaccard(leaders[cid], leaders[k]), len(members[k])))
+        merged[target].extend(members[cid])
+
+    groups = [sorted(merged[cid]) for cid in kept]
+    groups.sort(key=lambda g: (-len(g), g[0]))
+    return groups
+
+class ClusterCoverage(NamedTuple):
+    tu_count: int
+    includes: int        # 组内 #include 总数
+    coverage: float      # 组内全部 #include 中由该 PCH 提供的比例
+    utilization: float   # 平均每个 TU 实际用到的 PCH 头文件比例 (越低说明 PCH 越臃肿)
+
+def select_cluster_headers(include_lists: List[List[str]], top: int,
+                           min_share: float) -> List[Tuple[str, int]]:
+    """组内统计头文件使用次数，取前 top 个且被至少 min_share 比例的 TU 使用的头文件"""
+    counts = Counter()
+    users = Counter()
+    for includes in include_lists:
+        counts.update(includes)
+        users.update(set(includes))
+    floor = min_share * len(include_lists)
+    return [(header, count) for header, count in counts.most_common()
+            if users[header] >= floor][:top]
+
+def estimate_coverage(include_lists: List[List[str]], headers: Iterable[str]) -> ClusterCoverage:
+    chosen = set(headers)
+    total = covered = 0
+    used_ratio = 0.0
+    for includes in include_lists:
+        total += len(includes)
+        covered += sum(1 for header in includes if header in chosen)
+        if chosen:
+            used_ratio += len(chosen.intersection(includes)) / len(chosen)
+    count = len(include_lists)
+    return ClusterCoverage(
+        tu_count=count,
+        includes=total,
+        coverage=covered / total if total else 0.0,
+        utilization=used_ratio / count if count else 0.0,
+    )
\ No newline at end of file
@@ -0,0 +1,413 @@
+# core/preproc.py
+"""
+轻量的条件编译求值：只处理 #if/#ifdef/#ifndef/#elif/#elifdef/#elifndef/#else/#endif
+与对象式宏的 #define/#undef，不做宏展开以外的任何预处理。
+
+条件采用三值逻辑：True (一定编译)、False (一定不编译)、None (无法判断，例如 __has_include、
+函数式宏调用或在不确定分支中定义的宏)。无法判断的分支按"可能编译"处理，其中的 #include 仍会被统计。
+宏只有在配置中给出 (已定义或明确未定义) 或在文件中 #define/#undef 后才是已知的；
+其余标识符 (__cplusplus、__GNUC__、_MSC_VER 等编译器预定义宏) 一律视为无法判断。
+与 HeaderParser 一样按行匹配指令，不识别跨行块注释中的 # 行。
+"""
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 宏名 -> 值；值为 None 表示明确未定义 (-U 或配置中的 !NAME)
+Macros = Dict[str, Optional[str]]
+
+_DIRECTIVES = r'(include|if|ifdef|ifndef|elif|elifdef|elifndef|else|endif|define|undef)\b'
+_DIRECTIVE_TEXT = re.compile(r'^[ \t]*#[ \t]*' + _DIRECTIVES + r'((?:\\\r?\n|[^\n])*)', re.MULTILINE)
+_DIRECTIVE_BYTES = re.compile(_DIRECTIVE_TEXT.pattern.encode(), re.MULTILINE)
+
+_CONTINUATION = re.compile(r'\\\r?\n')
+_COMMENT = re.compile(r'/\*.*?\*/|//.*', re.DOTALL)
+_INCLUDE_ARG = re.compile(r'\s*([<"])(.+?)[>"]')
+_DEFINE_ARG = re.compile(r'\s*([A-Za-z_]\w*)(\()?(.*)', re.DOTALL)
+_TOKEN = re.compile(r'\s*(?:(0[xX][0-9a-fA-F]+|\d+)[uUlL]*|([A-Za-z_]\w*)|'
+                    r"('(?:\\.|[^'\\])*')|(<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%<>&^|!~?:(),]))")
+
+# 宏展开的最大深度，防止 #define A B / #define B A 之类的循环
+_MAX_EXPANSION = 32
+
+# 配置中未给出的宏、在不确定分支中定义或以函数式定义的宏：defined() 与取值均无法判断
+_UNKNOWN = object()
+# 在文件中被 #undef 的宏
+_UNDEFINED = object()
+
+def parse_define(text: str) -> Tuple[str, str]:
+    """按 -D 的语义解析 NAME 或 NAME=VALUE，未给值时为 1"""
+    name, sep, value = text.partition('=')
+    name = name.strip()
+    if not re.fullmatch(r'[A-Za-z_]\w*', name):
+        raise ValueError(f"无效的宏名: '{text}'")
+    return name, value.strip() if sep else '1'
+
+def parse_undefine(text: str) -> str:
+    """按 -U 的语义解析宏名"""
+    name = text.strip()
+    if not re.fullmatch(r'[A-Za-z_]\w*', name):
+        raise ValueError(f"无效的宏名: '{text}'")
+    return name
+
+def parse_macro_list(text: str) -> Macros:
+    """
+    解析逗号分隔的宏列表，例如 '_WIN32,UNICODE,VERSION=3,!__linux__'；
+    以 ! 开头的项表示明确未定义。空串表示不给出任何宏。
+    """
+    macros: Macros = {}
+    for item in text.split(','):
+        item = item.strip()
+        if item.startswith('!'):
+            macros[parse_undefine(item[1:])] = None
+        elif item:
+            name, value = parse_define(item)
+            macros[name] = value
+    return macros
+
+def _clean(arg: str) -> str:
+    return _COMMENT.sub(' ', _CONTINUATION.sub(' ', arg)).strip()
+
+def iter_directives(content: str) -> Iterator[Tuple[str, str]]:
+    """产出 (指令名, 参数)，参数已去除续行与注释"""
+    for match in _DIRECTIVE_TEXT.finditer(content):
+        yield match.group(1), _clean(match.group(2))
+
+def iter_directives_bytes(data) -> Iterator[Tuple[str, str]]:
+    """在字节 (bytes 或 mmap) 上匹配指令，只解码指令本身"""
+    for match in _DIRECTIVE_BYTES.finditer(data):
+        yield match.group(1).decode('ascii'), _clean(match.group(2).decode('utf-8', errors='ignore'))
+
+# === #if 表达式求值 ===
+
+class _Scope:
+    """单个文件内的宏视图：文件中的 #define/#undef 记录在覆盖层，不修改配置本身"""
+    __slots__ = ('base', 'local')
+
+    def __init__(self, base: Macros):
+        self.base = base
+        self.local: Dict[str, object] = {}
+
+    def lookup(self, name: str):
+        """返回宏的值、None (未定义) 或 _UNKNOWN (配置与文件中都未给出)"""
+        if name in self.local:
+            value = self.local[name]
+            return None if value is _UNDEFINED else value
+        return self.base.get(name, _UNKNOWN)
+
+def _tri_not(value: Optional[bool]) -> Optional[bool]:
+    return None if value is None else not value
+
+def _tri_and(a: Optional[bool], b: Optional[bool]) -> Optional[bool]:
+    if a is False or b is False:
+        return False
+    if a is None or b is None:
+        return None
+    return True
+
+def _tri_or(a: Optional[bool], b: Optional[bool]) -> Optional[bool]:
+    if a is True or b is True:
+        return True
+    if a is None or b is None:
+        return None
+    return False
+
+class _ExprError(ValueError):
+    pass
+
+# 二元运算符优先级 (数值越大结合越紧)
+_BINARY = {
+    '*': 10, '/': 10, '%': 10,
+    '+': 9, '-': 9,
+    '<<': 8, '>>': 8,
+    '<': 7, '>': 7, '<=': 7, '>=': 7,
+    '==': 6, '!=': 6,
+    '&': 5, '^': 4, '|': 3,
+    '&&': 2, '||': 1,
+}
+
+def _tokenize(expr: str) -> List[str]:
+    tokens = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        match = _TOKEN.match(expr, pos)
+        if not match:
+            raise _ExprError(expr)
+        number, name, char, op = match.groups()
+        if number is not None:
+            tokens.append(str(int(number, 16) if number[:2] in ('0x', '0X')
+                              else int(number, 8) if number.startswith('0') and len(number) > 1
+                              else int(number)))
+        elif char is not None:
+            # 字符常量取其首个字符的编码 (转义序列无法可靠求值时视为无法判断)
+            body = char[1:-1]
+            tokens.append(str(ord(body)) if len(body) == 1 else '?char')
+        else:
+            tokens.append(name or op)
+        pos = match.end()
+    return tokens
+
+class _Evaluator:
+    """递归下降求值；结果为 int 或 None (无法判断)"""
+
+    def __init__(self, tokens: List[str], scope: _Scope, depth: int):
+        self.tokens = tokens
+        self.pos = 0
+        self.scope = scope
+        self.depth = depth
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise _ExprError("表达式不完整")
+        self.pos += 1
+        return token
+
+    def _expect(self, token: str):
+        if self._next() != token:
+            raise _ExprError(f"缺少 '{token}'")
+
+    def parse(self) -> Optional[int]:
+        value = self._conditional()
+        if self._peek() is not None:
+            raise _ExprError(f"多余的记号 '{self._peek()}'")
+        return value
+
+    def _conditional(self) -> Optional[int]:
+        cond = self._binary(1)
+        if self._peek() != '?':
+            return cond
+        self._next()
+        a = self._conditional()
+        self._expect(':')
+        b = self._conditional()
+        if cond is None:
+            return a if a == b else None
+        return a if cond else b
+
+    def _binary(self, min_prec: int) -> Optional[int]:
+        left = self._unary()
+        while True:
+            op = self._peek()
+            prec = _BINARY.get(op)
+            if prec is None or prec < min_prec:
+                return left
+            self._next()
+            right = self._binary(prec + 1)
+            left = self._apply(op, left, right)
+
+    @staticmethod
+    def _apply(op: str, a: Optional[int], b: Optional[int]) -> Optional[int]:
+        if op == '&&':
+            result = _tri_and(None if a is None else bool(a), None if b is None else bool(b))
+            return None if result is None else int(result)
+        if op == '||':
+            result = _tri_or(None if a is None else bool(a), None if b is None else bool(b))
+            return None if result is None else int(result)
+        if a is None or b is None:
+            return None
+        if op in ('/', '%'):
+            if b == 0:
+                return None
+            # C 的整数除法向零取整
+            q = abs(a) // abs(b) * (1 if (a >= 0) == (b >= 0) else -1)
+            return q if op == '/' else a - q * b
+        if op in ('<<', '>>') and b < 0:
+            return None
+        return {
+            '*': lambda: a * b, '+': lambda: a + b, '-': lambda: a - b,
+            '<<': lambda: a << b, '>>': lambda: a >> b,
+            '<': lambda: int(a < b), '>': lambda: int(a > b),
+            '<=': lambda: int(a <= b), '>=': lambda: int(a >= b),
+            '==': lambda: int(a == b), '!=': lambda: int(a != b),
+            '&': lambda: a & b, '^': lambda: a ^ b, '|': lambda: a | b,
+        }[op]()
+
+    def _unary(self) -> Optional[int]:
+        token = self._next()
+        if token in ('!', '~', '-', '+'):
+            value = self._unary()
+            if value is None:
+                return None
+            return {'!': int(not value), '~': ~value, '-': -value, '+': value}[token]
+        if token == '(':
+            value = self._conditional()
+            self._expect(')')
+            return value
+        if token.lstrip('-').isdigit():
+            return int(token)
+        if token == 'defined':
+            return self._defined()
+        if token[0].isalpha() or token[0] == '_':
+            return self._identifier(token)
+        if token == '?char':
+            return None
+        raise _ExprError(f"意外的记号 '{token}'")
+
+    def _defined(self) -> Optional[int]:
+        paren = self._peek() == '('
+        if paren:
+            self._next()
+        name = self._next()
+        if paren:
+            self._expect(')')
+        value = self.scope.lookup(name)
+        if value is _UNKNOWN:
+            return None
+        return int(value is not None)
+
+    def _skip_call(self):
+        """跳过函数式调用的参数列表 (括号配对)"""
+        self._expect('(')
+        level = 1
+        while level:
+            token = self._next()
+            if token == '(':
+                level += 1
+            elif token == ')':
+                level -= 1
+
+    def _identifier(self, name: str) -> Optional[int]:
+        if self._peek() == '(':
+            # __has_include(...)、__has_cpp_attribute(...) 或函数式宏调用：无法判断
+            self._skip_call()
+            return None
+        if name == 'true':
+            return 1
+        if name == 'false':
+            return 0
+        value = self.scope.lookup(name)
+        if value is None:
+            # 明确未定义的标识符在 #if 中视为 0
+            return 0
+        if value is _UNKNOWN or self.depth >= _MAX_EXPANSION:
+            return None
+        return _evaluate(value, self.scope, self.depth + 1)
+
+def _evaluate(expr: str, scope: _Scope, depth: int = 0) -> Optional[int]:
+    try:
+        tokens = _tokenize(expr)
+        if not tokens:
+            return None
+        return _Evaluator(tokens, scope, depth).parse()
+    except (_ExprError, ValueError, IndexError):
+        return None
+
+def evaluate(expr: str, macros: Macros) -> Optional[bool]:
+    """对 #if 表达式求值：True / False，无法判断时返回 None"""
+    value = _evaluate(expr, _Scope(macros))
+    return None if value is None else bool(value)
+
+# === 指令序列求值 ===
+
+class _Branch:
+    """一层 #if 嵌套：parent 为外层是否编译，taken 为此前是否已有分支被选中，live 为当前分支是否编译"""
+    __slots__ = ('parent', 'taken', 'live')
+
+    def __init__(self, parent: Optional[bool], cond: Optional[bool]):
+        self.parent = parent
+        self.taken = cond
+        self.live = _tri_and(parent, cond)
+
+    def switch(self, cond: Optional[bool]):
+        """#elif / #else (#else 的 cond 为 True)"""
+        self.live = _tri_and(self.parent, _tri_and(_tri_not(self.taken), cond))
+        self.taken = _tri_or(self.taken, cond)
+
+class _ConfigState:
+    __slots__ = ('scope', 'stack')
+
+    def __init__(self, macros: Macros):
+        self.scope = _Scope(macros)
+        self.stack: List[_Branch] = []
+
+    @property
+    def live(self) -> Optional[bool]:
+        return self.stack[-1].live if self.stack else True
+
+    def _condition(self, kind: str, arg: str) -> Optional[bool]:
+        if kind in ('ifdef', 'ifndef', 'elifdef', 'elifndef'):
+            name = arg.split()[0] if arg else ''
+            value = self.scope.lookup(name)
+            defined = None if value is _UNKNOWN else value is not None
+            return _tri_not(defined) if kind.endswith('ndef') else defined
+        value = _evaluate(arg, self.scope)
+        return None if value is None else bool(value)
+
+    def feed(self, kind: str, arg: str):
+        if kind in ('if', 'ifdef', 'ifndef'):
+            parent = self.live
+            # 一定不编译的代码中无需求值
+            cond = self._condition(kind, arg) if parent is not False else False
+            self.stack.append(_Branch(parent, cond))
+        elif kind in ('elif', 'elifdef', 'elifndef'):
+            if self.stack:
+                branch = self.stack[-1]
+                skip = branch.parent is False or branch.taken is True
+                branch.switch(False if skip else self._condition(kind, arg))
+        elif kind == 'else':
+            if self.stack:
+                self.stack[-1].switch(True)
+        elif kind == 'endif':
+            if self.stack:
+                self.stack.pop()
+        elif kind in ('define', 'undef'):
+            live = self.live
+            if live is False:
+                return
+            match = _DEFINE_ARG.match(arg)
+            if not match:
+                return
+            name, paren, value = match.groups()
+            if live is None or paren:
+                self.scope.local[name] = _UNKNOWN
+            elif kind == 'define':
+                self.scope.local[name] = value.strip()
+            else:
+                self.scope.local[name] = _UNDEFINED
+
+def active_includes(directives: Iterable[Tuple[str, str]], configs: List[Macros]) -> List[Tuple[int, str, bool]]:
+    """
+    单次遍历指令序列，同时在多组宏定义下求值。
+    返回 [(配置位掩码, 头文件, 是否为引号形式)]：第 i 位为 1 表示该 #include 在第 i 组配置下可能被编译；
+    在任何配置下都一定不编译的 #include 不出现在结果中。
+    """
+    states = [_ConfigState(macros) for macros in configs]
+    result = []
+    for kind, arg in directives:
+        if kind == 'include':
+            match = _INCLUDE_ARG.match(arg)
+            if not match:
+                continue
+            mask = 0
+            for index, state in enumerate(states):
+                if state.live is not False:
+                    mask |= 1 << index
+            if mask:
+                result.append((mask, match.group(2), match.group(1) == '"'))
+            continue
+        for state in states:
+            state.feed(kind, arg)
+    return result
+
+# === 多配置统计结果的编码 ===
+# 多配置扫描时，每个 #include 以 "<十六进制掩码>:<头文件>" 的形式记录，
+# 使收集、缓存与并行扫描的流程无需区分单配置与多配置。
+
+def tag_include(mask: int, header: str) -> str:
+    return f"{mask:x}:{header}"
+
+def split_tagged_counts(stats: Counter, count: int) -> List[Counter]:
+    """把带掩码的统计拆分为每组配置各自的 Counter；同频项的顺序与单独扫描该配置时一致"""
+    per_config = [Counter() for _ in range(count)]
+    for key, value in stats.items():
+        mask, _, header = key.partition(':')
+        bits = int(mask, 16)
+        for index in range(count):
+            if bits >> index & 1:
+                per_config[index][header] += value
+    return per_config
\ No newline at end of file
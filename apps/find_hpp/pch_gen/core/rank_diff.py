@@ -0,0 +1,24 @@
+# core/rank_diff.py
+from collections import Counter
+from typing import List, NamedTuple, Optional
+
+class RankChange(NamedTuple):
+    header: str
+    old_rank: Optional[int]     # 从 1 开始；不在旧版本 Top-N 中为 None
+    new_rank: Optional[int]
+    old_count: int
+    new_count: int
+
+    @property
+    def delta(self) -> int:
+        return self.new_count - self.old_count
+
+def compare_top(old: Counter, new: Counter, top: int) -> List[RankChange]:
+    """
+    比较两次统计的 Top-N：返回出现在任一侧 Top-N 中的头文件，
+    按新排名排序，只在旧 Top-N 中的 (已移出) 按旧排名排在最后。
+    """
+    old_ranks = {header: rank for rank, (header, _) in enumerate(old.most_common(top), 1)}
+    new_ranks = {header: rank for rank, (header, _) in enumerate(new.most_common(top), 1)}
+    return [RankChange(header, old_ranks.get(header), new_ranks.get(header), old[header], new[header])
+            for header in list(new_ranks) + [h for h in old_ranks if h not in new_ranks]]
\ No newline at end of file
@@ -0,0 +1,220 @@
+# core/unity.py
+"""
+Unity (jumbo) 构建分组：把同一目录 (或模块) 下头文件集合相近的翻译单元合并为少数几个 unity_N.cpp。
+合并后同一 unity 文件中的 TU 共享一个编译单元，因此：
+- 文件作用域的内部链接符号 (static、匿名命名空间、C++ 中非 extern 的 const 变量) 同名时会重定义，这类 TU 不能进入同一组
+- C 与 C++ 翻译单元分别合并 (unity_N.c / unity_N.cpp)，不会互相包含
+- 每组受行数 / 字节数预算限制，避免单个 unity 文件过大而拖慢增量构建与并行度
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .partition import MinHasher
+
+# 独立编译的原因
+STANDALONE_CLASH = "clash"     # 内部链接符号与同范围内其他 TU 同名，无法与任何 TU 合并
+STANDALONE_BUDGET = "budget"   # 单个 TU 已超出预算
+STANDALONE_SINGLE = "single"   # 组内只剩一个 TU，无需合并
+
+class UnitInfo(NamedTuple):
+    path: str
+    scope: str                  # 分组范围：只有 scope 相同的 TU 才会合并
+    includes: FrozenSet[str]
+    size: int                   # 字节数
+    lines: int
+    internal: FrozenSet[str]    # 内部链接符号名
+    language: str = "cpp"       # "c" 或 "cpp"：只有语言相同的 TU 才会合并
+
+class UnityPlan(NamedTuple):
+    groups: List[List[int]]             # 每组的 TU 下标 (每组至少 2 个)
+    standalone: Dict[int, str]          # TU 下标 -> 独立编译的原因
+    clashes: Dict[int, Set[str]]        # TU 下标 -> 冲突的符号名
+
+# === 内部链接符号提取 ===
+
+# 注释、字符串/字符字面量与预处理指令 (含续行)；替换为空白后只剩代码结构
+_NOISE = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|^[ \t]*#(?:\\\r?\n|[^\n])*',
+                    re.DOTALL | re.MULTILINE)
+_CHUNK = re.compile(r'[{};]|[^{};]+')
+_ANON_NAMESPACE = re.compile(r'(?:inline\s+)?namespace')
+_NAMED_NAMESPACE = re.compile(r'(?:inline\s+)?namespace\s+[\w:]+(?:\s*\[\[.*\]\])?', re.DOTALL)
+_LINKAGE_BLOCK = re.compile(r'extern\s*')
+_TYPE_DEF = re.compile(r'(?:class|struct|union|enum(?:\s+class|\s+struct)?)\s+(?:\[\[.*?\]\]\s*)?(\w+)', re.DOTALL)
+_ALIAS = re.compile(r'using\s+(\w+)\s*=')
+_TYPEDEF = re.compile(r'typedef\b.*?(\w+)\s*(?:\[[^\]]*\]\s*)*$', re.DOTALL)
+_DECLARATOR_END = re.compile(r'[(=\[{]')
+_LAST_NAME = re.compile(r'(::\s*)?(~?\w+)\s*$')
+_TEMPLATE_ARGS = re.compile(r'<[^<>]*>')
+
+_NON_NAMES = {'operator', 'const', 'constexpr', 'volatile', 'noexcept', 'override', 'final', 'decltype'}
+
+def _declared_name(stmt: str, definition: bool) -> Optional[Tuple[str, bool]]:
+    """
+    返回 (声明的名字, 是否为按 const 推断的内部链接)；无法识别或不是定义时返回 None。
+    definition 为 True 表示语句以 '{' 结束 (函数体、类定义或花括号初始化)。
+    """
+    stmt = stmt.strip()
+    if not stmt or stmt.startswith(('using namespace', 'friend', 'static_assert', 'template<>')):
+        return None
+    alias = _ALIAS.match(stmt)
+    if alias:
+        return alias.group(1), False
+    if stmt.startswith('typedef'):
+        match = _TYPEDEF.match(stmt)
+        return (match.group(1), False) if match else None
+    type_def = _TYPE_DEF.search(stmt)
+    if type_def and stmt[:type_def.start()].strip() in ('', 'static') and _DECLARATOR_END.search(stmt) is None:
+        # 只有定义才会冲突，前置声明 (struct X;) 不算
+        return (type_def.group(1), False) if definition else None
+
+    end = _DECLARATOR_END.search(stmt)
+    head = stmt[:end.start()] if end else stmt
+    is_function = end is not None and end.group() == '('
+    if is_function and not definition:
+        # 函数原型声明不是定义
+        return None
+    while True:
+        stripped = _TEMPLATE_ARGS.sub(' ', head)
+        if stripped == head:
+            break
+        head = stripped
+    match = _LAST_NAME.search(head)
+    if not match or match.group(1) or match.group(2) in _NON_NAMES or match.group(2)[0].isdigit():
+        # 带限定名的是类外成员或其他命名空间中的定义
+        return None
+    prefix = head[:match.start()]
+    # 对象本身为 const 才具有内部链接：指针看最后一个 '*' 之后的 const (const char* const p)，
+    # const char* p 只是指向 const 的指针；引用与 extern/inline 变量具有外部链接
+    by_const = (not is_function and '&' not in prefix
+                and (re.search(r'\bconstexpr\b', prefix) is not None
+                     or re.search(r'\bconst\b', prefix.rsplit('*', 1)[-1]) is not None)
+                and re.search(r'\b(?:extern|inline)\b', prefix) is None)
+    return match.group(2), by_const
+
+def internal_symbols(content: str, cpp: bool = True) -> Set[str]:
+    """
+    提取文件作用域中具有内部链接的定义：static 函数/变量、匿名命名空间中的定义、非 extern 的 const 变量。
+    cpp 为 False 时按 C 语义处理：const 变量具有外部链接，不计入。
+    基于花括号结构的启发式扫描，不展开宏，也不区分具名命名空间 (同名即视为可能冲突)。
+    """
+    text = _NOISE.sub(' ', content)
+    symbols: Set[str] = set()
+    scopes: List[str] = []      # 'anon' / 'ns'，只追踪命名空间层级
+    stmt = ''
+    skip = 0                    # 函数体、类定义等块内的花括号深度
+
+    def record(definition: bool):
+        declared = _declared_name(stmt, definition)
+        if declared is None:
+            return
+        name, by_const = declared
+        if 'anon' in scopes or (by_const and cpp) or re.match(r'(?:\w+\s+)*?static\b', stmt.strip()):
+            symbols.add(name)
+
+    for chunk in _CHUNK.findall(text):
+        if skip:
+            if chunk == '{':
+                skip += 1
+            elif chunk == '}':
+                skip -= 1
+            continue
+        if chunk == ';':
+            record(False)
+            stmt = ''
+        elif chunk == '{':
+            head = stmt.strip()
+            if _ANON_NAMESPACE.fullmatch(head):
+                scopes.append('anon')
+            elif _NAMED_NAMESPACE.fullmatch(head) or _LINKAGE_BLOCK.fullmatch(head):
+                scopes.append('ns')
+            else:
+                record(True)
+                skip = 1
+            stmt = ''
+        elif chunk == '}':
+            if scopes:
+                scopes.pop()
+            stmt = ''
+        else:
+            stmt += chunk
+    return symbols
+
+# === 分组 ===
+
+def find_clashes(units: List[UnitInfo]) -> Dict[int, Set[str]]:
+    """同一语言、同一 scope 内被多个 TU 定义的内部链接符号，返回 TU 下标 -> 冲突的符号名"""
+    owners: Dict[Tuple[str, str, str], List[int]] = {}
+    for index, unit in enumerate(units):
+        for name in unit.internal:
+            owners.setdefault((unit.language, unit.scope, name), []).append(index)
+    clashes: Dict[int, Set[str]] = {}
+    for (_, _, name), indices in owners.items():
+        if len(indices) > 1:
+            for index in indices:
+                clashes.setdefault(index, set()).add(name)
+    return clashes
+
+def _over_budget(lines: int, size: int, max_lines: int, max_bytes: int) -> bool:
+    return (max_lines > 0 and lines > max_lines) or (max_bytes > 0 and size > max_bytes)
+
+def plan_unity(units: List[UnitInfo], max_lines: int = 0, max_bytes: int = 0,
+               hasher: MinHasher = None) -> UnityPlan:
+    """
+    逻辑推导：
+    1. 每个 (语言, scope) 内按头文件集合的 MinHash 签名排序：集合相同或高度重叠的 TU 排在一起
+    2. 按排序顺序装箱，加入下一个 TU 会超出行数或字节数预算时开始新的一组 (0 表示不限制)
+    3. 与组内已有 TU 存在同名内部链接符号的 TU 跳过，留给后续的组
+    4. 只有一个 TU 的组不生成 unity 文件；因符号冲突而无法与任何 TU 合并的记为 STANDALONE_CLASH
+    """
+    hasher = hasher or MinHasher()
+    clashes = find_clashes(units)
+    standalone: Dict[int, str] = {}
+
+    by_scope: Dict[Tuple[str, str], List[int]] = {}
+    for index, unit in enumerate(units):
+        if _over_budget(unit.lines, unit.size, max_lines, max_bytes):
+            standalone[index] = STANDALONE_BUDGET
+            continue
+        by_scope.setdefault((unit.language, unit.scope), []).append(index)
+
+    groups: List[List[int]] = []
+    for scope in sorted(by_scope):
+        def order(index: int):
+            sig = hasher.signature(units[index].includes)
+            return (0, sig, units[index].path) if sig else (1, (), units[index].path)
+
+        remaining = sorted(by_scope[scope], key=order)
+        while remaining:
+            group: List[int] = []
+            names: Set[str] = set()
+            lines = size = 0
+            deferred: List[int] = []
+            for pos, index in enumerate(remaining):
+                unit = units[index]
+                if group and _over_budget(lines + unit.lines, size + unit.size, max_lines, max_bytes):
+                    deferred.extend(remaining[pos:])
+                    break
+                if unit.internal & names:
+                    deferred.append(index)
+                    continue
+                group.append(index)
+                names |= unit.internal
+                lines += unit.lines
+                size += unit.size
+            remaining = deferred
+
+            if len(group) > 1:
+                groups.append(group)
+            else:
+                standalone[group[0]] = STANDALONE_CLASH if group[0] in clashes else STANDALONE_SINGLE
+
+    return UnityPlan(groups, standalone, clashes)
+
+def redundant_includes(include_sets: Iterable[FrozenSet[str]]) -> int:
+    """合并后不再重复解析的 #include 数：各 TU 头文件数之和减去并集大小"""
+    union: Set[str] = set()
+    total = 0
+    for includes in include_sets:
+        total += len(includes)
+        union |= includes
+    return total - len(union)
\ No newline at end of file
@@ -0,0 +1,137 @@
+# io/cache.py
+import hashlib
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import INDEX_CACHE_SUBDIR
+from .sysinc import default_cache_dir
+
+# 表结构版本：结构变化时递增，旧缓存会被整体丢弃
+SCHEMA_VERSION = 1
+
+def default_cache_path(root: str) -> str:
+    """扫描根目录对应的缓存文件：位于用户缓存目录，不写入源码树；文件名由目录名与绝对路径的哈希组成"""
+    root = os.path.abspath(root)
+    digest = hashlib.sha1(os.fsencode(root)).hexdigest()[:16]
+    name = os.path.basename(root.rstrip(os.sep)) or "root"
+    return os.path.join(default_cache_dir(), INDEX_CACHE_SUBDIR, f"{name}-{digest}.db")
+
+def _under(path: str, root: Optional[str]) -> bool:
+    return root is None or path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+class IncludeCache:
+    """
+    持久化的增量索引：记录每个文件的 (size, mtime_ns, inode) 与解析出的头文件列表。
+    元数据未变化的文件直接复用缓存结果，无需重新读取与解析。
+    """
+
+    def __init__(self, db_path: str, signature: str, root: Optional[str] = None):
+        """
+        signature: 解析器特征串。解析规则变化后，旧的解析结果不再可信，需要清空。
+        root: 本次扫描的根目录；prune 只删除其中的记录，同一缓存文件可供多个目录共用。
+        """
+        self.db_path = db_path
+        self.root = os.path.abspath(root) if root else None
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+        self._pending = []
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._prepare(signature)
+
+    def _prepare(self, signature: str):
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        stored = dict(conn.execute("SELECT key, value FROM meta"))
+        expected = {'schema': str(SCHEMA_VERSION), 'signature': signature}
+
+        if stored != expected:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute("DELETE FROM meta")
+            conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", expected.items())
+
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+            " inode INTEGER, includes TEXT)"
+        )
+        conn.commit()
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.abspath(file_path)
+
+    def lookup(self, file_path: str, st: os.stat_result) -> Optional[List[str]]:
+        """元数据完全一致时返回缓存的头文件列表，否则返回 None"""
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, inode, includes FROM files WHERE path = ?",
+            (self._key(file_path),)
+        ).fetchone()
+
+        if row and row[:3] == (st.st_size, st.st_mtime_ns, st.st_ino):
+            self.hits += 1
+            return row[3].split('\n') if row[3] else []
+
+        self.misses += 1
+        return None
+
+    def store(self, file_path: str, st: os.stat_result, includes: List[str]):
+        """登记新的解析结果，在 close() 时统一写入"""
+        self._pending.append(
+            (self._key(file_path), st.st_size, st.st_mtime_ns, st.st_ino, '\n'.join(includes))
+        )
+
+    def prune(self, seen_paths: Iterable[str]):
+        """删除扫描根目录下、本次扫描中已不存在的文件记录"""
+        seen = {self._key(p) for p in seen_paths}
+        stale = [(path,) for (path,) in self._conn.execute("SELECT path FROM files")
+                 if path not in seen and _under(path, self.root)]
+        self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        self.pruned = len(stale)
+
+    def close(self):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, includes)"
+            " VALUES (?, ?, ?, ?, ?)",
+            self._pending
+        )
+        self._pending = []
+        self._conn.commit()
+        self._conn.close()
+
+
+class MemoryIncludeCache:
+    """
+    与 IncludeCache 接口相同的内存索引，条目保存在调用方持有的字典中。
+    常驻进程 (devd) 在多次请求之间复用同一个字典，省去每次打开、查询与提交 SQLite 的开销。
+    """
+
+    def __init__(self, entries: Dict[str, Tuple[Tuple[int, int, int], List[str]]], root: Optional[str] = None):
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+        self.root = os.path.abspath(root) if root else None
+        self._entries = entries
+
+    def lookup(self, file_path: str, st: os.stat_result) -> Optional[List[str]]:
+        entry = self._entries.get(os.path.abspath(file_path))
+        if entry and entry[0] == (st.st_size, st.st_mtime_ns, st.st_ino):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, file_path: str, st: os.stat_result, includes: List[str]):
+        self._entries[os.path.abspath(file_path)] = ((st.st_size, st.st_mtime_ns, st.st_ino), includes)
+
+    def prune(self, seen_paths: Iterable[str]):
+        seen = {os.path.abspath(p) for p in seen_paths}
+        stale = [path for path in self._entries if path not in seen and _under(path, self.root)]
+        for path in stale:
+            del self._entries[path]
+        self.pruned = len(stale)
+
+    def close(self):
+        pass
\ No newline at end of file
@@ -0,0 +1,170 @@
+# io/collector.py
+import os
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+from dev_common.profiling import NULL_PROFILER
+from ..core.parser import HeaderParser
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from .cache import IncludeCache
+
+# 每批文件数：过小会放大进程间通信开销，过大则导致各进程负载不均
+DEFAULT_BATCH_SIZE = 256
+
+# 子进程内的解析器实例，由 _init_worker 在进程启动时设置
+_worker_parser: HeaderParser = None
+
+def read_includes(parser: HeaderParser, file_path: str) -> List[str]:
+    """读取单个文件并返回其中的头文件列表"""
+    return parser.parse_file(file_path)
+
+def _read_includes_profiled(parser: HeaderParser, file_path: str, profiler) -> List[str]:
+    """
+    性能分析模式：把读取与正则解析拆成两个阶段分别计时。
+    为此改用一次性 read() 代替 mmap (mmap 的缺页发生在正则匹配过程中，无法单独计时)。
+    """
+    started = profiler.now()
+    with profiler.phase('read'):
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    with profiler.phase('parse'):
+        includes = parser.parse_bytes(data)
+    profiler.file_done(file_path, started, len(data))
+    return includes
+
+def _reader(parser: HeaderParser, profiler):
+    if not profiler.enabled:
+        return lambda file_path: read_includes(parser, file_path)
+    return lambda file_path: _read_includes_profiled(parser, file_path, profiler)
+
+def _count_files(parser: HeaderParser, paths: Iterable[str], profiler=NULL_PROFILER) -> Counter:
+    read = _reader(parser, profiler)
+    stats = Counter()
+    for file_path in paths:
+        try:
+            stats.update(read(file_path))
+        except Exception:
+            continue
+    return stats
+
+def _parse_files(parser: HeaderParser, paths: Iterable[str], profiler=NULL_PROFILER) -> List[Optional[List[str]]]:
+    """逐个解析文件，读取失败的文件对应位置为 None"""
+    read = _reader(parser, profiler)
+    results = []
+    for file_path in paths:
+        try:
+            results.append(read(file_path))
+        except Exception:
+            results.append(None)
+    return results
+
+def _init_worker(parser: HeaderParser):
+    global _worker_parser
+    _worker_parser = parser
+
+def _count_batch(paths: List[str]) -> Counter:
+    return _count_files(_worker_parser, paths)
+
+def _parse_batch(paths: List[str]) -> List[Optional[List[str]]]:
+    return _parse_files(_worker_parser, paths)
+
+def _batched(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class IncludeCollector:
+    def __init__(self, parser: HeaderParser, jobs: int = 1, batch_size: int = DEFAULT_BATCH_SIZE,
+                 profiler=NULL_PROFILER):
+        """
+        jobs <= 1 时串行扫描；jobs == 0 表示使用全部 CPU 核心。
+        profiler 只在串行路径上逐文件计时；并行时各子进程的耗时统一计入 'scan (parallel)' 阶段。
+        """
+        self.parser = parser
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.profiler = profiler
+
+    def _pool(self) -> 'ProcessPoolExecutor':
+        # multiprocessing 导入较慢，只在并行扫描时才加载
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=self.jobs,
+                                   initializer=_init_worker,
+                                   initargs=(self.parser,))
+
+    def collect(self, files: Iterable[str], cache: 'IncludeCache' = None) -> Counter:
+        if cache is not None:
+            return self._collect_cached(files, cache)
+
+        if self.jobs <= 1:
+            return _count_files(self.parser, files, self.profiler)
+
+        # 逻辑推导：
+        # 1. 文件按遍历顺序切成连续批次，每个子进程为自己的批次构建独立 Counter
+        # 2. pool.map 按提交顺序返回结果，依次合并后各头文件的首次出现顺序与串行一致
+        # 3. most_common 对同频项保持插入顺序，因此输出与串行扫描逐字节相同
+        stats = Counter()
+        with self.profiler.phase('scan (parallel)'), self._pool() as pool:
+            for partial in pool.map(_count_batch, _batched(files, self.batch_size)):
+                stats.update(partial)
+        return stats
+
+    def parse_many(self, paths: List[str]) -> List[Optional[List[str]]]:
+        """按输入顺序返回每个文件的头文件列表，读取失败的位置为 None"""
+        if self.jobs <= 1 or len(paths) <= self.batch_size:
+            return _parse_files(self.parser, paths, self.profiler)
+
+        results = []
+        with self.profiler.phase('scan (parallel)'), self._pool() as pool:
+            for partial in pool.map(_parse_batch, _batched(paths, self.batch_size)):
+                results.extend(partial)
+        return results
+
+    def collect_per_file(self, files: Iterable[str]) -> Dict[str, List[str]]:
+        """返回 {文件: 头文件列表}，保持遍历顺序；供需要逐文件增量更新的场景使用"""
+        paths = list(files)
+        return {path: includes
+                for path, includes in zip(paths, self.parse_many(paths))
+                if includes is not None}
+
+    def _collect_cached(self, files: Iterable[str], cache: 'IncludeCache') -> Counter:
+        # 1. 按遍历顺序查询缓存，未命中的文件留空位等待解析
+        ordered: List[Optional[List[str]]] = []
+        seen: List[str] = []
+        misses = []  # List[(slot, path, stat)]
+
+        for file_path in files:
+            with self.profiler.phase('cache'):
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                seen.append(file_path)
+                ordered.append(cache.lookup(file_path, st))
+            if ordered[-1] is None:
+                misses.append((len(ordered) - 1, file_path, st))
+
+        # 2. 仅解析新增或发生变化的文件，并回写缓存
+        parsed = self.parse_many([path for _, path, _ in misses])
+        with self.profiler.phase('cache'):
+            for (slot, file_path, st), includes in zip(misses, parsed):
+                if includes is None:
+                    continue
+                ordered[slot] = includes
+                cache.store(file_path, st, includes)
+
+            cache.prune(seen)
+
+        # 3. 按遍历顺序填充 Counter，保证与不使用缓存时的输出一致
+        stats = Counter()
+        for includes in ordered:
+            if includes:
+                stats.update(includes)
+        return stats
@@ -0,0 +1,162 @@
+# io/compdb.py
+import json
+import os
+import shlex
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+# 每次从磁盘读取的字符数；单条编译命令远小于该值
+_CHUNK_SIZE = 1 << 16
+
+class CompileCommand(NamedTuple):
+    file: str                     # 翻译单元的绝对路径
+    directory: str                # 编译时的工作目录
+    quote_dirs: List[str]         # -iquote：仅用于 "..." 形式
+    include_dirs: List[str]       # -I
+    system_dirs: List[str]        # -isystem
+    defines: Dict[str, Optional[str]]  # -D/-U 处理后的宏集合 (-U 的宏为 None，表示明确未定义)
+
+def iter_compile_entries(db_path: str) -> Iterator[dict]:
+    """
+    流式解析 compile_commands.json：逐个产出数组中的对象，
+    内存中只保留当前读取窗口，无需一次性加载整个文件。
+    """
+    decoder = json.JSONDecoder()
+    with open(db_path, 'r', encoding='utf-8', errors='ignore') as f:
+        buf = ''
+        pos = 0
+        eof = False
+        started = False
+
+        while True:
+            # 跳过空白与分隔符
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+
+            if pos >= len(buf):
+                if eof:
+                    raise ValueError(f"compile_commands 文件不完整: {db_path}")
+                buf = f.read(_CHUNK_SIZE)
+                pos = 0
+                eof = not buf
+                continue
+
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError(f"compile_commands 顶层应为数组: {db_path}")
+                started = True
+                pos += 1
+                continue
+
+            if buf[pos] == ']':
+                return
+
+            try:
+                entry, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # 当前对象跨越了读取窗口：丢弃已消费部分并追加下一块
+                chunk = f.read(_CHUNK_SIZE)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+
+            pos = end
+            if isinstance(entry, dict):
+                yield entry
+
+def _split_command(entry: dict) -> List[str]:
+    if 'arguments' in entry:
+        return list(entry['arguments'])
+    return shlex.split(entry.get('command', ''), posix=(os.name != 'nt'))
+
+def _take_value(args: List[str], i: int, flag: str) -> Optional[tuple]:
+    """
+    解析 "-Ifoo" 与 "-I foo" 两种写法。
+    返回 (值, 下一个参数下标)；不匹配时返回 None。
+    """
+    arg = args[i]
+    if arg == flag:
+        if i + 1 < len(args):
+            return args[i + 1], i + 2
+        return None
+    if arg.startswith(flag):
+        return arg[len(flag):], i + 1
+    return None
+
+def parse_compile_command(entry: dict) -> CompileCommand:
+    directory = entry.get('directory', '.')
+    args = _split_command(entry)
+    quote_dirs, include_dirs, system_dirs = [], [], []
+    defines: Dict[str, Optional[str]] = {}
+
+    def absolute(path: str) -> str:
+        return os.path.normpath(os.path.join(directory, path))
+
+    def define(value: str):
+        name, _, macro_value = value.partition('=')
+        defines[name] = macro_value if '=' in value else '1'
+
+    def undefine(value: str):
+        defines[value] = None
+
+    # 注意顺序：-isystem/-iquote 必须先于 -I 判断，否则会被误识别
+    handlers = [
+        ('-isystem', lambda v: system_dirs.append(absolute(v))),
+        ('-iquote', lambda v: quote_dirs.append(absolute(v))),
+        ('-I', lambda v: include_dirs.append(absolute(v))),
+        ('-D', define),
+        ('-U', undefine),
+    ]
+    # MSVC 风格参数仅在 cl/clang-cl 下识别，避免把 /Include/... 之类的路径误当成参数
+    compiler = os.path.basename(args[0]).lower() if args else ''
+    if compiler.startswith(('cl.', 'clang-cl')) or compiler == 'cl':
+        handlers += [
+            ('/I', lambda v: include_dirs.append(absolute(v))),
+            ('/D', define),
+            ('/U', undefine),
+        ]
+
+    i = 1
+    while i < len(args):
+        for flag, handle in handlers:
+            taken = _take_value(args, i, flag)
+            if taken is not None:
+                handle(taken[0])
+                i = taken[1]
+                break
+        else:
+            i += 1
+
+    return CompileCommand(
+        file=absolute(entry.get('file', '')),
+        directory=directory,
+        quote_dirs=quote_dirs,
+        include_dirs=include_dirs,
+        system_dirs=system_dirs,
+        defines=defines,
+    )
+
+def iter_translation_units(db_path: str) -> Iterator[CompileCommand]:
+    """逐个产出数据库中实际参与编译的翻译单元；同一文件多次出现时只取第一条"""
+    seen = set()
+    for entry in iter_compile_entries(db_path):
+        command = parse_compile_command(entry)
+        if command.file in seen or not os.path.isfile(command.file):
+            continue
+        seen.add(command.file)
+        yield command
+
+def command_flags(command: CompileCommand) -> List[str]:
+    """还原出影响预处理的编译参数，用于以相同配置重新编译该翻译单元"""
+    flags = []
+    for d in command.quote_dirs:
+        flags += ['-iquote', d]
+    for d in command.include_dirs:
+        flags += ['-I', d]
+    for d in command.system_dirs:
+        flags += ['-isystem', d]
+    for name, value in command.defines.items():
+        flags.append(f'-U{name}' if value is None else f'-D{name}={value}')
+    return flags
@@ -0,0 +1,109 @@
+# io/gitstore.py
+"""
+直接从 git 对象库读取任意版本的源码，无需检出：
+- `git ls-tree -r -z <rev>` 列出版本中的文件及其 blob SHA
+- 一个常驻的 `git cat-file --batch` 进程按 SHA 流式返回 blob 内容
+相同 SHA 的 blob 内容相同，解析结果按 SHA 复用 (比较两个版本时未变化的文件只解析一次)。
+"""
+import os
+import subprocess
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dev_common.git import GitError, iter_z
+from ..core.parser import HeaderParser
+
+# ls-tree 中的符号链接与子模块不是普通源码文件
+_SYMLINK_MODE = '120000'
+
+def resolve_revision(root: str, rev: str) -> str:
+    """解析为提交 SHA；版本不存在或不在 git 仓库中时抛出 GitError"""
+    try:
+        result = subprocess.run(['git', '-C', root, 'rev-parse', '--verify', '--quiet', f'{rev}^{{commit}}'],
+                                capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError) as e:
+        raise GitError(f"无法运行 git: {e}") from e
+    if result.returncode != 0:
+        raise GitError(f"无法解析版本 '{rev}' (目录 {root} 是否位于 git 仓库中?)")
+    return result.stdout.strip()
+
+def list_tree(root: str, rev: str) -> Iterator[Tuple[str, str]]:
+    """产出 (相对 root 的路径 ('/' 分隔), blob SHA)；只包含 root 子树中的普通文件"""
+    for entry in iter_z(root, ['ls-tree', '-r', '-z', rev], check=True):
+        meta, _, path = entry.partition('\t')
+        fields = meta.split()
+        if len(fields) != 3 or fields[1] != 'blob' or fields[0] == _SYMLINK_MODE:
+            continue
+        yield path, fields[2]
+
+class BlobReader:
+    """
+    对 `git cat-file --batch` 的封装：请求逐行写入 stdin，响应为 "<sha> <type> <size>\\n<内容>\\n"。
+    整个扫描只启动一个 git 进程，避免逐文件启动进程的开销。
+    """
+
+    def __init__(self, root: str):
+        try:
+            self._proc = subprocess.Popen(['git', '-C', root, 'cat-file', '--batch'],
+                                          stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                          stderr=subprocess.DEVNULL)
+        except OSError as e:
+            raise GitError(f"无法运行 git: {e}") from e
+
+    def read(self, sha: str) -> Optional[bytes]:
+        """返回 blob 内容；对象不存在时返回 None"""
+        self._proc.stdin.write(sha.encode('ascii') + b'\n')
+        self._proc.stdin.flush()
+        header = self._proc.stdout.readline()
+        if not header:
+            raise GitError("git cat-file 意外退出")
+        fields = header.split()
+        if len(fields) != 3:
+            # "<sha> missing"
+            return None
+        data = self._proc.stdout.read(int(fields[2]))
+        self._proc.stdout.read(1)
+        return data
+
+    def close(self):
+        if self._proc.stdin and not self._proc.stdin.closed:
+            self._proc.stdin.close()
+        self._proc.wait()
+        self._proc.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class RevisionScanner:
+    """
+    逐版本统计 #include：文件列表来自 ls-tree，内容来自 cat-file，解析使用 HeaderParser.parse_bytes。
+    同一扫描器多次调用 collect 时，SHA 相同的 blob 直接复用上次的解析结果。
+    """
+
+    def __init__(self, root: str, parser: HeaderParser, reader: BlobReader):
+        self.root = os.path.abspath(root)
+        self.parser = parser
+        self.reader = reader
+        self._parsed: Dict[str, List[str]] = {}
+        self.parsed = 0
+        self.reused = 0
+
+    def collect(self, entries: Iterable[Tuple[str, str]]) -> Counter:
+        """entries 为 (路径, blob SHA)"""
+        stats = Counter()
+        for _, sha in entries:
+            includes = self._parsed.get(sha)
+            if includes is None:
+                data = self.reader.read(sha)
+                if data is None:
+                    continue
+                includes = self.parser.parse_bytes(data)
+                self._parsed[sha] = includes
+                self.parsed += 1
+            else:
+                self.reused += 1
+            stats.update(includes)
+        return stats
\ No newline at end of file
@@ -0,0 +1,37 @@
+# io/history.py
+from collections import Counter
+from typing import NamedTuple
+
+from dev_common.git import iter_z
+
+# 每个提交的输出以该标记开头，随后是以 NUL 分隔的改动文件列表
+_COMMIT_MARK = '\x01'
+
+class ChangeHistory(NamedTuple):
+    commits: int
+    changes: Counter    # 相对 root 的路径 ('/' 分隔) -> 窗口内改动该文件的提交数
+
+def load_change_history(root: str, since: str = None, max_commits: int = 0) -> ChangeHistory:
+    """
+    单次流式读取 `git log --name-only -z`，统计 root 子树中各文件在窗口内的改动次数。
+    窗口由 since (git 日期，例如 "6 months ago") 与 max_commits (0 表示不限制) 共同限定。
+    不在 git 仓库中或 git 失败时抛出 dev_common.git.GitError。
+    """
+    # 不含 % 的格式串会被当作预定义格式名，标记需写成 %x01
+    args = ['log', '--name-only', '-z', '--format=%x01', '--relative']
+    if since:
+        args.append(f'--since={since}')
+    if max_commits > 0:
+        args.append(f'--max-count={max_commits}')
+
+    commits = 0
+    changes = Counter()
+    for token in iter_z(root, args, check=True):
+        if token == _COMMIT_MARK:
+            commits += 1
+            continue
+        # 每个提交的第一个文件名前带有格式行结尾的换行符
+        path = token.lstrip('\n')
+        if path:
+            changes[path] += 1
+    return ChangeHistory(commits, changes)
\ No newline at end of file
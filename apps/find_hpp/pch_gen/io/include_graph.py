@@ -0,0 +1,160 @@
+# io/include_graph.py
+import os
+import sys
+from collections import Counter, deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..core.graph import IncludeGraph
+from ..core.parser import HeaderParser
+
+class IncludeResolver:
+    def __init__(self, include_dirs: List[str], system_dirs: List[str], quote_dirs: List[str] = ()):
+        self.quote_dirs = [os.path.normpath(os.path.abspath(d)) for d in quote_dirs]
+        self.include_dirs = [os.path.normpath(os.path.abspath(d)) for d in include_dirs]
+        self.system_dirs = [os.path.normpath(os.path.abspath(d)) for d in system_dirs]
+        self._system_prefixes = tuple(d.rstrip(os.sep) + os.sep for d in self.system_dirs)
+        # (头文件, 引号形式时的当前目录) -> 解析结果，避免重复的 isfile 调用
+        self._memo: Dict[Tuple[str, Optional[str]], Optional[str]] = {}
+
+    def resolve(self, spelling: str, quoted: bool, current_dir: str) -> Optional[str]:
+        """
+        查找顺序与 GCC/Clang 一致：
+        1. 引号形式先查当前文件所在目录，再查 -iquote 目录
+        2. 依次查 -I 目录与系统目录 (-isystem 及编译器内置目录)
+        """
+        key = (spelling, current_dir if quoted else None)
+        if key in self._memo:
+            return self._memo[key]
+
+        search_dirs = ([current_dir] + self.quote_dirs if quoted else []) + self.include_dirs + self.system_dirs
+        found = None
+        for directory in search_dirs:
+            candidate = os.path.normpath(os.path.join(directory, spelling))
+            if os.path.isfile(candidate):
+                found = candidate
+                break
+
+        self._memo[key] = found
+        return found
+
+    def is_system(self, path: str) -> bool:
+        return path.startswith(self._system_prefixes)
+
+class GraphBuilder:
+    def __init__(self, weight: str = 'bytes'):
+        """
+        weight: 'bytes' 或 'lines'，决定一个文件"有多重"。
+        """
+        self.weight = weight
+        self.unresolved = Counter()
+
+    @staticmethod
+    def _read(path: str) -> Optional[bytes]:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _weight(self, raw: Optional[bytes]) -> int:
+        if raw is None:
+            return 0
+        return raw.count(b'\n') + 1 if self.weight == 'lines' else len(raw)
+
+    @staticmethod
+    def _directives(raw: Optional[bytes], parser: HeaderParser) -> List[Tuple[str, bool]]:
+        if raw is None:
+            return []
+        return parser.parse_directives(raw.decode('utf-8', errors='ignore'))
+
+    def build(self, units: Iterable[Tuple[str, IncludeResolver, HeaderParser]]) -> Tuple[IncludeGraph, Dict[int, Counter]]:
+        """
+        从各翻译单元出发广度优先展开全部包含关系。
+        units: [(翻译单元路径, 该单元使用的解析器, 按该单元宏定义求值的头文件解析器)]。同一头文件被不同编译参数的
+        翻译单元包含时，会用各自的解析器分别展开 (按 (文件, 解析器) 去重)；文件体积只读取一次。
+        返回: (包含图, {被项目文件直接包含的节点: 各写法出现次数})
+        """
+        graph = IncludeGraph()
+        spellings: Dict[int, Counter] = {}
+        directives: Dict[Tuple[int, int], List[Tuple[str, bool]]] = {}
+        expanded = set()
+        pending = deque()
+
+        def visit(path: str, resolver: IncludeResolver, parser: HeaderParser) -> int:
+            node = graph.node_id(path)
+            if node == -1:
+                raw = self._read(path)
+                node = graph.add_node(path, self._weight(raw))
+                directives[node, id(parser)] = self._directives(raw, parser)
+            key = (node, id(resolver), id(parser))
+            if key not in expanded:
+                expanded.add(key)
+                if (node, id(parser)) not in directives:
+                    # 已按其他宏定义读取过的头文件，需要按当前翻译单元的宏重新求值
+                    directives[node, id(parser)] = self._directives(self._read(path), parser)
+                pending.append((node, resolver, parser))
+            return node
+
+        for tu, resolver, parser in units:
+            graph.mark_tu(visit(os.path.normpath(os.path.abspath(tu)), resolver, parser))
+
+        while pending:
+            node, resolver, parser = pending.popleft()
+            path = graph.paths[node]
+            current_dir = os.path.dirname(path)
+            from_project = not resolver.is_system(path)
+
+            for spelling, quoted in directives[node, id(parser)]:
+                target = resolver.resolve(spelling, quoted, current_dir)
+                if target is None:
+                    if from_project:
+                        self.unresolved[spelling] += 1
+                    continue
+                target_node = visit(target, resolver, parser)
+                graph.add_edge(node, target_node)
+                if from_project:
+                    spellings.setdefault(target_node, Counter())[spelling] += 1
+
+        if self.unresolved:
+            print(f"// 未能解析的头文件: {len(self.unresolved)} 个 (已忽略)", file=sys.stderr)
+
+        return graph, spellings
+
+def collect_reachable(units: Iterable[Tuple[str, IncludeResolver, HeaderParser]],
+                      keep: Callable[[str], bool]) -> Dict[str, List[str]]:
+    """
+    count 模式下的 compile_commands.json 统计：从各翻译单元出发，只沿解析到的、keep(路径) 为真的非系统头文件展开。
+    返回 {文件: 头文件列表}，列表与逐文件扫描 (parser.parse_bytes) 的结果一致，按首次到达的顺序排列 (翻译单元在前)。
+    每个文件只读取一次，按首个到达它的翻译单元的宏定义求值。
+    """
+    includes: Dict[str, List[str]] = {}
+    pending = deque()
+
+    def visit(path: str, resolver: IncludeResolver, parser: HeaderParser):
+        if path in includes:
+            return
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            includes[path] = []
+            return
+        includes[path] = parser.parse_bytes(data)
+        pending.append((path, resolver, parser, data))
+
+    for tu, resolver, parser in units:
+        visit(os.path.normpath(os.path.abspath(tu)), resolver, parser)
+
+    while pending:
+        path, resolver, parser, data = pending.popleft()
+        # 只展开被统计到的 #include，使 --full-scan 与前导区模式下的展开范围与统计范围一致
+        counted = set(includes[path])
+        current_dir = os.path.dirname(path)
+        for spelling, quoted in parser.parse_directives(data.decode('utf-8', errors='ignore')):
+            if spelling not in counted:
+                continue
+            target = resolver.resolve(spelling, quoted, current_dir)
+            if target is not None and not resolver.is_system(target) and keep(target):
+                visit(target, resolver, parser)
+
+    return includes
\ No newline at end of file
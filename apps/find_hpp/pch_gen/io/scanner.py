@@ -1,23 +1,33 @@
 # io/scanner.py
 import os
-from typing import Iterator, Tuple, List
+from typing import Iterable, Iterator, Tuple, List
+
+from dev_common.walker import DEFAULT_EXCLUDE_DIRS, SourceWalker
 
 class FileFinder:
-    def __init__(self, extensions: Tuple[str, ...], exclude_names: List[str] = None):
+    def __init__(self, extensions: Tuple[str, ...], exclude_names: List[str] = None,
+                 exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS, use_ignore: bool = True):
         self.extensions = extensions
         # 将排除名单存入 set 以实现 O(1) 查找
         self.exclude_names = set(exclude_names) if exclude_names else set()
+        self.exclude_dirs = tuple(exclude_dirs)
+        self.use_ignore = use_ignore
+
+    def walker(self, root_path: str) -> SourceWalker:
+        return SourceWalker(root_path, self.extensions, self.exclude_dirs, self.use_ignore)
 
     def find_files(self, root_path: str) -> Iterator[str]:
         if not os.path.isdir(root_path):
             return
-            
-        for root, _, files in os.walk(root_path):
-            for file in files:
-                # 逻辑推导：
-                # 1. 检查后缀是否匹配
-                # 2. 检查文件名是否在黑名单中
-                if file.lower().endswith(self.extensions):
-                    if file.lower() in self.exclude_names:
-                        continue
-                    yield os.path.join(root, file)
\ No newline at end of file
+
+        # 忽略目录在进入前即被剪枝；git 工作区内直接读取 git ls-files
+        for path in self.walker(root_path).files():
+            if os.path.basename(path).lower() in self.exclude_names:
+                continue
+            yield path
+
+    def filter_relative(self, root_path: str, rel_paths: Iterable[str]) -> Iterator[str]:
+        """过滤相对 root_path 的路径 (例如某个 git 版本中的文件，不要求存在于工作区)，产出绝对路径"""
+        for path in self.walker(root_path).filter_relative(rel_paths):
+            if os.path.basename(path).lower() not in self.exclude_names:
+                yield path
\ No newline at end of file
@@ -0,0 +1,139 @@
+# io/sysinc.py
+import json
+import os
+import shutil
+import subprocess
+from typing import Iterable, List, Set, Tuple
+
+def default_compiler() -> str:
+    """优先使用环境变量 CXX 指定的编译器"""
+    return os.environ.get("CXX", "c++")
+
+def query_system_include_dirs(compiler: str) -> List[str]:
+    """
+    通过 `<compiler> -E -x c++ - -v` 获取编译器的系统头文件搜索路径。
+    编译器不存在或输出无法识别时返回空列表。
+    """
+    try:
+        result = subprocess.run(
+            [compiler, "-E", "-x", "c++", "-", "-v"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="ignore",
+            timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return []
+
+    dirs = []
+    in_list = False
+    for line in result.stderr.splitlines():
+        if line.startswith("#include <...> search starts here:"):
+            in_list = True
+        elif line.startswith("End of search list."):
+            break
+        elif in_list:
+            path = line.strip().replace(" (framework directory)", "")
+            if os.path.isdir(path):
+                dirs.append(os.path.normpath(path))
+    return dirs
+
+def default_cache_dir() -> str:
+    """按平台惯例选择用户级缓存目录"""
+    base = (os.environ.get("XDG_CACHE_HOME")
+            or os.environ.get("LOCALAPPDATA")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "find_hpp")
+
+def is_cxx_library_dir(directory: str) -> bool:
+    """编译器自带的 C++ 标准库目录，如 /usr/include/c++/12、.../include/c++/v1"""
+    return 'c++' in os.path.normpath(directory).split(os.sep)
+
+def index_system_headers(dirs: List[str], subdirs: Tuple[str, ...],
+                         standard_names: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """
+    列出系统目录中可直接 #include 的头文件名：
+    顶层的无后缀文件 (如 span、ranges) 与 .h 文件，以及指定子目录中的头文件 (如 sys/types.h)。
+    返回 (标准库头文件, 平台与第三方库头文件)：编译器 C++ 目录中的头文件以及 standard_names
+    (C 标准库与 POSIX) 归为前者，系统目录中的其余头文件 (zlib.h 等) 归为后者。
+    """
+    standard_names = set(standard_names)
+    headers = set()
+    standard = set()
+    for directory in dirs:
+        cxx = is_cxx_library_dir(directory)
+        for rel_dir in ('',) + subdirs:
+            try:
+                entries = os.scandir(os.path.join(directory, rel_dir))
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    if '.' in name and not name.endswith('.h'):
+                        continue
+                    if entry.is_file():
+                        header = f"{rel_dir}/{name}" if rel_dir else name
+                        headers.add(header)
+                        if cxx or header in standard_names:
+                            standard.add(header)
+    return standard, headers - standard
+
+def _dir_fingerprint(dirs: List[str]) -> List[int]:
+    # 目录 mtime 在增删文件时会变化，用于判断索引是否过期
+    stamps = []
+    for directory in dirs:
+        try:
+            stamps.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            stamps.append(0)
+    return stamps
+
+def load_system_headers(compiler: str, subdirs: Tuple[str, ...], standard_names: Iterable[str],
+                        cache_dir: str = None) -> Tuple[List[str], Set[str], Set[str]]:
+    """
+    返回 (系统头文件目录, 标准库头文件集合, 平台与第三方库头文件集合)，分类规则见 index_system_headers。
+    结果按编译器缓存到 cache_dir，编译器或系统目录未变化时不再调用编译器与遍历目录。
+    """
+    standard_names = sorted(standard_names)
+    compiler_path = shutil.which(compiler) or compiler
+    try:
+        compiler_stamp = os.stat(compiler_path).st_mtime_ns
+    except OSError:
+        compiler_stamp = 0
+
+    cache_path = os.path.join(cache_dir or default_cache_dir(), "system_headers.json")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+
+    entry = cached.get(compiler_path)
+    if (entry and entry.get('compiler_stamp') == compiler_stamp
+            and entry.get('subdirs') == list(subdirs)
+            and entry.get('standard_names') == standard_names
+            and entry.get('dir_stamps') == _dir_fingerprint(entry['dirs'])):
+        return entry['dirs'], set(entry['standard']), set(entry['platform'])
+
+    dirs = query_system_include_dirs(compiler)
+    standard, platform = index_system_headers(dirs, subdirs, standard_names)
+    if dirs:
+        cached[compiler_path] = {
+            'compiler_stamp': compiler_stamp,
+            'subdirs': list(subdirs),
+            'standard_names': standard_names,
+            'dirs': dirs,
+            'dir_stamps': _dir_fingerprint(dirs),
+            'standard': sorted(standard),
+            'platform': sorted(platform),
+        }
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cached, f)
+        except OSError:
+            pass
+    return dirs, standard, platform
@@ -0,0 +1,185 @@
+# io/validator.py
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+from ..config import C_SOURCE_EXTENSIONS
+
+# 渲染 PCH 内容的回调：(候选列表, 输出流) -> None，由 main 基于 writer 组装
+PchRenderer = Callable[[List[Tuple[str, int]], TextIO], None]
+
+class SampleUnit(NamedTuple):
+    path: str
+    flags: List[str]          # 该翻译单元自身的 -I/-D 等参数
+
+class ValidationResult(NamedTuple):
+    kept: List[Tuple[str, int]]
+    savings_ms: Dict[str, float]      # 通过验证的头文件 -> 预计净节省 (毫秒)
+    dropped: Dict[str, str]           # 被剔除的头文件 -> 原因
+
+class CompileProbe:
+    def __init__(self, compiler: str, flags: List[str], repeat: int = 2, timeout: int = 300):
+        self.compiler = compiler
+        self.flags = flags
+        self.repeat = max(1, repeat)
+        self.timeout = timeout
+        self.is_clang = self._detect_clang()
+
+    def _detect_clang(self) -> bool:
+        try:
+            out = subprocess.run([self.compiler, "--version"], capture_output=True,
+                                 text=True, errors="ignore", timeout=30).stdout
+        except (OSError, subprocess.SubprocessError):
+            return False
+        return "clang" in out.lower()
+
+    def _run(self, args: List[str]) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            result = subprocess.run([self.compiler] + args, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=self.timeout)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        return time.perf_counter() - start
+
+    def measure(self, source: str, extra_flags: List[str] = ()) -> Optional[Tuple[float, float]]:
+        """
+        只做语法/语义分析 (-fsyntax-only)：PCH 节省的正是前端解析时间。
+        C 源文件按 C 编译，其余按 C++ 编译。
+        返回 (多次运行的最小值, 最大值与最小值之差)，后者用于估计计时噪声；编译失败返回 None。
+        """
+        language = "c" if source.lower().endswith(C_SOURCE_EXTENSIONS) else "c++"
+        times = []
+        for _ in range(self.repeat):
+            elapsed = self._run(["-x", language, "-fsyntax-only"] + self.flags + list(extra_flags) + [source])
+            if elapsed is None:
+                return None
+            times.append(elapsed)
+        return min(times), max(times) - min(times)
+
+    def time_syntax(self, source: str, extra_flags: List[str] = ()) -> Optional[float]:
+        """多次运行取最小值以降低调度噪声；编译失败返回 None"""
+        measured = self.measure(source, extra_flags)
+        return None if measured is None else measured[0]
+
+    def build_pch(self, header: str) -> Optional[float]:
+        """生成与 header 同目录的预编译产物，-include header 时编译器会自动使用它"""
+        output = header + (".pch" if self.is_clang else ".gch")
+        return self._run(["-x", "c++-header"] + self.flags + [header, "-o", output])
+
+class PchValidator:
+    def __init__(self, probe: CompileProbe, render: PchRenderer, workdir: str, min_saving_ms: float = 0.0):
+        """min_saving_ms: 预计净节省低于该值的头文件不值得放入 PCH (与计时噪声无法区分)"""
+        self.probe = probe
+        self.render = render
+        self.workdir = workdir
+        self.min_saving_ms = min_saving_ms
+        os.makedirs(workdir, exist_ok=True)
+
+    def _write(self, name: str, items: List[Tuple[str, int]]) -> str:
+        path = os.path.join(self.workdir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            self.render(items, f)
+        return path
+
+    def _log(self, message: str):
+        print(f"// [validate] {message}", file=sys.stderr)
+
+    def validate(self, items: List[Tuple[str, int]], samples: List[SampleUnit],
+                 total_tus: int) -> ValidationResult:
+        """
+        1. 逐个单独编译候选头文件，剔除无法独立编译的项，并测得每个头文件的解析耗时
+        2. 生成并编译 PCH，测量空 TU 加载 PCH 的额外开销
+        3. 以 (包含该头文件的 TU 数 × 解析耗时) - (按耗时分摊的 PCH 加载开销 × 全部 TU) 估算净收益，
+           剔除不划算或收益低于阈值 (min_saving_ms 与 TU 数 × 重复计时波动中的较大者) 的项
+        4. 用最终 PCH 对抽样的真实 TU 做 A/B 计时
+        """
+        dropped: Dict[str, str] = {}
+        empty = self._write("empty.cpp", [])
+        measured = self.probe.measure(empty)
+        if measured is None:
+            raise RuntimeError(f"编译器 '{self.probe.compiler}' 无法编译空文件，请检查 --compiler 与 --validate-flags")
+        baseline, baseline_noise = measured
+
+        # 1. 独立编译
+        cost: Dict[str, float] = {}
+        noise: Dict[str, float] = {}
+        for header, count in items:
+            measured = self.probe.measure(self._write("isolated.cpp", [(header, count)]))
+            if measured is None:
+                dropped[header] = "无法独立编译"
+                continue
+            cost[header] = max(0.0, measured[0] - baseline)
+            # 解析耗时是两次计时之差，误差为两者的波动之和
+            noise[header] = measured[1] + baseline_noise
+        survivors = [(h, c) for h, c in items if h in cost]
+        self._log(f"空 TU 基线 {baseline * 1000:.1f} ms，独立编译通过 {len(survivors)}/{len(items)}")
+
+        # 2. PCH 加载开销
+        pch = self._write("pch.hpp", survivors)
+        build_time = self.probe.build_pch(pch) if survivors else None
+        if build_time is None:
+            for header, _ in survivors:
+                dropped[header] = "PCH 整体编译失败"
+            return ValidationResult([], {}, dropped)
+
+        with_pch = self.probe.time_syntax(empty, ["-include", pch])
+        if with_pch is None:
+            # 能生成 PCH 却无法在 TU 中加载 (例如标志不一致)，此时无法估算加载开销，也就无法判断是否划算
+            for header, _ in survivors:
+                dropped[header] = "PCH 无法在空 TU 中加载"
+            self._log("PCH 已生成，但使用 -include 加载时编译失败")
+            for header, reason in dropped.items():
+                self._log(f"剔除 {header}: {reason}")
+            return ValidationResult([], {}, dropped)
+        load_overhead = max(0.0, with_pch - baseline)
+        self._log(f"PCH 编译 {build_time * 1000:.0f} ms，空 TU 加载开销 {load_overhead * 1000:.1f} ms")
+
+        # 3. 净收益
+        total_cost = sum(cost[h] for h, _ in survivors) or 1.0
+        savings_ms: Dict[str, float] = {}
+        kept = []
+        for header, count in survivors:
+            if count <= 0:
+                dropped[header] = "没有翻译单元包含该头文件"
+                continue
+            share = load_overhead * cost[header] / total_cost
+            net = count * cost[header] - total_tus * share
+            if net <= 0:
+                dropped[header] = f"净收益为负 ({net * 1000:.1f} ms)"
+                continue
+            threshold = max(self.min_saving_ms, count * noise[header] * 1000)
+            if net * 1000 < threshold:
+                dropped[header] = f"预计节省 {net * 1000:.1f} ms 低于阈值 {threshold:.1f} ms"
+                continue
+            savings_ms[header] = net * 1000
+            kept.append((header, count))
+
+        # 4. 抽样 A/B
+        if kept and samples:
+            pch = self._write("pch.hpp", kept)
+            self.probe.build_pch(pch)
+            before = after = 0.0
+            measured = 0
+            for unit in samples:
+                t0 = self.probe.time_syntax(unit.path, unit.flags)
+                t1 = self.probe.time_syntax(unit.path, unit.flags + ["-include", pch])
+                if t0 is None or t1 is None:
+                    continue
+                before += t0
+                after += t1
+                measured += 1
+            if measured:
+                self._log(f"抽样 {measured} 个 TU: 无 PCH {before * 1000:.0f} ms -> 有 PCH {after * 1000:.0f} ms "
+                          f"(节省 {(before - after) / before:.1%})")
+            else:
+                self._log("抽样 TU 均无法编译，跳过 A/B 计时 (可通过 --compile-commands 或 -I 提供编译参数)")
+
+        for header, reason in dropped.items():
+            self._log(f"剔除 {header}: {reason}")
+
+        return ValidationResult(kept, savings_ms, dropped)
\ No newline at end of file
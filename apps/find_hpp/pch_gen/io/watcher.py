@@ -0,0 +1,173 @@
+# io/watcher.py
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+# inotify 事件掩码 (见 <sys/inotify.h>)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+# 收到首个事件后继续等待的时间，把一次保存产生的多个事件合并为一批
+DEBOUNCE_SECONDS = 0.05
+
+class ChangeBatch:
+    def __init__(self, paths: Set[str], rescan: bool = False):
+        self.paths = paths
+        # 事件队列溢出等情况下无法得知具体变化，需要全量重新扫描
+        self.rescan = rescan
+
+class InotifyWatcher:
+    """基于 Linux inotify 的目录监听，延迟与仓库规模无关"""
+
+    def __init__(self, root: str, iter_dirs: Optional[Callable[[str], Iterable[str]]] = None):
+        """iter_dirs: 产出某目录下需要监听的全部目录 (含自身)，用于跳过被忽略的目录；默认监听全部"""
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self._dirs: Dict[int, str] = {}
+        self._iter_dirs = iter_dirs or (lambda top: (current for current, _, _ in os.walk(top)))
+        try:
+            self._add_tree(root)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _add_watch(self, directory: str):
+        """目录在遍历后被删除时忽略；其余失败 (如 ENOSPC 超出 max_user_watches) 抛出 OSError"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(err, f"无法监听目录 {directory}: {os.strerror(err)}")
+        self._dirs[wd] = directory
+
+    def _add_tree(self, root: str) -> Set[str]:
+        """监听 root 下全部目录，返回其中已存在的文件 (新建目录时视为变化)；任一目录无法监听时抛出 OSError"""
+        files = set()
+        for current in self._iter_dirs(root):
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as entries:
+                    files.update(entry.path for entry in entries if not entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+        return files
+
+    def _drain(self, batch: ChangeBatch):
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += _EVENT_HEADER.size + length
+
+            if mask & _IN_Q_OVERFLOW:
+                batch.rescan = True
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    try:
+                        batch.paths.update(self._add_tree(path))
+                    except OSError as e:
+                        # 运行中无法再切换为轮询：提示用户，并全量扫描一次以纳入新目录中已有的文件
+                        print(f"// [watch] 警告: {e}，该目录中之后的改动不会被发现 (可使用 --poll)", file=sys.stderr)
+                        batch.rescan = True
+                elif mask & _IN_MOVED_FROM:
+                    # 目录被移走：无法逐个得知其中的文件，交给全量扫描
+                    batch.rescan = True
+                continue
+
+            # 新建文件等写完 (CLOSE_WRITE) 后再处理，避免读到半个文件
+            if mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_DELETE):
+                batch.paths.add(path)
+
+    def wait(self, timeout: Optional[float] = None) -> ChangeBatch:
+        batch = ChangeBatch(set())
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return batch
+
+        deadline = time.monotonic() + DEBOUNCE_SECONDS
+        while True:
+            self._drain(batch)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            select.select([self._fd], [], [], remaining)
+        return batch
+
+    def close(self):
+        os.close(self._fd)
+
+class PollingWatcher:
+    """通用后备方案：定期比较文件的 (mtime, size) 快照"""
+
+    def __init__(self, list_files: Callable[[], Iterable[str]], interval: float = 1.0):
+        self._list_files = list_files
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in self._list_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> ChangeBatch:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self._take_snapshot()
+        changed = {p for p, stamp in current.items() if self._snapshot.get(p) != stamp}
+        changed.update(p for p in self._snapshot if p not in current)
+        self._snapshot = current
+        return ChangeBatch(changed)
+
+    def close(self):
+        pass
+
+def create_watcher(root: str, list_files: Callable[[], Iterable[str]], force_polling: bool = False,
+                   iter_dirs: Optional[Callable[[str], Iterable[str]]] = None):
+    """优先使用 inotify，不可用 (非 Linux 或超出 watch 数量限制) 时退回轮询"""
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, iter_dirs)
+        except (OSError, AttributeError) as e:
+            print(f"// [watch] inotify 不可用 ({e})，改用轮询", file=sys.stderr)
+    return PollingWatcher(list_files)
\ No newline at end of file
@@ -1,6 +1,8 @@
 # io/writer.py
+import json
+import os
 import sys
-from typing import TextIO
+from typing import Dict, List, TextIO
 
 # 修改点：从兄弟目录 core.analyzer 导入数据结构
 # .. 表示上一级目录 (pch_gen)，然后进入 core
@@ -11,7 +13,7 @@ def _get_root_dir(path: str) -> str:
         return path.split('/')[0]
     return ""
 
-def _write_section(stream: TextIO, section: PchSection):
+def _write_section(stream: TextIO, section: PchSection, report: PchReport):
     # ... (内容保持不变) ...
     stream.write(f"// ===================================================================\n")
     stream.write(f"//  {section.title}\n")
@@ -30,7 +32,10 @@ def _write_section(stream: TextIO, section: PchSection):
             stream.write("\n")
         last_root_dir = current_root_dir
 
-        comment = f"// 使用次数: {count}"
+        comment = f"// {report.metric_label}: {count}"
+        note = report.notes.get(header)
+        if note:
+            comment += f" ({note})"
         line = ""
 
         if section.category_type == 'std':
@@ -39,12 +44,6 @@ def _write_section(stream: TextIO, section: PchSection):
                 comment += " (C++23)"
         
         elif section.category_type == '3rd':
-            if header == "windows.h":
-                stream.write("#ifdef _WIN32\n")
-                stream.write(f"    #include <windows.h>                      {comment}\n")
-                stream.write("#endif\n")
-                continue
-            
             if header.endswith(".h") or "/" in header:
                 line = f"#include <{header}>"
             else:
@@ -52,6 +51,14 @@ def _write_section(stream: TextIO, section: PchSection):
         
         else: # Proj
             line = f"#include \"{header}\""
+
+        guard = report.guards.get(header)
+        if guard:
+            # 单个宏名写成 #ifdef，其余按 #if 表达式原样写出
+            stream.write(f"#ifdef {guard}\n" if guard.isidentifier() else f"#if {guard}\n")
+            stream.write(f"{('    ' + line).ljust(45)} {comment}\n")
+            stream.write("#endif\n")
+            continue
         
         stream.write(f"{line.ljust(45)} {comment}\n")
     
@@ -63,6 +70,44 @@ def write_pch_content(report: PchReport, stream: TextIO = sys.stdout):
     stream.write("#define PCH_H\n\n")
 
     for section in report.sections:
-        _write_section(stream, section)
+        _write_section(stream, section, report)
+
+    stream.write("#endif //PCH_H\n")
+
+def write_pch_file(report: PchReport, path: str):
+    """写入临时文件后原子替换，避免构建系统或编辑器读到写了一半的 PCH"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        write_pch_content(report, stream=f)
+    os.replace(tmp_path, path)
+
+def write_manifest(manifest: dict, path: str):
+    """以 JSON 写入分区清单，同样采用临时文件 + 原子替换"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+def _write_atomic(path: str, text: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_unity_source(path: str, sources: List[str], summary: str):
+    """写入 unity 源文件：依次包含组内各 TU (路径相对于 unity 文件所在目录)"""
+    base = os.path.dirname(os.path.abspath(path))
+    lines = ["// 由 find_hpp --unity 生成，请勿手动修改", f"// {summary}"]
+    lines += [f'#include "{os.path.relpath(source, base).replace(os.sep, "/")}"' for source in sources]
+    _write_atomic(path, "\n".join(lines) + "\n")
 
-    stream.write("#endif //PCH_H\n")
\ No newline at end of file
+def write_unity_cmake(path: str, lists: Dict[str, List[str]]):
+    """写入 CMake 源文件列表：变量名 -> 文件路径 (相对于该 .cmake 文件所在目录)"""
+    base = os.path.dirname(os.path.abspath(path))
+    lines = ["# 由 find_hpp --unity 生成，请勿手动修改"]
+    for name, files in lists.items():
+        lines.append(f"set({name}")
+        lines += [f'  "${{CMAKE_CURRENT_LIST_DIR}}/{os.path.relpath(f, base).replace(os.sep, "/")}"' for f in files]
+        lines.append(")")
+    _write_atomic(path, "\n".join(lines) + "\n")
\ No newline at end of file
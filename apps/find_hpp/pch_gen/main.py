@@ -1,62 +1,815 @@
 # main.py
+import os
 import sys
 import argparse
+import time
 from collections import Counter
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from dev_common.profiling import add_profile_arguments, create_profiler
+from dev_common.walker import DEFAULT_EXCLUDE_DIRS
 
 # 注意：这里路径发生了变化
 from . import config
 from .io.scanner import FileFinder          
-from .core.parser import HeaderParser       
+from .io.collector import IncludeCollector
+from .io.sysinc import default_compiler, load_system_headers
+from .core.parser import ConditionalParser, HeaderParser
+from .core.preproc import parse_define, parse_macro_list, parse_undefine, split_tagged_counts
 from .core.classifier import HeaderClassifier
 from .core.analyzer import ReportGenerator 
-from .io.writer import write_pch_content
+from .io.writer import write_pch_content, write_pch_file, write_manifest
+
+# 缓存 (sqlite3)、监听 (ctypes)、验证、包含图与分区等模块只在对应选项启用时使用，
+# 延迟到使用处导入，缩短默认运行与常驻进程客户端回退时的启动时间
+if TYPE_CHECKING:
+    from .io.include_graph import IncludeResolver
+    from .io.validator import SampleUnit
+
+def _define_arg(text: str) -> Tuple[str, str]:
+    try:
+        return parse_define(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def _undefine_arg(text: str) -> str:
+    try:
+        return parse_undefine(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def _config_arg(text: str) -> Tuple[str, Dict[str, Optional[str]]]:
+    name, sep, macros = text.partition('=')
+    if not sep or not name or not all(c.isalnum() or c in '_.-' for c in name):
+        raise argparse.ArgumentTypeError(f"格式应为 NAME=MACROS (NAME 只含字母、数字、_ . -): '{text}'")
+    try:
+        return name, parse_macro_list(macros)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
-def parse_arguments():
+def parse_arguments(argv=None):
     parser = argparse.ArgumentParser(description="PCH (预编译头文件) 生成工具")
     parser.add_argument("src_path", help="源代码根目录")
     parser.add_argument("-n", "--top", type=int, default=50, help="分析前 N 个高频头文件")
     parser.add_argument("--extra-libs", nargs="+", default=[], help="追加第三方库前缀 (例如: mylib/)")
-    return parser.parse_args()
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="并行扫描的进程数 (0 表示使用全部 CPU 核心)")
+    parser.add_argument("--cache", metavar="PATH",
+                        help=f"增量索引缓存文件路径 (默认: ~/.cache/find_hpp/{config.INDEX_CACHE_SUBDIR}/ 下按扫描目录区分的文件)")
+    parser.add_argument("--no-cache", action="store_true", help="禁用增量索引缓存，重新解析全部文件")
+    parser.add_argument("--rank", choices=["count", "cost"], default="count",
+                        help="排序依据: count=直接包含次数, cost=传递包含的 TU 数 × 展开体积")
+    parser.add_argument("-I", "--include-dir", action="append", default=[], metavar="DIR",
+                        help="cost 模式下的头文件搜索目录 (可多次指定)")
+    parser.add_argument("--compiler", default=default_compiler(),
+                        help="用于查询系统头文件目录的编译器 (默认: $CXX 或 c++)")
+    parser.add_argument("--no-system-index", action="store_true",
+                        help="不索引编译器系统目录，仅使用内置的标准库列表分类")
+    parser.add_argument("--cost-unit", choices=["bytes", "lines"], default="bytes",
+                        help="cost 模式下衡量头文件体积的单位")
+    parser.add_argument("--full-scan", action="store_true",
+                        help="扫描整个文件 (默认只扫描文件开头注释与预处理指令组成的前导区)")
+    parser.add_argument("--compile-commands", metavar="PATH",
+                        help="只统计 compile_commands.json 中实际编译的翻译单元及其按各自的 -I/-isystem 实际包含到的 "
+                             "src_path 下的头文件 (此时不使用增量索引缓存)；#if 按各翻译单元的 -D/-U 求值，"
+                             "--rank cost 与 --validate 同样使用其各自的编译参数")
+    parser.add_argument("--validate", action="store_true",
+                        help="用本机编译器实际编译并计时，剔除无法独立编译或不划算的头文件")
+    parser.add_argument("--validate-flags", default="-std=c++20",
+                        help="验证时附加的编译参数 (默认: -std=c++20)")
+    parser.add_argument("--validate-samples", type=int, default=8,
+                        help="用于 A/B 计时的抽样翻译单元数量")
+    parser.add_argument("--validate-min-saving", type=float, default=config.VALIDATE_MIN_SAVING_MS, metavar="MS",
+                        help=f"剔除预计净节省低于该值的头文件 (默认: {config.VALIDATE_MIN_SAVING_MS} ms；"
+                             "阈值同时不低于 TU 数 × 重复计时的波动)")
+    parser.add_argument("--validate-dir", help="验证用临时文件目录 (默认使用临时目录，验证结束后删除；指定时保留其中的 PCH 与中间文件)")
+    parser.add_argument("-o", "--output", metavar="PATH", help="将生成的 PCH 写入文件 (默认输出到 stdout)")
+    parser.add_argument("--watch", action="store_true",
+                        help="首次扫描后持续监听文件变化，Top-N 集合变化时重写 --output")
+    parser.add_argument("--poll", action="store_true", help="watch 模式下强制使用轮询而非 inotify")
+    parser.add_argument("--partition", type=int, default=0, metavar="N",
+                        help="按头文件集合的相似度对翻译单元聚类，最多生成 N 个 PCH 及其使用清单")
+    parser.add_argument("--partition-dir", default="pch_partitions", metavar="DIR",
+                        help="分区模式的输出目录 (默认: ./pch_partitions)")
+    parser.add_argument("--similarity", type=float, default=config.PARTITION_SIMILARITY,
+                        help=f"分区模式下 TU 归入同一组所需的最低 Jaccard 相似度 (默认: {config.PARTITION_SIMILARITY})")
+    parser.add_argument("--unity", action="store_true",
+                        help="生成 unity (jumbo) 构建源文件：按头文件重叠度把同一目录的 TU 合并为 unity_N.cpp (C 文件单独合并为 unity_N.c)，并输出 CMake 源文件列表")
+    parser.add_argument("--unity-dir", default="unity_build", metavar="DIR",
+                        help=f"unity 模式的输出目录 (默认: ./unity_build，其中包含 {config.UNITY_CMAKE_LIST})")
+    parser.add_argument("--unity-scope", choices=["dir", "top"], default="dir",
+                        help="只合并同一范围内的 TU: dir=同一目录, top=同一顶级目录 (模块)")
+    parser.add_argument("--unity-max-lines", type=int, default=config.UNITY_MAX_LINES, metavar="N",
+                        help=f"每个 unity 文件包含的源码总行数上限 (默认: {config.UNITY_MAX_LINES}，0 表示不限制)")
+    parser.add_argument("--unity-max-bytes", type=int, default=config.UNITY_MAX_BYTES, metavar="N",
+                        help="每个 unity 文件包含的源码总字节数上限 (默认: 0，不限制)")
+    parser.add_argument("--churn", action="store_true",
+                        help="读取 git 历史，按改动频率折算项目头文件的排序，并在注释中给出放入 PCH 的预计重编代价")
+    parser.add_argument("--churn-since", default=config.CHURN_SINCE, metavar="DATE",
+                        help=f"统计改动的时间窗口，git 日期格式 (默认: \"{config.CHURN_SINCE}\"，空串表示全部历史)")
+    parser.add_argument("--churn-commits", type=int, default=0, metavar="N",
+                        help="最多统计最近 N 个提交 (默认: 0，不限制)")
+    parser.add_argument("--churn-weight", type=float, default=config.CHURN_WEIGHT, metavar="W",
+                        help=f"折算权重：分数 = 使用次数 / (1 + W × 改动次数) (默认: {config.CHURN_WEIGHT})")
+    parser.add_argument("--rev", metavar="REV",
+                        help="直接从 git 对象库扫描指定版本 (提交、标签或分支)，无需检出")
+    parser.add_argument("--base-rev", metavar="REV",
+                        help="与 --rev 一起使用：比较两个版本的头文件统计，内容未变化的 blob 只解析一次")
+    parser.add_argument("-D", "--define", action="append", default=[], type=_define_arg, metavar="NAME[=VALUE]",
+                        help="按条件编译求值 #if/#ifdef，只统计在这些宏定义下实际编译的 #include (可多次指定；"
+                             "未通过 -D/-U 给出的宏视为无法判断，相应分支中的 #include 仍会被统计)")
+    parser.add_argument("-U", "--undefine", action="append", default=[], type=_undefine_arg, metavar="NAME",
+                        help="把宏视为明确未定义，例如 -U _WIN32 排除 #ifdef _WIN32 分支 (可多次指定)")
+    parser.add_argument("--config", action="append", default=[], type=_config_arg, metavar="NAME=MACROS",
+                        help="一次扫描同时统计多组配置，每组生成一个 PCH，例如 --config win32=_WIN32,!__linux__ "
+                             "--config linux=__linux__,!_WIN32 (!NAME 表示明确未定义；可多次指定；-D/-U 对所有配置生效；"
+                             "不能与 --compile-commands 同时使用)")
+    parser.add_argument("--config-dir", default="pch_configs", metavar="DIR",
+                        help="多配置模式的输出目录，每组配置写入 pch_<NAME>.hpp (默认: ./pch_configs)")
+    parser.add_argument("--no-project", action="store_true",
+                        help="只输出标准库与第三方库头文件，例如 PCH 不在源码树中时 (项目头文件的引号路径在那里无法解析)")
+    parser.add_argument("--exclude-dir", action="append", default=[], metavar="NAME",
+                        help=f"追加排除的目录名 (支持通配，可多次指定；默认已排除: {' '.join(DEFAULT_EXCLUDE_DIRS)})")
+    parser.add_argument("--no-ignore", action="store_true",
+                        help="遍历全部目录：不读取 .gitignore、不使用 git ls-files、不排除默认目录")
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+def tu_parser(args, parser: HeaderParser, defines: Dict[str, Optional[str]],
+              parsers: Dict[tuple, HeaderParser]) -> HeaderParser:
+    """
+    翻译单元自身的 -D/-U 与命令行的 -D/-U 合并 (命令行优先) 后按条件编译求值；
+    宏集合相同的翻译单元共享同一个解析器，没有任何宏时沿用 parser。
+    """
+    if not defines:
+        return parser
+    key = tuple(sorted(defines.items()))
+    if key not in parsers:
+        merged = {**defines, **dict(args.define), **dict.fromkeys(args.undefine)}
+        parsers[key] = ConditionalParser([merged], full_scan=args.full_scan)
+    return parsers[key]
+
+def iter_units(args, finder: FileFinder, system_dirs: List[str],
+               parser: HeaderParser) -> Iterator[Tuple[str, 'IncludeResolver', HeaderParser]]:
+    """产出 (翻译单元, 解析器, 头文件解析器)；编译参数相同的翻译单元共享同一个解析器"""
+    from .io.include_graph import IncludeResolver
+    from .io.compdb import iter_translation_units
+
+    if not args.compile_commands:
+        resolver = IncludeResolver(args.include_dir, system_dirs)
+        for path in finder.find_files(args.src_path):
+            if path.lower().endswith(config.SOURCE_EXTENSIONS):
+                yield path, resolver, parser
+        return
+
+    resolvers: Dict[tuple, 'IncludeResolver'] = {}
+    parsers: Dict[tuple, HeaderParser] = {}
+    for tu in iter_translation_units(args.compile_commands):
+        key = (tuple(tu.quote_dirs), tuple(tu.include_dirs), tuple(tu.system_dirs))
+        if key not in resolvers:
+            resolvers[key] = IncludeResolver(
+                tu.include_dirs + args.include_dir,
+                tu.system_dirs + system_dirs,
+                quote_dirs=tu.quote_dirs,
+            )
+        yield tu.file, resolvers[key], tu_parser(args, parser, tu.defines, parsers)
+
+def collect_compile_commands(args, finder: FileFinder, parser: HeaderParser,
+                             system_dirs: List[str]) -> Tuple[Counter, int]:
+    """
+    count 模式下的 compile_commands.json 统计：只统计实际编译的翻译单元，以及它们按各自的
+    -I/-isystem 与 -D/-U 实际包含到的 src_path 下的头文件。返回 (统计结果, 翻译单元数)
+    """
+    from .io.include_graph import collect_reachable
+
+    root = os.path.join(os.path.abspath(args.src_path), '')
+    def keep(path: str) -> bool:
+        return path.startswith(root) and os.path.basename(path).lower() not in finder.exclude_names
+
+    units = list(iter_units(args, finder, system_dirs, parser))
+    stats = Counter()
+    for includes in collect_reachable(units, keep).values():
+        stats.update(includes)
+    return stats, len(units)
+
+def iter_tu_paths(args, finder: FileFinder) -> Iterator[str]:
+    if args.compile_commands:
+        from .io.compdb import iter_translation_units
+        return (tu.file for tu in iter_translation_units(args.compile_commands))
+    return (path for path in finder.find_files(args.src_path)
+            if path.lower().endswith(config.SOURCE_EXTENSIONS))
+
+def rank_by_include_cost(args, parser: HeaderParser, finder: FileFinder, system_dirs: List[str]):
+    """构建传递包含图并按编译代价排序，返回 (top_items, notes, 头文件 -> 包含它的 TU 数)"""
+    from .core.graph import rank_by_cost
+    from .io.include_graph import GraphBuilder
+
+    if not system_dirs:
+        print(f"// 警告: 无法从编译器 '{args.compiler}' 获取系统头文件目录", file=sys.stderr)
+
+    builder = GraphBuilder(weight=args.cost_unit)
+    graph, spellings = builder.build(iter_units(args, finder, system_dirs, parser))
+    print(f"// 包含图: {len(graph)} 个文件, {len(graph.tus)} 个翻译单元", file=sys.stderr)
+
+    top_items = []
+    notes = {}
+    tu_counts = {}
+    for header, cost, tu_count, pulled in rank_by_cost(graph, spellings, args.top):
+        top_items.append((header, cost))
+        notes[header] = f"TU: {tu_count}, 展开: {pulled} {args.cost_unit}"
+        tu_counts[header] = tu_count
+    return top_items, notes, tu_counts
+
+def count_tu_usage(args, parser: HeaderParser, finder: FileFinder, system_dirs: List[str],
+                   headers: List[str]) -> Dict[str, int]:
+    """
+    count 模式的使用次数同时计入了头文件之间的包含；验证需要的是 TU 数，
+    因此构建传递包含图，返回 {头文件写法: 传递包含它的 TU 数} (无法解析的写法为 0)
+    """
+    from .io.include_graph import GraphBuilder
+
+    wanted = set(headers)
+    graph, spellings = GraphBuilder().build(iter_units(args, finder, system_dirs, parser))
+    nodes = [node for node, counter in spellings.items() if wanted.intersection(counter)]
+    tu_counts = dict.fromkeys(headers, 0)
+    for node, (tu_count, _) in graph.compute_costs(nodes).items():
+        for spelling in wanted.intersection(spellings[node]):
+            tu_counts[spelling] = max(tu_counts[spelling], tu_count)
+    return tu_counts
+
+def sample_units(args, finder: FileFinder) -> Tuple[List['SampleUnit'], int]:
+    """从全部翻译单元中等间隔抽样，返回 (样本, 翻译单元总数)"""
+    from .io.compdb import command_flags, iter_translation_units
+    from .io.validator import SampleUnit
+
+    if args.compile_commands:
+        units = [SampleUnit(tu.file, command_flags(tu))
+                 for tu in iter_translation_units(args.compile_commands)]
+    else:
+        units = [SampleUnit(path, [])
+                 for path in finder.find_files(args.src_path)
+                 if path.lower().endswith(config.SOURCE_EXTENSIONS)]
+
+    count = min(args.validate_samples, len(units))
+    if count <= 0:
+        return [], len(units)
+    step = len(units) / count
+    return [units[int(i * step)] for i in range(count)], len(units)
+
+def validate_items(args, finder: FileFinder, analyzer: ReportGenerator,
+                   top_items: List[Tuple[str, int]], notes: Dict[str, str],
+                   use_counts: Dict[str, int]):
+    """
+    编译器实测验证，返回剔除后的 (top_items, notes)。
+    use_counts 提供每个头文件被多少个 TU 包含 (top_items 中的数值是编译代价或包含次数，不能直接使用)。
+    """
+    import contextlib
+    import shlex
+    import tempfile
+    from .io.validator import CompileProbe, PchValidator
+
+    samples, total_tus = sample_units(args, finder)
+    flags = shlex.split(args.validate_flags)
+    for d in args.include_dir + [args.src_path]:
+        flags += ['-I', os.path.abspath(d)]
+    if args.compile_commands and samples:
+        # 独立编译头文件时沿用第一个样本 TU 的包含路径与宏定义
+        flags += samples[0].flags
+
+    def render(items, stream):
+        write_pch_content(analyzer.generate_report(items), stream=stream)
+
+    candidates = [(header, use_counts.get(header, 0)) for header, _ in top_items]
+    # 未指定 --validate-dir 时使用临时目录，验证结束后连同 PCH 产物一并删除
+    with contextlib.ExitStack() as stack:
+        workdir = args.validate_dir or stack.enter_context(tempfile.TemporaryDirectory(prefix="find_hpp_validate_"))
+        print(f"// [validate] 工作目录: {workdir}", file=sys.stderr)
+        validator = PchValidator(CompileProbe(args.compiler, flags), render, workdir, args.validate_min_saving)
+        try:
+            result = validator.validate(candidates, samples, total_tus)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    kept = {header for header, _ in result.kept}
+    merged = {}
+    for header in kept:
+        saving = f"预计节省: {result.savings_ms[header]:.1f} ms"
+        merged[header] = f"{notes[header]}, {saving}" if header in notes else saving
+    return [(header, value) for header, value in top_items if header in kept], merged
+
+def emit_report(args, report):
+    if args.output:
+        write_pch_file(report, args.output)
+    else:
+        write_pch_content(report, stream=sys.stdout)
+
+def run_watch(args, finder: FileFinder, parser: HeaderParser,
+              collector: IncludeCollector, analyzer: ReportGenerator):
+    """
+    监听模式：
+    1. 全量扫描一次，保留每个文件的头文件列表
+    2. 之后只重新解析发生变化的文件，按差值调整 Counter
+    3. 仅当 Top-N 集合发生变化时才重写输出文件
+    """
+    from .core.live_stats import LiveIncludeStats
+    from .io.watcher import create_watcher
+
+    # 与初始扫描使用同一套过滤规则 (扩展名、排除目录与 .gitignore)，否则被忽略的文件一旦变化就会被计入
+    walker = finder.walker(args.src_path)
+    def tracked(path: str) -> bool:
+        return walker.tracks(path) and os.path.basename(path).lower() not in finder.exclude_names
+
+    live = LiveIncludeStats(collector.collect_per_file(finder.find_files(args.src_path)))
+    top = live.top_set(args.top)
+    emit_report(args, analyzer.generate_report(live.counts.most_common(args.top)))
+
+    watcher = create_watcher(args.src_path, lambda: finder.find_files(args.src_path), args.poll,
+                             iter_dirs=walker.dirs)
+    print(f"// [watch] 已索引 {len(live)} 个文件，开始监听 {args.src_path} (Ctrl+C 退出)", file=sys.stderr)
+
+    try:
+        while True:
+            batch = watcher.wait()
+            if not batch.paths and not batch.rescan:
+                continue
+            start = time.perf_counter()
+
+            if batch.rescan:
+                live = LiveIncludeStats(collector.collect_per_file(finder.find_files(args.src_path)))
+                touched = len(live)
+            else:
+                paths = [p for p in batch.paths if tracked(p)]
+                existing = [p for p in paths if os.path.isfile(p)]
+                for path, includes in zip(existing, collector.parse_many(existing)):
+                    if includes is None:
+                        live.remove_file(path)
+                    else:
+                        live.update_file(path, includes)
+                for path in set(paths) - set(existing):
+                    live.remove_file(path)
+                touched = len(paths)
+
+            if not touched:
+                continue
+
+            new_top = live.top_set(args.top)
+            elapsed = (time.perf_counter() - start) * 1000
+            if new_top != top:
+                top = new_top
+                emit_report(args, analyzer.generate_report(live.counts.most_common(args.top)))
+                print(f"// [watch] {touched} 个文件变化，Top-N 已更新 ({elapsed:.1f} ms)", file=sys.stderr)
+            else:
+                print(f"// [watch] {touched} 个文件变化，Top-N 未变化 ({elapsed:.1f} ms)", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+def run_partition(args, finder: FileFinder, collector: IncludeCollector, analyzer: ReportGenerator):
+    """
+    多 PCH 模式：
+    1. 记录每个翻译单元直接包含的头文件集合
+    2. 按集合的 Jaccard 相似度 (MinHash 估计) 聚类
+    3. 每组单独统计并生成 PCH，清单中记录各源文件应使用的 PCH 与预计覆盖率
+    """
+    from .core.partition import cluster_include_sets, estimate_coverage, select_cluster_headers
+
+    per_file = collector.collect_per_file(iter_tu_paths(args, finder))
+    paths = list(per_file)
+    include_lists = [per_file[path] for path in paths]
+    groups = cluster_include_sets([frozenset(includes) for includes in include_lists],
+                                  threshold=args.similarity, max_clusters=args.partition,
+                                  min_size=config.PARTITION_MIN_TUS)
+    if not groups:
+        print("// 未找到任何包含头文件的翻译单元，请检查路径。", file=sys.stderr)
+        return
+
+    root = os.path.abspath(args.src_path)
+    def rel(path: str) -> str:
+        return os.path.relpath(path, root).replace(os.sep, '/')
+
+    os.makedirs(args.partition_dir, exist_ok=True)
+    clusters = []
+    assigned = set()
+    covered = 0.0
+    for index, group in enumerate(groups):
+        lists = [include_lists[i] for i in group]
+        items = select_cluster_headers(lists, args.top, config.PARTITION_MIN_SHARE)
+        name = f"pch_{index}.hpp"
+        write_pch_file(analyzer.generate_report(items), os.path.join(args.partition_dir, name))
+
+        cov = estimate_coverage(lists, (header for header, _ in items))
+        covered += cov.coverage * cov.includes
+        assigned.update(group)
+        clusters.append({
+            "pch": name,
+            "headers": [header for header, _ in items],
+            "tu_count": cov.tu_count,
+            "coverage": round(cov.coverage, 4),
+            "utilization": round(cov.utilization, 4),
+            "sources": [rel(paths[i]) for i in group],
+        })
+        print(f"// [partition] {name}: {cov.tu_count} 个 TU, {len(items)} 个头文件, "
+              f"覆盖率 {cov.coverage:.1%}, 利用率 {cov.utilization:.1%}", file=sys.stderr)
+
+    # 对照：同一批 TU 共用一个全局 PCH 时的效果
+    grouped_lists = [include_lists[i] for i in sorted(assigned)]
+    baseline = estimate_coverage(
+        grouped_lists, (h for h, _ in select_cluster_headers(grouped_lists, args.top, 0.0)))
+    overall = covered / baseline.includes if baseline.includes else 0.0
+    print(f"// [partition] 分区整体覆盖率 {overall:.1%}；单一 PCH 覆盖率 {baseline.coverage:.1%}, "
+          f"利用率 {baseline.utilization:.1%}", file=sys.stderr)
+
+    manifest_path = os.path.join(args.partition_dir, config.PARTITION_MANIFEST)
+    write_manifest({
+        "root": root,
+        "coverage": round(overall, 4),
+        "single_pch_coverage": round(baseline.coverage, 4),
+        "clusters": clusters,
+        # 不包含任何头文件的 TU 无需 PCH
+        "unassigned": [rel(path) for i, path in enumerate(paths) if i not in assigned],
+    }, manifest_path)
+    print(f"// [partition] 清单已写入: {manifest_path}", file=sys.stderr)
+
+def run_unity(args, finder: FileFinder, collector: IncludeCollector):
+    """
+    Unity 构建模式：
+    1. 记录每个翻译单元的头文件集合、体积与内部链接符号
+    2. 内部链接符号冲突的 TU 保持独立，其余在同一范围内按头文件重叠度排序并按预算装箱
+    3. 写出 unity_N.cpp (C 翻译单元为 unity_N.c) 与 CMake 源文件列表
+    """
+    import re
+    from .core.unity import (STANDALONE_BUDGET, STANDALONE_CLASH, UnitInfo,
+                             internal_symbols, plan_unity, redundant_includes)
+    from .io.writer import write_unity_cmake, write_unity_source
 
-def run():
-    args = parse_arguments()
+    root = os.path.abspath(args.src_path)
+    units = []
+    for path, includes in collector.collect_per_file(iter_tu_paths(args, finder)).items():
+        path = os.path.abspath(path)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        rel_dir = os.path.dirname(os.path.relpath(path, root)).replace(os.sep, '/')
+        scope = rel_dir if args.unity_scope == "dir" else rel_dir.split('/')[0]
+        language = "c" if path.lower().endswith(config.C_SOURCE_EXTENSIONS) else "cpp"
+        symbols = internal_symbols(data.decode('utf-8', errors='ignore'), cpp=language == "cpp")
+        units.append(UnitInfo(path, scope, frozenset(includes), len(data), data.count(b'\n'),
+                              frozenset(symbols), language))
+    if not units:
+        print("// 未找到任何翻译单元，请检查路径。", file=sys.stderr)
+        return
+
+    plan = plan_unity(units, args.unity_max_lines, args.unity_max_bytes)
+
+    names = [f"unity_{index}.{units[group[0]].language}" for index, group in enumerate(plan.groups)]
+    os.makedirs(args.unity_dir, exist_ok=True)
+    # 清理上次生成、本次已不需要的 unity 文件
+    stale = re.compile(r'unity_\d+\.(?:cpp|c)')
+    for name in os.listdir(args.unity_dir):
+        if stale.fullmatch(name) and name not in names:
+            os.remove(os.path.join(args.unity_dir, name))
+
+    unity_files = []
+    saved = 0
+    for name, group in zip(names, plan.groups):
+        members = [units[i] for i in group]
+        redundant = redundant_includes(unit.includes for unit in members)
+        saved += redundant
+        lines = sum(unit.lines for unit in members)
+        path = os.path.join(args.unity_dir, name)
+        summary = f"{members[0].scope or '.'}: {len(members)} 个 TU, {lines} 行, 减少重复 #include {redundant} 次"
+        write_unity_source(path, [unit.path for unit in members], summary)
+        unity_files.append(path)
+        print(f"// [unity] {name} ({summary})", file=sys.stderr)
+
+    for index, reason in sorted(plan.standalone.items(), key=lambda item: units[item[0]].path):
+        rel = os.path.relpath(units[index].path, root).replace(os.sep, '/')
+        if reason == STANDALONE_CLASH:
+            names = sorted(plan.clashes[index])
+            shown = ', '.join(names[:5]) + (' ...' if len(names) > 5 else '')
+            print(f"// [unity] 保持独立: {rel} (内部链接符号冲突: {shown})", file=sys.stderr)
+        elif reason == STANDALONE_BUDGET:
+            print(f"// [unity] 保持独立: {rel} (单个文件已超出预算)", file=sys.stderr)
+
+    merged = [units[i].path for group in plan.groups for i in group]
+    standalone = sorted(units[i].path for i in plan.standalone)
+    cmake_path = os.path.join(args.unity_dir, config.UNITY_CMAKE_LIST)
+    write_unity_cmake(cmake_path, {
+        "FIND_HPP_UNITY_SOURCES": unity_files,
+        # 已被 unity 文件包含、需要从目标源文件中移除的 TU
+        "FIND_HPP_UNITY_MERGED_SOURCES": merged,
+        "FIND_HPP_UNITY_STANDALONE_SOURCES": standalone,
+    })
+    print(f"// [unity] {len(units)} 个 TU -> {len(unity_files)} 个 unity 文件 + {len(standalone)} 个独立 TU, "
+          f"共减少重复 #include {saved} 次；列表已写入: {cmake_path}", file=sys.stderr)
+
+def revision_entries(args, finder: FileFinder, rev: str) -> List[Tuple[str, str]]:
+    """列出版本中参与扫描的文件，返回 [(路径, blob SHA)]；过滤规则与扫描工作区时相同"""
+    from .io.gitstore import list_tree
+
+    root = os.path.abspath(args.src_path)
+    shas = dict(list_tree(args.src_path, rev))
+    return [(path, shas[os.path.relpath(path, root).replace(os.sep, '/')])
+            for path in finder.filter_relative(args.src_path, shas)]
+
+def rank_by_churn(args, stats, classifier: HeaderClassifier, tu_count: int):
+    """按 git 历史中的改动频率折算项目头文件，返回 (top_items, notes)"""
+    from .core.classifier import HeaderCategory
+    from .core.churn import ChurnIndex, rank_with_churn
+    from .io.history import load_change_history
+
+    history = load_change_history(args.src_path, args.churn_since, args.churn_commits)
+    window = (args.churn_since or '全部历史') + (f", 最多 {args.churn_commits} 个提交" if args.churn_commits > 0 else "")
+    print(f"// [churn] 窗口 ({window}): {history.commits} 个提交, {len(history.changes)} 个文件有改动, "
+          f"{tu_count} 个 TU", file=sys.stderr)
+    return rank_with_churn(stats, lambda header: classifier.classify(header) == HeaderCategory.PROJECT,
+                           ChurnIndex(history.changes), args.top, args.churn_weight, tu_count, history.commits)
+
+def print_rank_diff(args, base_label: str, new_label: str, old_stats, new_stats):
+    from .core.rank_diff import compare_top
+
+    changes = compare_top(old_stats, new_stats, args.top)
+    entered = [c.header for c in changes if c.old_rank is None]
+    left = [c.header for c in changes if c.new_rank is None]
+    print(f"// 比较 {base_label} -> {new_label}: 头文件 {len(old_stats)} -> {len(new_stats)} 种")
+    print(f"// 进入 Top-{args.top}: {', '.join(entered) or '(无)'}")
+    print(f"// 移出 Top-{args.top}: {', '.join(left) or '(无)'}")
+    # 中文标题按两列宽对齐
+    print(f"{'':8}排名  {'':8}使用次数  {'':2}变化  头文件")
+    for c in changes:
+        old_rank = '-' if c.old_rank is None else c.old_rank
+        new_rank = '-' if c.new_rank is None else c.new_rank
+        print(f"{old_rank:>4} -> {new_rank:<4}  {c.old_count:>6} -> {c.new_count:<6}  {c.delta:>+6}  {c.header}")
+
+def run_revision(args, finder: FileFinder, parser: HeaderParser, collector: IncludeCollector,
+                 analyzer: ReportGenerator, profiler):
+    """
+    版本扫描模式：文件列表与内容都来自 git 对象库。
+    指定 --base-rev 时先扫描旧版本，新版本中 SHA 未变化的 blob 复用其解析结果，输出两者的排名变化。
+    """
+    from .io.gitstore import BlobReader, RevisionScanner, resolve_revision
+
+    revs = [args.base_rev, args.rev] if args.base_rev else [args.rev]
+    commits = [resolve_revision(args.src_path, rev) for rev in revs]
+    results = []
+    with BlobReader(args.src_path) as reader:
+        scanner = RevisionScanner(args.src_path, parser, reader)
+        for rev, commit in zip(revs, commits):
+            with profiler.phase('revision'):
+                entries = revision_entries(args, finder, commit)
+                parsed, reused = scanner.parsed, scanner.reused
+                results.append(scanner.collect(entries))
+            print(f"// [rev] {rev} ({commit[:12]}): {len(entries)} 个文件，解析 {scanner.parsed - parsed} 个 blob，"
+                  f"复用 {scanner.reused - reused} 个", file=sys.stderr)
+    stats = results[-1]
+
+    if args.base_rev:
+        print_rank_diff(args, f"{args.base_rev} ({commits[0][:12]})", f"{args.rev} ({commits[1][:12]})",
+                        results[0], stats)
+        if args.output:
+            write_pch_file(analyzer.generate_report(stats.most_common(args.top)), args.output)
+        return
+    if not stats:
+        print("// 未找到任何头文件引用，请检查路径。", file=sys.stderr)
+        return
+    if args.config:
+        run_configs(args, collector, analyzer, stats)
+        return
+    emit_report(args, analyzer.generate_report(stats.most_common(args.top)))
+
+def run_configs(args, collector: IncludeCollector, analyzer: ReportGenerator, stats):
+    """多配置模式：把单次扫描得到的统计按配置拆分，每组配置生成一个 PCH"""
+    names = [name for name, _ in args.config]
+    per_config = split_tagged_counts(stats, len(names)) if collector.parser.tagged else [stats]
+
+    os.makedirs(args.config_dir, exist_ok=True)
+    shared = set.intersection(*(set(counts) for counts in per_config))
+    for name, counts in zip(names, per_config):
+        path = os.path.join(args.config_dir, f"pch_{name}.hpp")
+        top_items = counts.most_common(args.top)
+        write_pch_file(analyzer.generate_report(top_items), path)
+        specific = sum(1 for header, _ in top_items if header not in shared)
+        print(f"// [config] {name}: {len(counts)} 个头文件，写入前 {len(top_items)} 个 "
+              f"(其中 {specific} 个不是所有配置共有) -> {path}", file=sys.stderr)
+
+def open_cache(args, parser: HeaderParser, memory: Dict = None):
+    """
+    打开增量索引缓存。memory 由常驻进程 (devd) 传入：索引保存在进程内存中，
+    以 (缓存路径, 解析器特征串) 区分，跨请求复用而不读写 SQLite 文件。
+    """
+    if args.no_cache or not os.path.isdir(args.src_path):
+        return None
+    from .io.cache import default_cache_path
+    cache_path = args.cache or default_cache_path(args.src_path)
+    if memory is not None:
+        from .io.cache import MemoryIncludeCache
+        return MemoryIncludeCache(memory.setdefault((os.path.abspath(cache_path), parser.signature), {}),
+                                  args.src_path)
+
+    from .io.cache import IncludeCache
+    try:
+        return IncludeCache(cache_path, parser.signature, args.src_path)
+    except Exception as e:
+        print(f"// 无法打开缓存 {cache_path}: {e}，本次不使用缓存", file=sys.stderr)
+        return None
+
+def execute(args, profiler, memory: Dict = None):
     exclude_list = ["pch.hpp", "cmake_pch.hxx"]
+    if args.output:
+        # 输出文件可能就位于扫描目录中，不能把它自己统计进去
+        exclude_list.append(os.path.basename(args.output).lower())
+    # 分区模式生成的 PCH 同样不参与统计
+    exclude_list.extend(f"pch_{i}.hpp" for i in range(max(0, args.partition)))
+    exclude_list.extend(f"pch_{name}.hpp".lower() for name, _ in args.config)
+    exclude_dirs = DEFAULT_EXCLUDE_DIRS + tuple(args.exclude_dir)
+    if args.unity:
+        # 生成的 unity 文件只是 #include 其他 TU，不能当作新的 TU 统计
+        exclude_dirs += (os.path.basename(os.path.abspath(args.unity_dir)),)
     # 1. 组装组件
     finder = FileFinder(
-        extensions=('.cpp', '.hpp', '.h', '.cc', '.cxx', '.c'),
-        exclude_names=exclude_list
+        extensions=config.SCAN_EXTENSIONS,
+        exclude_names=exclude_list,
+        exclude_dirs=exclude_dirs,
+        use_ignore=not args.no_ignore,
     )
-    parser = HeaderParser()
+    names = [name for name, _ in args.config]
+    if len(set(names)) != len(names):
+        print("Error: --config 的名称不能重复", file=sys.stderr)
+        sys.exit(1)
+    if args.config or args.define or args.undefine:
+        defines = {**dict(args.define), **dict.fromkeys(args.undefine)}
+        configs = [{**defines, **macros} for _, macros in args.config] or [defines]
+        parser = ConditionalParser(configs, full_scan=args.full_scan)
+    else:
+        parser = HeaderParser(full_scan=args.full_scan)
+    collector = IncludeCollector(parser, jobs=args.jobs, profiler=profiler)
     
+    system_dirs, system_headers, platform_headers = [], set(), set()
+    if args.rank == "cost" or args.compile_commands or args.validate or not args.no_system_index:
+        with profiler.phase('system index'):
+            system_dirs, system_headers, platform_headers = load_system_headers(
+                args.compiler, config.SYSTEM_HEADER_SUBDIRS, config.C_SYSTEM_HEADERS)
+    if args.no_system_index:
+        system_headers, platform_headers = set(), set()
+
     tp_prefixes = config.DEFAULT_THIRD_PARTY_IDENTIFIERS + args.extra_libs
-    classifier = HeaderClassifier(config.CPP_STANDARD_HEADERS, tp_prefixes)
+    classifier = HeaderClassifier(config.CPP_STANDARD_HEADERS, tp_prefixes, system_headers, platform_headers)
     
-    analyzer = ReportGenerator(classifier)
+    analyzer = ReportGenerator(classifier, config.PLATFORM_GUARDS, include_project=not args.no_project)
+
+    if args.config and (args.watch or args.partition > 0 or args.rank != "count" or args.validate
+                        or args.compile_commands):
+        print("Error: --config 暂不支持 --watch / --partition / --rank cost / --validate / --compile-commands "
+              "(单组配置可改用 -D；--compile-commands 已按各翻译单元的 -D/-U 求值)", file=sys.stderr)
+        sys.exit(1)
 
     # 2. 执行扫描
     print(f"// 正在扫描目录: {args.src_path} ...", file=sys.stderr)
-    
-    stats = Counter()
+
+    if args.watch:
+        if not args.output:
+            print("Error: --watch 需要同时指定 --output", file=sys.stderr)
+            sys.exit(1)
+        if (args.rank != "count" or args.compile_commands or args.validate or args.partition > 0
+                or args.unity or args.rev or args.churn):
+            print("Error: --watch 暂不支持 --rank cost / --compile-commands / --validate / --partition / --unity / --rev / --churn",
+                  file=sys.stderr)
+            sys.exit(1)
+        run_watch(args, finder, parser, collector, analyzer)
+        return
+
+    if args.base_rev and not args.rev:
+        print("Error: --base-rev 需要同时指定 --rev", file=sys.stderr)
+        sys.exit(1)
+    if args.churn and (args.rank != "count" or args.partition > 0 or args.unity or args.config or args.rev):
+        print("Error: --churn 暂不支持 --rank cost / --partition / --unity / --config / --rev", file=sys.stderr)
+        sys.exit(1)
+
+    if args.rev:
+        if (args.rank != "count" or args.validate or args.partition > 0 or args.unity
+                or args.compile_commands or (args.base_rev and args.config)):
+            print("Error: --rev 暂不支持 --rank cost / --validate / --partition / --unity / --compile-commands，"
+                  "--base-rev 不支持 --config", file=sys.stderr)
+            sys.exit(1)
+        from dev_common.git import GitError
+        try:
+            run_revision(args, finder, parser, collector, analyzer, profiler)
+        except GitError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.unity:
+        if args.rank != "count" or args.validate or args.partition > 0 or args.config:
+            print("Error: --unity 暂不支持 --rank cost / --validate / --partition / --config", file=sys.stderr)
+            sys.exit(1)
+        try:
+            with profiler.phase('unity'):
+                run_unity(args, finder, collector)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.partition > 0:
+        if args.rank != "count" or args.validate:
+            print("Error: --partition 暂不支持 --rank cost / --validate", file=sys.stderr)
+            sys.exit(1)
+        try:
+            with profiler.phase('partition'):
+                run_partition(args, finder, collector, analyzer)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.rank == "cost":
+        try:
+            with profiler.phase('include graph'):
+                top_items, notes, tu_counts = rank_by_include_cost(args, parser, finder, system_dirs)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not top_items:
+            print("// 未找到任何可解析的头文件引用，请检查路径与 -I 参数。", file=sys.stderr)
+            return
+        if args.validate:
+            with profiler.phase('validate'):
+                top_items, notes = validate_items(args, finder, analyzer, top_items, notes, tu_counts)
+        with profiler.phase('classify'):
+            report = analyzer.generate_report(top_items, metric_label="编译代价", notes=notes)
+        with profiler.phase('write'):
+            emit_report(args, report)
+        return
+
+    cache = None
+    tu_count = 0
     try:
-        for file_path in finder.find_files(args.src_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    headers = parser.parse_content(f.read())
-                    stats.update(headers)
-            except Exception:
-                continue
-    except FileNotFoundError as e:
+        if args.compile_commands:
+            # 各翻译单元的宏定义不同，无法共用以解析器特征串区分的缓存
+            with profiler.phase('compile commands'):
+                stats, tu_count = collect_compile_commands(args, finder, parser, system_dirs)
+        else:
+            scan_files = finder.find_files(args.src_path)
+            if args.churn:
+                # 预计重编代价需要翻译单元总数
+                scan_files = list(scan_files)
+                tu_count = sum(1 for path in scan_files if path.lower().endswith(config.SOURCE_EXTENSIONS))
+            cache = open_cache(args, parser, memory)
+            stats = collector.collect(profiler.iterate('walk', scan_files), cache=cache)
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if cache is not None:
+        cache.close()
+        print(f"// 缓存命中: {cache.hits}, 未命中: {cache.misses}, 移除: {cache.pruned}", file=sys.stderr)
+
     if not stats:
         print("// 未找到任何头文件引用，请检查路径。", file=sys.stderr)
         return
 
     # 3. 分析与输出
+    if args.config:
+        with profiler.phase('write'):
+            run_configs(args, collector, analyzer, stats)
+        return
+
+    if args.no_project:
+        # 先剔除项目头文件再取前 N 个，使输出仍有 N 项
+        from .core.classifier import HeaderCategory
+        stats = Counter({header: count for header, count in stats.items()
+                         if classifier.classify(header) != HeaderCategory.PROJECT})
     top_items = stats.most_common(args.top)
-    report = analyzer.generate_report(top_items)
-    write_pch_content(report, stream=sys.stdout)
+    notes = {}
+    if args.churn:
+        from dev_common.git import GitError
+        try:
+            with profiler.phase('churn'):
+                top_items, notes = rank_by_churn(args, stats, classifier, tu_count)
+        except GitError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    if args.validate:
+        with profiler.phase('validate'):
+            tu_counts = count_tu_usage(args, parser, finder, system_dirs, [header for header, _ in top_items])
+            top_items, notes = validate_items(args, finder, analyzer, top_items, notes, tu_counts)
+    with profiler.phase('classify'):
+        report = analyzer.generate_report(top_items, notes=notes)
+    with profiler.phase('write'):
+        emit_report(args, report)
+
+def run(argv=None, memory: Dict = None):
+    """argv 默认取命令行参数；常驻进程 (devd) 传入请求的参数与跨请求复用的 memory"""
+    args = parse_arguments(argv)
+    profiler = create_profiler(args, "find_hpp")
+    try:
+        execute(args, profiler, memory)
+    finally:
+        profiler.finish()
 
 if __name__ == '__main__':
     run()
\ No newline at end of file
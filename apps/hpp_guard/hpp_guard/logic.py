@@ -1,6 +1,6 @@
 import re
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 def calculate_expected_guard(file_path: Path, project_root: Path) -> str:
     """[逻辑] 根据文件路径生成 Google 风格的头文件守卫名称。"""
@@ -19,34 +19,162 @@ def calculate_expected_guard(file_path: Path, project_root: Path) -> str:
 
     return '_'.join(processed_parts) + '_'
 
+# 首尾窗口大小 (字节)：守卫只出现在文件开头与结尾，检查时无需读取整个文件
+HEAD_WINDOW = 4096
+TAIL_WINDOW = 1024
+
+_DIRECTIVE = re.compile(r'#[ \t]*(\w+)[ \t]*(.*)', re.DOTALL)
+_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_GUARD_NAME = re.compile(r'[A-Z0-9_]+')
+# UTF-8 BOM 解码后的字符：不是空白，留在开头会被当作 #ifndef 之前的代码
+_BOM = '\ufeff'
+
+def strip_bom(text: str) -> str:
+    return text[len(_BOM):] if text.startswith(_BOM) else text
+
+def _leading_directives(text: str, want: int) -> Tuple[List[Tuple[str, str, int]], bool]:
+    """
+    [解析] 单次扫描文件开头，跳过空白与注释，依次取出预处理指令 (名称, 参数, 参数在 text 中的偏移)，
+    遇到第一个普通代码记号或取满 want 条时停止。
+    返回: (指令列表, 是否已有定论)；窗口在注释或指令中途截断时为 False。
+    """
+    directives = []
+    i, n = 0, len(text)
+    while i < n and len(directives) < want:
+        c = text[i]
+        if c in ' \t\r\n\f\v':
+            i += 1
+        elif text.startswith('//', i):
+            i = text.find('\n', i)
+            if i == -1:
+                return directives, False
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            if end == -1:
+                return directives, False
+            i = end + 2
+        elif c == '#':
+            # 注释视同空白，此处的 # 必然位于行首；指令行可能以反斜杠续行
+            end = i
+            while True:
+                end = text.find('\n', end)
+                if end == -1:
+                    return directives, False
+                if text[i:end].rstrip('\r').endswith('\\'):
+                    end += 1
+                    continue
+                break
+            line = _BLOCK_COMMENT.sub(' ', text[i:end]).split('//', 1)[0]
+            match = _DIRECTIVE.match(line)
+            if match:
+                directives.append((match.group(1), match.group(2).strip(), i + match.start(2)))
+            i = end
+        else:
+            # 普通代码：守卫必须位于全部代码之前
+            return directives, True
+    return directives, True
+
+def _trailing_endif(text: str) -> Optional[Tuple[bool, str, int]]:
+    """
+    [解析] 去掉文件末尾的空白与注释后，检查最后一行是否为 #endif。
+    返回: (是否以 #endif 结尾, #endif 之后的内容, 该内容在 text 中的偏移)；窗口不足以判断时返回 None。
+    """
+    while True:
+        text = text.rstrip()
+        if text.endswith('*/'):
+            start = text.rfind('/*')
+            if start == -1:
+                return None
+            # 行尾的块注释 (#endif /* X */) 保留给调用方判断
+            line_start = text.rfind('\n', 0, start) + 1
+            if text[line_start:start].strip():
+                break
+            text = text[:start]
+            continue
+        line_start = text.rfind('\n') + 1
+        if text[line_start:].lstrip().startswith('//'):
+            if line_start == 0:
+                return None
+            text = text[:line_start]
+            continue
+        break
+
+    line_start = text.rfind('\n') + 1
+    if line_start == 0:
+        return None
+    line = text[line_start:].lstrip()
+    match = _DIRECTIVE.match(line)
+    if not match or match.group(1) != 'endif':
+        return False, '', -1
+    return True, match.group(2), len(text) - len(line) + match.start(2)
+
+# 守卫名在文件中的位置：#ifndef 与 #define 的参数，以及 #endif 注释中的名称 (没有注释时不含)
+_GuardMatch = Tuple[Optional[str], bool, List[int]]
+
+def _match_guard(head: str, tail: str, complete: bool) -> Optional[_GuardMatch]:
+    """
+    [解析] extract_guard_windows 的实现，另外返回守卫名出现的偏移。
+    偏移只在 complete 为 True 时有意义 (均相对于完整内容)。
+    """
+    if complete:
+        # 完整文件末尾可能没有换行，补上后首尾两端的扫描都不会因"截断"而无法下结论
+        head = head + '\n'
+        tail = '\n' + tail
+    directives, decided = _leading_directives(head, 3)
+    directives = [d for d in directives if d[:2] != ('pragma', 'once')]
+    if len(directives) < 2:
+        if not (decided or complete):
+            return None
+        return None, False, []
+
+    (kw1, name, name_pos), (kw2, define, define_pos) = directives[:2]
+    if kw1 != 'ifndef' or kw2 != 'define' or define != name or not _GUARD_NAME.fullmatch(name):
+        return None, False, []
+
+    ending = _trailing_endif(tail)
+    if ending is None:
+        return None if not complete else (None, False, [])
+    has_endif, rest, rest_pos = ending
+    if not has_endif:
+        return None, False, []
+
+    positions = [name_pos, define_pos]
+    comment = re.match(r'//\s*' + re.escape(name) + r'(?!\w)', rest)
+    if comment:
+        # 补在 tail 开头的换行使偏移多 1
+        positions.append(rest_pos + comment.end() - len(name) - (1 if complete else 0))
+    return name, comment is not None, positions
+
+def extract_guard_windows(head: str, tail: str, complete: bool) -> Optional[Tuple[Optional[str], bool]]:
+    """
+    [解析] 只根据文件开头与结尾的窗口判断守卫。
+    守卫的条件：最前面的指令为 #ifndef X 与不带值的 #define X (允许之前有 #pragma once)，且最后一条指令为 #endif。
+    complete 为 True 表示窗口即整个文件。
+    返回: (found_guard_name, has_valid_endif)；窗口不足以下结论时返回 None，需要读取整个文件。
+    """
+    matched = _match_guard(head, tail, complete)
+    return None if matched is None else matched[:2]
+
 def extract_guard_info(content: str) -> Tuple[Optional[str], bool]:
     """
-    [解析] 从文件内容中提取当前的 #ifndef 守卫名称。
+    [解析] 从完整的文件内容中提取当前的 #ifndef 守卫名称。
     返回: (found_guard_name, has_valid_endif)
     """
-    ifndef_match = re.search(r'#ifndef\s+([A-Z0-9_]+)', content)
-    define_match = re.search(r'#define\s+([A-Z0-9_]+)', content)
-    
-    if not ifndef_match or not define_match:
-        return None, False
+    content = strip_bom(content)
+    return extract_guard_windows(content, content, complete=True)
 
-    current_guard = ifndef_match.group(1)
-    
-    # 检查是否存在匹配的 endif 注释
-    endif_pattern = r'#endif\s*//\s*' + re.escape(current_guard)
-    endif_match = re.search(endif_pattern, content)
-    
-    return current_guard, (endif_match is not None)
-
-def replace_guard_content(content: str, old_guard: str, new_guard: str, has_endif_comment: bool) -> str:
-    """[转换] 将内容中的旧守卫替换为新守卫。"""
-    # 1. 替换 #ifndef 和 #define
-    new_content = content.replace(f"#ifndef {old_guard}", f"#ifndef {new_guard}", 1)
-    new_content = new_content.replace(f"#define {old_guard}", f"#define {new_guard}", 1)
-    
-    # 2. 替换 #endif 注释 (如果旧代码中存在注释)
-    if has_endif_comment:
-        pattern = r'(#endif\s*//\s*)' + re.escape(old_guard)
-        new_content = re.sub(pattern, f'\\1{new_guard}', new_content, count=1)
-        
-    return new_content
\ No newline at end of file
+def replace_guard_content(content: str, old_guard: str, new_guard: str) -> Optional[str]:
+    """
+    [转换] 将内容中的旧守卫替换为新守卫：按解析得到的位置替换，保留 `#  ifndef`、`# define` 等原有写法。
+    内容中的守卫不是 old_guard (例如检查后文件已被修改) 时返回 None。开头的 BOM 原样保留。
+    """
+    body = strip_bom(content)
+    name, _, positions = _match_guard(body, body, complete=True)
+    # 偏移基于去掉 BOM 的内容，加回 BOM 的长度
+    positions = [pos + len(content) - len(body) for pos in positions]
+    if name != old_guard or any(content[pos:pos + len(old_guard)] != old_guard for pos in positions):
+        return None
+    # 从后往前替换，前面的偏移不受影响
+    for pos in sorted(positions, reverse=True):
+        content = content[:pos] + new_guard + content[pos + len(old_guard):]
+    return content
\ No newline at end of file
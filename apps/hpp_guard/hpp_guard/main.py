@@ -2,21 +2,50 @@ import os
 import sys
 import argparse
 from . import scanner
+from dev_common.git import GitError, add_changed_arguments
+from dev_common.profiling import add_profile_arguments, create_profiler
+from dev_common.walker import DEFAULT_EXCLUDE_DIRS
 
-def parse_arguments():
+def parse_arguments(argv=None):
     parser = argparse.ArgumentParser(
         description="检查并修复 C++ 头文件 (.hpp) 中的头文件守卫 (Google Style)。",
         epilog="示例: python run.py ./src --fix"
     )
     parser.add_argument("directory", help="C++ 项目的根目录。")
     parser.add_argument("--fix", action="store_true", help="自动修复不匹配的头文件守卫。")
-    return parser.parse_args()
+    parser.add_argument("--exclude-dir", action="append", default=[], metavar="NAME",
+                        help=f"追加排除的目录名 (支持通配，可多次指定；默认已排除: {' '.join(DEFAULT_EXCLUDE_DIRS)})")
+    parser.add_argument("--no-ignore", action="store_true",
+                        help="遍历全部目录：不读取 .gitignore、不使用 git ls-files、不排除默认目录。")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="并发处理的线程数 (0 表示自动选择；输出顺序与串行运行一致)。")
+    add_changed_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
 
-def run():
-    args = parse_arguments()
+def run(argv=None, memo=None):
+    """argv 默认取命令行参数；常驻进程 (devd) 传入请求的参数与跨请求复用的 memo"""
+    args = parse_arguments(argv)
     
     if not os.path.isdir(args.directory):
         print(f"错误: 目录不存在 '{args.directory}'")
         sys.exit(1)
         
-    scanner.scan_and_process_directory(args.directory, args.fix)
\ No newline at end of file
+    profiler = create_profiler(args, "hpp_guard")
+    try:
+        scanner.scan_and_process_directory(
+            args.directory,
+            args.fix,
+            exclude_dirs=DEFAULT_EXCLUDE_DIRS + tuple(args.exclude_dir),
+            use_ignore=not args.no_ignore,
+            profiler=profiler,
+            jobs=args.jobs,
+            changed_ref=args.changed,
+            staged=args.staged,
+            memo=memo,
+        )
+    except GitError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    finally:
+        profiler.finish()
\ No newline at end of file
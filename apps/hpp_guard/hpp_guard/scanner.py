@@ -1,26 +1,127 @@
+import io
+import os
+import sys
+from collections import deque
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from dev_common.memo import StampMemo, file_stamp
+from dev_common.profiling import NULL_PROFILER
+from dev_common.walker import DEFAULT_EXCLUDE_DIRS, SourceWalker
 from . import worker
 
-def scan_and_process_directory(directory: str, fix_mode: bool):
-    """遍历目录并协调处理流程。"""
+# 每个线程允许排队的文件数：限制尚未输出的结果占用的内存，同时保证线程不空闲
+_QUEUE_PER_JOB = 4
+
+def _process(path: str, project_root: Path, fix_mode: bool, profiler,
+             memo: Optional[StampMemo], out: Optional[TextIO] = None) -> str:
+    """
+    处理单个文件并返回状态码。
+    指定 memo 时 (常驻进程)，元数据未变化的文件直接复用上次的结果；
+    只缓存 MATCH 与 SKIP：二者不修改文件，检查与修复模式下的报告也相同。
+    """
+    if memo is None:
+        return worker.process_single_file(Path(path), project_root, fix_mode, profiler, out=out)
+
+    out = out or sys.stdout
+    key = (path, str(project_root))
+    stamp = file_stamp(path)
+    cached = memo.get(key, stamp)
+    if cached is not None:
+        status, report = cached
+    else:
+        buf = io.StringIO()
+        status = worker.process_single_file(Path(path), project_root, fix_mode, profiler, out=buf)
+        report = buf.getvalue()
+        if status in ('MATCH', 'SKIP'):
+            memo.put(key, stamp, (status, report))
+    out.write(report)
+    return status
+
+def _check_buffered(path: str, project_root: Path, fix_mode: bool, profiler,
+                    memo: Optional[StampMemo] = None) -> Tuple[str, str]:
+    """在工作线程中处理单个文件，报告写入独立缓冲区，返回 (状态码, 报告文本)"""
+    buf = io.StringIO()
+    started = profiler.now()
+    status = _process(path, project_root, fix_mode, profiler, memo, out=buf)
+    profiler.file_done(path, started)
+    return status, buf.getvalue()
+
+def _iter_results(files: Iterable[str], project_root: Path, fix_mode: bool,
+                  jobs: int, profiler, memo: Optional[StampMemo] = None) -> Iterator[Tuple[str, str]]:
+    """
+    线程池并发处理 (检查/修复以等待 I/O 为主，线程即可重叠网络文件系统的延迟)。
+    按提交顺序逐个取回结果，输出顺序与串行运行完全一致；排队数量有上限，遍历仍是流式的。
+    """
+    # 只在并发时才需要，延迟导入以缩短串行运行的启动时间
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for path in files:
+            pending.append(pool.submit(_check_buffered, path, project_root, fix_mode, profiler, memo))
+            if len(pending) >= jobs * _QUEUE_PER_JOB:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def scan_and_process_directory(directory: str, fix_mode: bool,
+                               exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+                               use_ignore: bool = True,
+                               profiler=NULL_PROFILER,
+                               jobs: int = 1,
+                               changed_ref: Optional[str] = None,
+                               staged: bool = False,
+                               memo: Optional[StampMemo] = None):
+    """
+    遍历目录并协调处理流程。
+    jobs > 1 时并发处理；jobs == 0 表示按 CPU 核心数自动选择线程数。
+    指定 changed_ref 或 staged 时只处理 git 报告有变化的文件 (git 出错时抛出 GitError)。
+    memo 由常驻进程传入，跨请求复用未变化文件的检查结果。
+    """
+    if jobs <= 0:
+        jobs = min(32, (os.cpu_count() or 1) + 4)
     project_root = Path(directory).resolve()
+
+    walker = SourceWalker(str(project_root), ('.hpp',), exclude_dirs, use_ignore)
+    changed = None
+    if changed_ref or staged:
+        changed = walker.changed_files(changed_ref, staged)
     
     print(f"--- 模式: {'修复 (Fix)' if fix_mode else '检查 (Check)'} ---")
-    print(f"--- 根目录: {project_root} ---\n")
+    print(f"--- 根目录: {project_root} ---")
+    if changed is not None:
+        scope = "暂存区" if staged else f"相对 {changed_ref} 的变更"
+        print(f"--- 范围: {scope} ({len(changed)} 个文件) ---")
+        if staged:
+            partial = set(changed) & set(walker.unstaged_files())
+            if partial:
+                print(f"--- 注意: {len(partial)} 个文件在工作区中还有未暂存的修改，检查的是工作区内容 ---")
+    print()
 
-    stats = {
+    stats: Dict[str, int] = {
         'MATCH': 0, 'MISMATCH': 0, 'FIXED': 0, 'SKIP': 0, 'ERROR': 0
     }
 
-    # 使用 rglob 获取所有 .hpp 文件
-    files = list(project_root.rglob('*.hpp'))
-    
-    for file_path in files:
-        status = worker.process_single_file(file_path, project_root, fix_mode)
-        stats[status] += 1
+    # 流式遍历 .hpp 文件：忽略目录在进入前即被剪枝，git 工作区内使用 git ls-files
+    files = profiler.iterate('walk', walker.files() if changed is None else changed)
+    total = 0
+    if jobs <= 1:
+        for path in files:
+            started = profiler.now()
+            status = _process(path, project_root, fix_mode, profiler, memo)
+            profiler.file_done(path, started)
+            stats[status] += 1
+            total += 1
+    else:
+        # 统计只在主线程中汇总，无需加锁
+        for status, report in _iter_results(files, project_root, fix_mode, jobs, profiler, memo):
+            sys.stdout.write(report)
+            stats[status] += 1
+            total += 1
 
     print("\n--- 检查总结 ---")
-    print(f"扫描文件总数: {len(files)}")
+    print(f"扫描文件总数: {total}")
     print(f"  ✅ 符合规范: {stats['MATCH']}")
     print(f"  🟡 跳过处理: {stats['SKIP']}")
     print(f"  ❗️ 读取错误: {stats['ERROR']}")
@@ -1,23 +1,65 @@
+import os
+import sys
 from pathlib import Path
+from typing import Optional, TextIO, Tuple
+
+from dev_common.profiling import NULL_PROFILER
 from . import logic  # 相对导入
 
-def process_single_file(file_path: Path, project_root: Path, fix_mode: bool) -> str:
+def _read_text(file_path: Path) -> str:
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+def _read_windows(file_path: Path) -> Tuple[str, str, bool]:
+    """
+    只读取文件开头与结尾的窗口 (二进制读取后按通用换行符规则解码)。
+    返回: (head, tail, complete)；文件足够小时一次读完，complete 为 True。
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(logic.HEAD_WINDOW + logic.TAIL_WINDOW)
+        if len(head) < logic.HEAD_WINDOW + logic.TAIL_WINDOW:
+            text = _decode(head)
+            return text, text, True
+        f.seek(-logic.TAIL_WINDOW, os.SEEK_END)
+        tail = f.read()
+    return _decode(head[:logic.HEAD_WINDOW]), _decode(tail), False
+
+def _decode(data: bytes) -> str:
+    text = data.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+    return logic.strip_bom(text)
+
+def process_single_file(file_path: Path, project_root: Path, fix_mode: bool,
+                        profiler=NULL_PROFILER, out: Optional[TextIO] = None) -> str:
     """
     处理单个文件：读取 -> 检查 -> (可选修复) -> 报告状态。
+    检查只读取首尾窗口，窗口不足以判断或需要写入修复时才读取整个文件。
+    报告写入 out (默认 stdout)；并发执行时由调用方传入独立缓冲区，再按顺序统一输出。
     返回状态码: 'MATCH', 'MISMATCH', 'FIXED', 'SKIP', 'ERROR'
     """
+    out = out or sys.stdout
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        with profiler.phase('read'):
+            head, tail, complete = _read_windows(file_path)
+
+        with profiler.phase('check'):
+            info = logic.extract_guard_windows(head, tail, complete)
+
+        if info is None:
+            # 例如文件开头有超过窗口大小的许可证注释
+            with profiler.phase('read'):
+                content = _read_text(file_path)
+            with profiler.phase('check'):
+                info = logic.extract_guard_info(content)
 
-        current_guard, has_endif_comment = logic.extract_guard_info(content)
+        current_guard, _ = info
+        if current_guard:
+            with profiler.phase('check'):
+                expected_guard = logic.calculate_expected_guard(file_path, project_root)
         
         if not current_guard:
-            print(f"🟡 [SKIP] 无标准守卫: {file_path.relative_to(project_root)}")
+            print(f"🟡 [SKIP] 无标准守卫: {file_path.relative_to(project_root)}", file=out)
             return 'SKIP'
 
-        expected_guard = logic.calculate_expected_guard(file_path, project_root)
-
         if current_guard == expected_guard:
             return 'MATCH'
 
@@ -25,22 +67,26 @@ def process_single_file(file_path: Path, project_root: Path, fix_mode: bool) ->
         rel_path = file_path.relative_to(project_root)
         
         if fix_mode:
-            print(f"🔧 [FIXING] {rel_path}")
-            print(f"   Old: {current_guard} -> New: {expected_guard}")
-            
-            new_content = logic.replace_guard_content(
-                content, current_guard, expected_guard, has_endif_comment
-            )
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            with profiler.phase('read'):
+                content = _read_text(file_path)
+            new_content = logic.replace_guard_content(content, current_guard, expected_guard)
+            if new_content is None:
+                # 检查之后文件被改动，或按位置无法替换：不写入，也不计为已修复
+                print(f"❗️ [ERROR] 无法替换守卫 {current_guard}: {rel_path}", file=out)
+                return 'ERROR'
+
+            print(f"🔧 [FIXING] {rel_path}", file=out)
+            print(f"   Old: {current_guard} -> New: {expected_guard}", file=out)
+            with profiler.phase('write'):
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(new_content)
             return 'FIXED'
         else:
-            print(f"❌ [MISMATCH] {rel_path}")
-            print(f"   Expected: {expected_guard}")
-            print(f"   Found:    {current_guard}")
+            print(f"❌ [MISMATCH] {rel_path}", file=out)
+            print(f"   Expected: {expected_guard}", file=out)
+            print(f"   Found:    {current_guard}", file=out)
             return 'MISMATCH'
 
     except Exception as e:
-        print(f"❗️ [ERROR] 处理文件 {file_path} 时出错: {e}")
+        print(f"❗️ [ERROR] 处理文件 {file_path} 时出错: {e}", file=out)
         return 'ERROR'
\ No newline at end of file
@@ -0,0 +1,14 @@
+import os
+import sys
+
+# 各工具共享的 dev_common 位于 apps/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from dev_common.paths import ensure_tool_paths
+
+ensure_tool_paths()
+
+from unified.main import run
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
@@ -0,0 +1,2 @@
+cd /d %~dp0
+python run.py C:\your\path
\ No newline at end of file
@@ -0,0 +1,149 @@
+# unified/checks.py
+import io
+import os
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+# 由 run.py 预先将各工具目录加入 sys.path
+from header_tool import core as comment_core
+from hpp_guard import logic as guard_logic
+from pch_gen.core.parser import HeaderParser
+
+class SourceBuffer:
+    """
+    单个文件的共享缓冲区：磁盘只读取一次，各检查共用同一份内容。
+    文本按通用换行符规则解码 (与各工具以文本模式 open 的结果一致)。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        self._text = None
+        self.dirty = False
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            text = self.data.decode('utf-8', errors='ignore')
+            self._text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return self._text
+
+    @text.setter
+    def text(self, value: str):
+        if value != self.text:
+            self._text = value
+            self.dirty = True
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(self.text)
+
+class CommentCheck:
+    """auto_comments：首行路径注释"""
+
+    def __init__(self, root: str, extensions: Tuple[str, ...]):
+        self.root = root
+        self.extensions = extensions
+        self.stats = {'added': 0, 'updated': 0, 'skipped': 0}
+        self.lines: List[str] = []
+
+    def applies(self, path: str) -> bool:
+        return path.lower().endswith(self.extensions)
+
+    def run(self, buf: SourceBuffer, fix: bool):
+        expected = comment_core.calculate_header_comment(buf.path, self.root)
+        # 与 readlines() 一致只按 \n 分行：splitlines 还会在 \f、\v、\x1c、\u2028 等字符处断开
+        lines = io.StringIO(buf.text).readlines()
+        status, new_lines, old_comment = comment_core.analyze_and_update_content(lines, expected)
+        self.stats[status] += 1
+        if status == 'skipped':
+            return
+
+        rel_path = os.path.relpath(buf.path, self.root)
+        if status == 'added':
+            self.lines.append(f"[+] {rel_path}")
+        else:
+            self.lines.append(f"[*] {rel_path}")
+            self.lines.append(f"    Old: {old_comment}")
+            self.lines.append(f"    New: {expected.strip()}")
+        if fix:
+            buf.text = ''.join(new_lines)
+
+    def summary(self) -> List[str]:
+        return [
+            f"+ 缺少注释: {self.stats['added']}",
+            f"* 注释错误: {self.stats['updated']}",
+            f"- 符合规范: {self.stats['skipped']}",
+        ]
+
+class GuardCheck:
+    """hpp_guard：头文件守卫"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.stats = {'MATCH': 0, 'MISMATCH': 0, 'FIXED': 0, 'SKIP': 0, 'ERROR': 0}
+        self.lines: List[str] = []
+
+    def applies(self, path: str) -> bool:
+        return path.lower().endswith('.hpp')
+
+    def run(self, buf: SourceBuffer, fix: bool):
+        file_path = Path(buf.path)
+        rel_path = file_path.relative_to(self.root)
+        current_guard, _ = guard_logic.extract_guard_info(buf.text)
+        if not current_guard:
+            self.lines.append(f"🟡 [SKIP] 无标准守卫: {rel_path}")
+            self.stats['SKIP'] += 1
+            return
+
+        expected_guard = guard_logic.calculate_expected_guard(file_path, self.root)
+        if current_guard == expected_guard:
+            self.stats['MATCH'] += 1
+            return
+
+        if fix:
+            new_text = guard_logic.replace_guard_content(buf.text, current_guard, expected_guard)
+            if new_text is None:
+                self.lines.append(f"❗️ [ERROR] 无法替换守卫 {current_guard}: {rel_path}")
+                self.stats['ERROR'] += 1
+                return
+            self.lines.append(f"🔧 [FIXING] {rel_path}")
+            self.lines.append(f"   Old: {current_guard} -> New: {expected_guard}")
+            buf.text = new_text
+            self.stats['FIXED'] += 1
+        else:
+            self.lines.append(f"❌ [MISMATCH] {rel_path}")
+            self.lines.append(f"   Expected: {expected_guard}")
+            self.lines.append(f"   Found:    {current_guard}")
+            self.stats['MISMATCH'] += 1
+
+    def summary(self, fix: bool) -> List[str]:
+        lines = [
+            f"✅ 符合规范: {self.stats['MATCH']}",
+            f"🟡 跳过处理: {self.stats['SKIP']}",
+            f"❗️ 读取错误: {self.stats['ERROR']}",
+        ]
+        if fix:
+            lines.append(f"🔧 成功修复: {self.stats['FIXED']}")
+        else:
+            lines.append(f"❌ 发现不匹配: {self.stats['MISMATCH']}")
+        return lines
+
+class IncludeCheck:
+    """find_hpp：头文件引用统计 (直接在原始字节上匹配，无需解码)"""
+
+    def __init__(self, extensions: Tuple[str, ...], exclude_names: List[str]):
+        self.extensions = extensions
+        self.exclude_names = set(exclude_names)
+        self.parser = HeaderParser()
+        self.stats = Counter()
+
+    def applies(self, path: str) -> bool:
+        name = os.path.basename(path).lower()
+        return name.endswith(self.extensions) and name not in self.exclude_names
+
+    def run(self, buf: SourceBuffer, fix: bool):
+        # 统计基于修复前的内容：修复只改动注释与守卫，不影响 #include
+        self.stats.update(self.parser.parse_bytes(buf.data))
\ No newline at end of file
@@ -0,0 +1,108 @@
+# unified/main.py
+import argparse
+import os
+import sys
+
+from pch_gen import config
+from pch_gen.core.analyzer import ReportGenerator
+from pch_gen.core.classifier import HeaderClassifier
+from pch_gen.io.sysinc import default_compiler, load_system_headers
+from pch_gen.io.writer import write_pch_content, write_pch_file
+from dev_common.walker import DEFAULT_EXCLUDE_DIRS, walk_source_files
+
+from .checks import CommentCheck, GuardCheck, IncludeCheck, SourceBuffer
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="单次遍历同时执行 auto_comments / hpp_guard / find_hpp：每个文件只读取一次。",
+        epilog="示例: python run.py ./src --fix -o ./src/pch.hpp"
+    )
+    parser.add_argument("src_dir", help="源代码根目录")
+    parser.add_argument("--fix", action="store_true", help="自动修复头部注释与头文件守卫 (每个文件最多写入一次)")
+    parser.add_argument("--ext", nargs="+", default=['.hpp', '.cpp', '.h', '.c'],
+                        help="头部注释检查的目标扩展名 (默认: .hpp .cpp .h .c)")
+    parser.add_argument("-n", "--top", type=int, default=50, help="PCH 分析前 N 个高频头文件")
+    parser.add_argument("--extra-libs", nargs="+", default=[], help="追加第三方库前缀 (例如: mylib/)")
+    parser.add_argument("-o", "--pch-output", metavar="PATH", help="PCH 输出文件 (默认打印到报告末尾)")
+    parser.add_argument("--exclude-dir", action="append", default=[], metavar="NAME",
+                        help=f"追加排除的目录名 (支持通配，可多次指定；默认已排除: {' '.join(DEFAULT_EXCLUDE_DIRS)})")
+    parser.add_argument("--no-ignore", action="store_true",
+                        help="遍历全部目录：不读取 .gitignore、不使用 git ls-files、不排除默认目录")
+    return parser.parse_args()
+
+def _print_section(title: str, lines, summary):
+    print(f"\n================== {title} ==================")
+    for line in lines:
+        print(line)
+    if lines:
+        print()
+    for line in summary:
+        print(line)
+
+def run():
+    args = parse_arguments()
+    root = os.path.abspath(args.src_dir)
+    if not os.path.isdir(root):
+        print(f"错误: 目录不存在 '{args.src_dir}'")
+        sys.exit(1)
+
+    exclude_names = ["pch.hpp", "cmake_pch.hxx"]
+    if args.pch_output:
+        exclude_names.append(os.path.basename(args.pch_output).lower())
+
+    includes = IncludeCheck(config.SCAN_EXTENSIONS, exclude_names)
+    guards = GuardCheck(root)
+    comments = CommentCheck(root, tuple(args.ext))
+    # 顺序即修复顺序：先改守卫，再基于修改后的内容检查首行注释
+    checks = [includes, guards, comments]
+    extensions = tuple({e.lower() for e in args.ext} | {'.hpp'} | set(config.SCAN_EXTENSIONS))
+
+    print(f"🚀 开始扫描: {root} ({'修复' if args.fix else '检查'}模式)")
+
+    files = 0
+    written = 0
+    exclude_dirs = DEFAULT_EXCLUDE_DIRS + tuple(args.exclude_dir)
+    for path in walk_source_files(root, extensions, exclude_dirs, use_ignore=not args.no_ignore):
+        active = [check for check in checks if check.applies(path)]
+        if not active:
+            continue
+        try:
+            buf = SourceBuffer(path)
+        except OSError as e:
+            if guards in active:
+                guards.stats['ERROR'] += 1
+                guards.lines.append(f"❗️ [ERROR] 处理文件 {path} 时出错: {e}")
+            else:
+                print(f"❗️ [ERROR] 读取文件 {path} 时出错: {e}")
+            continue
+
+        files += 1
+        for check in active:
+            check.run(buf, args.fix)
+        if buf.dirty:
+            buf.save()
+            written += 1
+
+    _print_section("auto_comments", comments.lines, comments.summary())
+    _print_section("hpp_guard", guards.lines, guards.summary(args.fix))
+
+    print(f"\n================== find_hpp ==================")
+    print(f"统计到 {len(includes.stats)} 个不同的头文件")
+    if includes.stats:
+        _, system_headers, platform_headers = load_system_headers(
+            default_compiler(), config.SYSTEM_HEADER_SUBDIRS, config.C_SYSTEM_HEADERS)
+        classifier = HeaderClassifier(
+            config.CPP_STANDARD_HEADERS,
+            config.DEFAULT_THIRD_PARTY_IDENTIFIERS + args.extra_libs,
+            system_headers,
+            platform_headers,
+        )
+        report = ReportGenerator(classifier, config.PLATFORM_GUARDS).generate_report(includes.stats.most_common(args.top))
+        if args.pch_output:
+            write_pch_file(report, args.pch_output)
+            print(f"PCH 已写入: {args.pch_output}")
+        else:
+            print()
+            write_pch_content(report, stream=sys.stdout)
+
+    print(f"\n扫描文件总数: {files}，写入文件: {written}")
\ No newline at end of file
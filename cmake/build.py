@@ -0,0 +1,347 @@
+# build.py
+"""
+CMake + Ninja 构建驱动，由 build.sh 调用 (参数原样传入)。
+- 默认: 配置 (生成 compile_commands.json) 并构建，输出总耗时与 .ninja_log 中最慢的编译步骤
+- clean: 构建前删除构建目录
+- --package: 构建后执行 package 目标 (CPack)
+- --pch: 先运行 find_hpp 生成 PCH，再通过 CMAKE_PROJECT_INCLUDE 为所有目标注入 target_precompile_headers
+- --ab: 在两个独立的构建目录中分别测量无 PCH / 有 PCH 的全量与增量构建耗时
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIND_HPP = os.path.join(SCRIPT_DIR, os.pardir, 'apps', 'find_hpp', 'run.py')
+# build.sh 会先切换到脚本目录，命令行中的相对路径应相对于调用者所在目录解析
+CALLER_DIR = os.environ.get('BUILD_PY_CALLER_DIR') or os.getcwd()
+
+# 注入 PCH 的 CMake 脚本：每次 project() 之后都会被包含，
+# 用 DEFER 推迟到顶层 CMakeLists.txt 处理完毕、所有目标都已定义时再统一添加
+_INJECT_TEMPLATE = """# 由 build.py 生成，请勿手动修改
+if(CMAKE_VERSION VERSION_LESS 3.19)
+  message(FATAL_ERROR "build.py --pch 需要 CMake 3.19 以上 (cmake_language(DEFER))")
+endif()
+
+get_property(_build_py_pch_deferred GLOBAL PROPERTY BUILD_PY_PCH_DEFERRED)
+if(NOT _build_py_pch_deferred)
+  set_property(GLOBAL PROPERTY BUILD_PY_PCH_DEFERRED TRUE)
+
+  function(_build_py_collect_targets dir out)
+    get_property(targets DIRECTORY "${{dir}}" PROPERTY BUILDSYSTEM_TARGETS)
+    get_property(subdirs DIRECTORY "${{dir}}" PROPERTY SUBDIRECTORIES)
+    foreach(sub IN LISTS subdirs)
+      _build_py_collect_targets("${{sub}}" sub_targets)
+      list(APPEND targets ${{sub_targets}})
+    endforeach()
+    set(${{out}} ${{targets}} PARENT_SCOPE)
+  endfunction()
+
+  function(_build_py_apply_pch)
+    _build_py_collect_targets("${{CMAKE_SOURCE_DIR}}" targets)
+    foreach(target IN LISTS targets)
+      get_target_property(type ${{target}} TYPE)
+      if(type MATCHES "^(EXECUTABLE|STATIC_LIBRARY|SHARED_LIBRARY|MODULE_LIBRARY|OBJECT_LIBRARY)$")
+        target_precompile_headers(${{target}} PRIVATE "$<$<COMPILE_LANGUAGE:CXX>:{pch}>")
+      endif()
+    endforeach()
+  endfunction()
+
+  cmake_language(DEFER DIRECTORY "${{CMAKE_SOURCE_DIR}}" CALL _build_py_apply_pch)
+endif()
+"""
+
+class Step(NamedTuple):
+    output: str
+    seconds: float
+
+class BuildResult(NamedTuple):
+    seconds: float
+    # 本次构建在 .ninja_log 中记录的步骤；非 Ninja 生成器时为 None
+    steps: Optional[List[Step]]
+
+    @property
+    def compile_seconds(self) -> Optional[float]:
+        if self.steps is None:
+            return None
+        return sum(step.seconds for step in self.steps)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="CMake 构建驱动：Ninja + compile_commands.json，可选注入 find_hpp 生成的 PCH 并做 A/B 计时",
+        epilog="示例: ./build.sh clean --package    ./build.sh --ab --touch src/core/types.hpp"
+    )
+    parser.add_argument("action", nargs="?", choices=["clean"], help="clean: 构建前删除构建目录")
+    parser.add_argument("--package", action="store_true", help="构建完成后执行 package 目标 (CPack)")
+    parser.add_argument("--source", default=None,
+                        help="CMake 源码目录 (默认: 脚本所在目录或其上级中含 CMakeLists.txt 的一个；"
+                             "以下相对路径均相对于运行 build.sh 时的当前目录)")
+    parser.add_argument("--build-dir", default=None, help="构建目录 (默认: <source>/build)")
+    parser.add_argument("--config", default="Release", help="CMAKE_BUILD_TYPE (默认: Release)")
+    parser.add_argument("-G", "--generator", default="Ninja",
+                        help="CMake 生成器 (默认: Ninja；其他生成器没有 .ninja_log，只报告总耗时)")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="并行编译数 (默认: 生成器自行决定)")
+    parser.add_argument("--cmake-arg", action="append", default=[], metavar="ARG",
+                        help="追加传给 CMake 配置步骤的参数 (可多次指定)")
+    parser.add_argument("--pch", action="store_true",
+                        help="运行 find_hpp 生成 PCH 并注入所有 C++ 目标 (target_precompile_headers)")
+    parser.add_argument("--ab", action="store_true",
+                        help="分别在 <build-dir>-ab/base 与 <build-dir>-ab/pch 中测量无/有 PCH 的全量与增量构建耗时")
+    parser.add_argument("--touch", action="append", default=[], metavar="PATH",
+                        help="A/B 增量构建前更新时间戳的文件 (可多次指定；相对路径在当前目录下找不到时相对于源码目录；"
+                             "默认: compile_commands.json 中的第一个源文件)")
+    parser.add_argument("--find-hpp", default=DEFAULT_FIND_HPP, metavar="PATH",
+                        help="find_hpp 的 run.py 路径 (默认: 本仓库 apps/find_hpp/run.py)")
+    parser.add_argument("--find-hpp-arg", action="append", default=[], metavar="ARG",
+                        help="追加传给 find_hpp 的参数，例如 --find-hpp-arg=-n --find-hpp-arg=30 (可多次指定；"
+                             "PCH 位于构建目录中，总是只包含标准库与第三方库头文件)")
+    parser.add_argument("--slowest", type=int, default=10, metavar="N",
+                        help="列出 .ninja_log 中最慢的 N 个步骤 (默认: 10，0 表示不列出)")
+    return parser.parse_args()
+
+def caller_path(path: str) -> str:
+    """按调用者所在目录解析路径"""
+    return os.path.abspath(os.path.join(CALLER_DIR, path))
+
+def find_source_dir(source: Optional[str]) -> str:
+    if source:
+        path = caller_path(source)
+        if not os.path.isfile(os.path.join(path, 'CMakeLists.txt')):
+            raise FileNotFoundError(f"{path} 中没有 CMakeLists.txt")
+        return path
+    for candidate in (SCRIPT_DIR, os.path.dirname(SCRIPT_DIR)):
+        if os.path.isfile(os.path.join(candidate, 'CMakeLists.txt')):
+            return candidate
+    raise FileNotFoundError(f"在 {SCRIPT_DIR} 及其上级目录中找不到 CMakeLists.txt，请使用 --source 指定")
+
+def run_command(cmd: List[str], cwd: Optional[str] = None):
+    print(f"--- {' '.join(cmd)}", flush=True)
+    subprocess.run(cmd, cwd=cwd, check=True)
+
+# === .ninja_log ===
+
+def ninja_log_size(build_dir: str) -> int:
+    try:
+        return os.path.getsize(os.path.join(build_dir, '.ninja_log'))
+    except OSError:
+        return 0
+
+def read_ninja_log(build_dir: str, offset: int) -> List[Step]:
+    """
+    读取 offset 之后追加的记录 (即本次构建的步骤)。
+    格式 v5 起每行为 "开始ms<TAB>结束ms<TAB>mtime<TAB>输出<TAB>命令哈希"；
+    Ninja 在启动时可能压缩日志使文件变短，此时退回读取全部记录。
+    """
+    path = os.path.join(build_dir, '.ninja_log')
+    try:
+        with open(path, 'rb') as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0
+            f.seek(offset)
+            data = f.read().decode('utf-8', errors='replace')
+    except OSError:
+        return []
+
+    # 同一输出的多条记录只保留最后一条 (与 Ninja 自身的处理一致)
+    steps: Dict[str, Step] = {}
+    for line in data.splitlines():
+        if line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        if len(fields) < 4:
+            continue
+        try:
+            start, end = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue
+        steps[fields[3]] = Step(fields[3], (end - start) / 1000)
+    return list(steps.values())
+
+# === 构建步骤 ===
+
+def configure(args, source_dir: str, build_dir: str, inject: Optional[str] = None):
+    cmd = ['cmake', '-S', source_dir, '-B', build_dir, '-G', args.generator,
+           f'-DCMAKE_BUILD_TYPE={args.config}', '-DCMAKE_EXPORT_COMPILE_COMMANDS=ON',
+           # 不注入时显式移除：同一构建目录从有 PCH 切换回无 PCH 时缓存中还留有旧值
+           f'-DCMAKE_PROJECT_INCLUDE={inject}' if inject else '-UCMAKE_PROJECT_INCLUDE']
+    run_command(cmd + args.cmake_arg)
+
+def build(args, build_dir: str, target: Optional[str] = None) -> BuildResult:
+    ninja = args.generator == 'Ninja'
+    offset = ninja_log_size(build_dir)
+    cmd = ['cmake', '--build', build_dir]
+    if target:
+        cmd += ['--target', target]
+    if args.jobs > 0:
+        cmd += ['--parallel', str(args.jobs)]
+    start = time.perf_counter()
+    run_command(cmd)
+    seconds = time.perf_counter() - start
+    return BuildResult(seconds, read_ninja_log(build_dir, offset) if ninja else None)
+
+def generate_pch(args, source_dir: str, build_dir: str, pch_dir: str) -> str:
+    """根据 build_dir 中的 compile_commands.json 运行 find_hpp，PCH 与注入用的 CMake 脚本写入 pch_dir，返回脚本路径"""
+    os.makedirs(pch_dir, exist_ok=True)
+    pch_path = os.path.join(pch_dir, 'pch.hpp')
+    # 项目头文件的引号路径相对于包含它的源文件，在构建目录中的 pch.hpp 里无法解析，因此不写入
+    run_command([sys.executable, args.find_hpp, source_dir,
+                 '--compile-commands', os.path.join(build_dir, 'compile_commands.json'),
+                 '--no-cache', '--no-project', '-o', pch_path] + args.find_hpp_arg)
+
+    inject_path = os.path.join(pch_dir, 'inject_pch.cmake')
+    with open(inject_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(_INJECT_TEMPLATE.format(pch=pch_path.replace(os.sep, '/')))
+    return inject_path
+
+def default_touch_files(build_dir: str) -> List[str]:
+    with open(os.path.join(build_dir, 'compile_commands.json'), encoding='utf-8') as f:
+        entries = json.load(f)
+    for entry in entries:
+        path = entry.get('file')
+        if path:
+            return [path if os.path.isabs(path) else os.path.join(entry.get('directory', ''), path)]
+    return []
+
+def resolve_touch_files(paths: List[str], source_dir: str) -> List[str]:
+    """在构建前检查 --touch 的文件，避免两次全量构建之后才因路径错误失败"""
+    resolved = []
+    for path in paths:
+        candidates = [caller_path(path)]
+        if not os.path.isabs(path) and os.path.join(source_dir, path) not in candidates:
+            candidates.append(os.path.join(source_dir, path))
+        found = next((c for c in candidates if os.path.isfile(c)), None)
+        if found is None:
+            raise FileNotFoundError(f"--touch 指定的文件不存在: {' 或 '.join(candidates)}")
+        resolved.append(found)
+    return resolved
+
+def touch(paths: List[str]):
+    for path in paths:
+        os.utime(path)
+        print(f"--- 已更新时间戳: {path}")
+
+# === 报告 ===
+
+def print_slowest(title: str, result: BuildResult, count: int):
+    if count <= 0 or not result.steps:
+        return
+    print(f"\n{title} 最慢的 {min(count, len(result.steps))} 个步骤:")
+    for step in sorted(result.steps, key=lambda s: s.seconds, reverse=True)[:count]:
+        print(f"  {step.seconds:8.2f} s  {step.output}")
+
+def _format_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+def _format_change(base: Optional[float], other: Optional[float]) -> str:
+    if base is None or other is None or base <= 0:
+        return "-"
+    return f"{(other - base) / base:+.1%}"
+
+def _pad(text: str, width: int, left: bool = False) -> str:
+    """按终端显示宽度对齐 (中文字符占两列)"""
+    shown = sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text)
+    fill = ' ' * max(0, width - shown)
+    return text + fill if left else fill + text
+
+def print_ab_table(rows: List[tuple]):
+    print("\n" + _pad('', 24, left=True) + _pad('无 PCH (s)', 12) + _pad('有 PCH (s)', 12) + _pad('变化', 10))
+    for label, base, pch in rows:
+        print(_pad(label, 24, left=True) + _pad(_format_seconds(base), 12)
+              + _pad(_format_seconds(pch), 12) + _pad(_format_change(base, pch), 10))
+
+# === 模式 ===
+
+def run_build(args, source_dir: str, build_dir: str):
+    if args.action == 'clean' and os.path.isdir(build_dir):
+        print(f"--- 删除构建目录: {build_dir}")
+        shutil.rmtree(build_dir)
+
+    configure(args, source_dir, build_dir)
+    if args.pch:
+        pch_dir = os.path.join(build_dir, 'pch')
+        configure(args, source_dir, build_dir, generate_pch(args, source_dir, build_dir, pch_dir))
+
+    result = build(args, build_dir)
+    print(f"\n构建耗时: {result.seconds:.2f} s", end="")
+    if result.steps is not None:
+        print(f"，本次执行 {len(result.steps)} 个步骤，累计 {result.compile_seconds:.2f} s", end="")
+    print()
+    print_slowest("本次构建", result, args.slowest)
+
+    if args.package:
+        build(args, build_dir, target='package')
+
+def run_ab(args, source_dir: str, build_dir: str):
+    """
+    A/B 计时：两个构建目录使用相同的配置参数，区别只在于是否注入 PCH。
+    全量构建前总是清空构建目录；增量构建在更新 --touch 文件的时间戳后分别重新构建。
+    """
+    touched = resolve_touch_files(args.touch, source_dir)
+    root = f"{build_dir}-ab"
+    base_dir = os.path.join(root, 'base')
+    pch_dir = os.path.join(root, 'pch')
+    for path in (base_dir, pch_dir):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    configure(args, source_dir, base_dir)
+    base_clean = build(args, base_dir)
+
+    # PCH 由无 PCH 构建的 compile_commands.json 生成，放在 pch 构建目录中
+    inject = generate_pch(args, source_dir, base_dir, os.path.join(pch_dir, 'pch'))
+    configure(args, source_dir, pch_dir, inject)
+    pch_clean = build(args, pch_dir)
+
+    touched = touched or default_touch_files(base_dir)
+    base_inc = pch_inc = None
+    if touched:
+        touch(touched)
+        base_inc = build(args, base_dir)
+        pch_inc = build(args, pch_dir)
+    else:
+        print("--- compile_commands.json 中没有源文件，跳过增量构建", file=sys.stderr)
+
+    rows = [("全量构建", base_clean.seconds, pch_clean.seconds),
+            ("全量构建 (步骤累计)", base_clean.compile_seconds, pch_clean.compile_seconds)]
+    if base_inc and pch_inc:
+        rows += [("增量构建", base_inc.seconds, pch_inc.seconds),
+                 ("增量构建 (步骤累计)", base_inc.compile_seconds, pch_inc.compile_seconds)]
+    print_ab_table(rows)
+    print_slowest("无 PCH 全量构建", base_clean, args.slowest)
+    print_slowest("有 PCH 全量构建", pch_clean, args.slowest)
+    print(f"\nPCH: {os.path.join(pch_dir, 'pch', 'pch.hpp')}")
+
+def main():
+    args = parse_arguments()
+    if args.ab and args.package:
+        print("错误: --ab 与 --package 不能同时使用", file=sys.stderr)
+        return 1
+    if args.generator == 'Ninja' and shutil.which('ninja') is None:
+        print("错误: 找不到 ninja，请先安装或使用 -G 指定其他生成器", file=sys.stderr)
+        return 1
+    try:
+        source_dir = find_source_dir(args.source)
+        build_dir = caller_path(args.build_dir) if args.build_dir else os.path.join(source_dir, 'build')
+        args.find_hpp = caller_path(args.find_hpp)
+        if (args.pch or args.ab) and not os.path.isfile(args.find_hpp):
+            raise FileNotFoundError(f"找不到 find_hpp: {args.find_hpp}")
+        if args.ab:
+            run_ab(args, source_dir, build_dir)
+        else:
+            run_build(args, source_dir, build_dir)
+    except FileNotFoundError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    except subprocess.CalledProcessError as e:
+        print(f"错误: 命令执行失败 (退出码 {e.returncode}): {' '.join(e.cmd)}", file=sys.stderr)
+        return e.returncode or 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -2,6 +2,9 @@
 # 如果任何命令执行失败，立即退出脚本
 set -e
 
+# 记录调用者所在目录：build.py 据此解析 --touch/--source 等相对路径
+export BUILD_PY_CALLER_DIR="$(pwd)"
+
 # 切换到脚本所在的目录，这样无论您从哪里运行此脚本，它都能正常工作
 cd "$(dirname "$0")"
 echo "--- 已切换到脚本目录: $(pwd)"